@@ -1,23 +1,30 @@
 {
     'name': 'Fusion Sync',
-    'version': '0.1.19',
+    'version': '0.1.22',
     'category': 'Manufacturing',
     'summary': 'Synchronize Fusion 360 designs with Odoo',
     'author': 'Jaco',
     'website': 'https://jaco.tech',
     'company': 'Jacotech',
     'license': 'AGPL-3',
-    'depends': ['base', 'mrp'],
+    'depends': ['base', 'mail', 'mrp'],
     'data': [
         'security/fusion_security.xml',
         'security/ir.model.access.csv',
         'data/fusion_component_sequence.xml',
+        'data/mail_message_subtype_data.xml',
+        'data/fusion_sync_cron.xml',
         'views/fusion_component_views.xml',
         'views/fusion_user_views.xml',
         'views/fusion_component_version_views.xml',
         'views/fusion_component_version_assembly_line_views.xml',
         'views/fusion_design_views.xml',
         'views/fusion_design_version_views.xml',
+        'views/fusion_sync_job_views.xml',
+        'views/fusion_sync_log_views.xml',
+        'views/res_config_settings_views.xml',
+        'views/fusion_catalog_report_views.xml',
+        'wizard/fusion_design_version_diff_views.xml',
         'views/fusion_menus.xml',
     ],
     'installable': True,
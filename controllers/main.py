@@ -0,0 +1,143 @@
+import base64
+import json
+import logging
+from odoo import http
+from odoo.exceptions import AccessError, UserError
+from odoo.http import content_disposition, request
+from werkzeug.exceptions import BadRequest, NotFound, Unauthorized
+
+_logger = logging.getLogger(__name__)
+
+
+class FusionSyncController(http.Controller):
+
+    def _get_component_version(self, version_id):
+        version = request.env['fusion.component.version'].browse(version_id).exists()
+        if not version:
+            raise NotFound()
+        version.check_access_rights('read')
+        version.check_access_rule('read')
+        return version
+
+    @http.route('/fusion_sync/component_version/<int:version_id>/explode_bom', type='json', auth='user')
+    def explode_bom(self, version_id, levels=None, flatten=True):
+        """Return the exploded bill of materials of a component version."""
+        version = self._get_component_version(version_id)
+        return version.explode_bom(levels=levels, flatten=flatten)
+
+    @http.route('/fusion_sync/snapshot', type='http', auth='user', methods=['GET'])
+    def snapshot(self, design_version_ids=None, **kwargs):
+        """Download the gzipped JSON snapshot of design versions, given as a
+        comma separated list of ids, or of the whole catalog.
+
+        The response carries the snapshot fingerprint as ETag, so clients
+        polling with ``If-None-Match`` only download changed snapshots.
+        Malformed ids are rejected with a 400, unknown ones with a 404.
+        """
+        ids = None
+        if design_version_ids:
+            try:
+                ids = [int(version_id) for version_id in design_version_ids.split(',') if version_id.strip()]
+            except ValueError:
+                raise BadRequest("design_version_ids must be a comma separated list of ids")
+        try:
+            attachment = request.env['fusion.snapshot']._get_snapshot_attachment(ids)
+        except AccessError:
+            raise
+        except UserError as e:
+            raise NotFound(str(e))
+        etag = '"%s"' % attachment.description
+        if request.httprequest.headers.get('If-None-Match') == etag:
+            return request.make_response('', status=304, headers=[('ETag', etag)])
+        return request.make_response(base64.b64decode(attachment.datas), headers=[
+            ('Content-Type', 'application/gzip'),
+            ('Content-Disposition', content_disposition(attachment.name)),
+            ('ETag', etag),
+        ])
+
+    def _authenticate_api_key(self):
+        """Run the request as the owner of the API key sent as bearer token.
+
+        Raises:
+            Unauthorized: If no valid ``rpc`` API key is given
+        """
+        scheme, __, key = (request.httprequest.headers.get('Authorization') or '').partition(' ')
+        key = key.strip()
+        uid = scheme.lower() == 'bearer' and key and request.env['res.users.apikeys'].sudo()._check_credentials(
+            scope='rpc', key=key
+        )
+        if not uid:
+            raise Unauthorized()
+        request.uid = uid
+
+    # Machine clients authenticate with an API key instead of the session
+    # cookie, so the route needs no CSRF token and cannot be triggered by a
+    # third-party page on behalf of a logged in user
+    @http.route('/fusion_sync/import/ndjson', type='http', auth='public', methods=['POST'], csrf=False)
+    def import_ndjson(self, batch_size=None, **kwargs):
+        """Import design structures streamed as newline-delimited JSON.
+
+        Every line holds one flat record as accepted by
+        ``fusion.sync.engine.sync_records``. Lines are parsed as they arrive
+        and synchronized in bounded batches, so memory usage does not depend
+        on the size of the upload. The client authenticates with an API key
+        in an ``Authorization: Bearer <key>`` header.
+
+        Returns:
+            JSON summary with the number of processed records and one error
+            entry, with its line number, per rejected record; records
+            rejected because of a concurrent import of the same records are
+            flagged ``retryable``
+        """
+        self._authenticate_api_key()
+        batch_size = int(batch_size or request.env['ir.config_parameter'].sudo().get_param(
+            'fusion_sync.ndjson_batch_size', 500
+        ))
+        # Users and components resolved by a batch are reused by the next ones
+        engine = request.env['fusion.sync.engine']._with_sync_cache()
+        summary = {'processed': 0, 'errors': []}
+        batch = []
+        for line_number, raw_line in enumerate(request.httprequest.stream, start=1):
+            if not raw_line.strip():
+                continue
+            try:
+                record = json.loads(raw_line)
+                if not isinstance(record, dict):
+                    raise ValueError("Expected a JSON object")
+            except ValueError as e:
+                summary['errors'].append({'line': line_number, 'error': str(e)})
+                continue
+            batch.append((line_number, record))
+            if len(batch) >= batch_size:
+                self._import_ndjson_batch(engine, batch, summary)
+                batch = []
+        if batch:
+            self._import_ndjson_batch(engine, batch, summary)
+        return request.make_response(json.dumps(summary), headers=[('Content-Type', 'application/json')])
+
+    def _import_ndjson_batch(self, engine, batch, summary):
+        """Synchronize a batch, falling back to one record at a time to
+        isolate the failing records."""
+        try:
+            with request.env.cr.savepoint():
+                engine.sync_records([record for __, record in batch])
+            summary['processed'] += len(batch)
+        except Exception:
+            engine._clear_caches()
+            for line_number, record in batch:
+                try:
+                    with request.env.cr.savepoint():
+                        engine.sync_records([record])
+                    summary['processed'] += 1
+                except Exception as e:
+                    engine._clear_caches()
+                    _logger.info("Fusion NDJSON import: line %d rejected: %s", line_number, e)
+                    # The streamed body cannot be replayed, so conflicts with
+                    # concurrent imports are reported for the client to resend
+                    summary['errors'].append({
+                        'line': line_number,
+                        'error': str(e),
+                        'retryable': engine._is_concurrency_error(e),
+                    })
+        # Keep memory flat across batches
+        engine.invalidate_cache()
@@ -0,0 +1,24 @@
+def migrate(cr, version):
+    # Component versions used to belong to a single design version; turn
+    # that pointer into the first usage of the shared component version.
+    # The usage table is created and filled before the module update, so the
+    # stored counters computed from it during the update see every usage.
+    # The ORM adds the foreign keys of the existing table afterwards.
+    cr.execute("""
+        CREATE TABLE IF NOT EXISTS fusion_design_version_component_version_rel (
+            design_version_id INTEGER NOT NULL,
+            component_version_id INTEGER NOT NULL,
+            PRIMARY KEY (design_version_id, component_version_id)
+        )
+    """)
+    cr.execute("""
+        CREATE INDEX IF NOT EXISTS fusion_design_version_component_version_rel_component_version_id_idx
+            ON fusion_design_version_component_version_rel (component_version_id, design_version_id)
+    """)
+    cr.execute("""
+        INSERT INTO fusion_design_version_component_version_rel (design_version_id, component_version_id)
+        SELECT fusion_design_version_id, id
+          FROM fusion_component_version
+         WHERE fusion_design_version_id IS NOT NULL
+            ON CONFLICT DO NOTHING
+    """)
@@ -0,0 +1,11 @@
+def migrate(cr, version):
+    # Existing component versions get the UUID derived from their component
+    # before the ORM makes the new column required.
+    cr.execute("ALTER TABLE fusion_component_version ADD COLUMN IF NOT EXISTS uuid VARCHAR")
+    cr.execute("""
+        UPDATE fusion_component_version version
+           SET uuid = component.uuid || ':v' || version.version_number
+          FROM fusion_component component
+         WHERE component.id = version.fusion_component_id
+           AND version.uuid IS NULL
+    """)
@@ -0,0 +1,105 @@
+import logging
+
+from psycopg2 import IntegrityError
+
+_logger = logging.getLogger(__name__)
+
+# Rebuilt from the assembly lines after merging instead of being merged
+CLOSURE_TABLE = 'fusion_component_version_closure'
+
+# Business keys of the unique constraints, in merge order: assembly lines are
+# deduplicated once their parent and child versions have been merged
+UNIQUE_KEYS = [
+    ('fusion_component_version', ('fusion_component_id', 'version_number')),
+    ('fusion_component_version', ('uuid',)),
+    ('fusion_design_version', ('uuid',)),
+    ('fusion_design_version', ('fusion_design_id', 'version_number')),
+    ('fusion_component_version_assembly_line', ('fusion_component_version_id', 'child_component_version_id')),
+]
+
+
+def table_columns(cr, table):
+    cr.execute("SELECT column_name FROM information_schema.columns WHERE table_name = %s", [table])
+    return {column for column, in cr.fetchall()}
+
+
+def merge_duplicates(cr, table, key_columns):
+    """Point the references to duplicate rows of ``table`` at the oldest row
+    with the same key, then delete the duplicates.
+
+    Returns:
+        int: The number of removed duplicates
+    """
+    keys = ", ".join(key_columns)
+    cr.execute("""
+        CREATE TEMPORARY TABLE fusion_merge AS
+        SELECT id AS old_id, new_id
+          FROM (SELECT id, min(id) OVER (PARTITION BY {keys}) AS new_id FROM {table}) ranked
+         WHERE id <> new_id
+    """.format(keys=keys, table=table))
+    cr.execute("SELECT count(*) FROM fusion_merge")
+    count = cr.fetchone()[0]
+    if count:
+        _logger.warning("Merging %d duplicate rows of %s on (%s)", count, table, keys)
+        cr.execute("""
+            SELECT cl.relname, att.attname
+              FROM pg_constraint con
+              JOIN pg_class cl ON cl.oid = con.conrelid
+              JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = con.conkey[1]
+             WHERE con.contype = 'f' AND con.confrelid = %s::regclass
+        """, [table])
+        for ref_table, column in cr.fetchall():
+            if ref_table == CLOSURE_TABLE:
+                continue
+            columns = table_columns(cr, ref_table)
+            if 'id' not in columns:
+                # Many2many table: add the missing links of the kept row
+                others = sorted(columns - {column})
+                cr.execute("""
+                    INSERT INTO "{ref}" ("{column}", {names})
+                    SELECT DISTINCT merge.new_id, {values}
+                      FROM "{ref}" r
+                      JOIN fusion_merge merge ON merge.old_id = r."{column}"
+                        ON CONFLICT DO NOTHING
+                """.format(
+                    ref=ref_table,
+                    column=column,
+                    names=", ".join('"%s"' % other for other in others),
+                    values=", ".join('r."%s"' % other for other in others),
+                ))
+                cr.execute('DELETE FROM "{ref}" r USING fusion_merge merge WHERE r."{column}" = merge.old_id'.format(
+                    ref=ref_table, column=column,
+                ))
+                continue
+            cr.execute('SELECT r.id, merge.new_id FROM "{ref}" r JOIN fusion_merge merge ON merge.old_id = r."{column}"'.format(
+                ref=ref_table, column=column,
+            ))
+            for ref_id, new_id in cr.fetchall():
+                # A row of the kept record may already hold the same values;
+                # the duplicate reference is then removed with the duplicate
+                try:
+                    with cr.savepoint(flush=False):
+                        cr.execute('UPDATE "{ref}" SET "{column}" = %s WHERE id = %s'.format(
+                            ref=ref_table, column=column,
+                        ), [new_id, ref_id])
+                except IntegrityError:
+                    cr.execute('DELETE FROM "{ref}" WHERE id = %s'.format(ref=ref_table), [ref_id])
+        cr.execute('DELETE FROM "{table}" WHERE id IN (SELECT old_id FROM fusion_merge)'.format(table=table))
+    cr.execute("DROP TABLE fusion_merge")
+    return count
+
+
+def migrate(cr, version):
+    # The unique constraints on version numbers, UUIDs and assembly lines
+    # cannot be added while duplicates exist, so duplicates are merged into
+    # their oldest row before the module update adds the constraints
+    merged = 0
+    for table, key_columns in UNIQUE_KEYS:
+        if set(key_columns) <= table_columns(cr, table):
+            merged += merge_duplicates(cr, table, key_columns)
+    if merged:
+        # The closure is rebuilt when empty, the stored counts are
+        # recomputed by the post-migration
+        if table_columns(cr, CLOSURE_TABLE):
+            cr.execute("DELETE FROM %s" % CLOSURE_TABLE)
+        cr.execute("INSERT INTO ir_config_parameter (key, value) VALUES ('fusion_sync.recompute_counts', '1') ON CONFLICT (key) DO NOTHING")
@@ -1,6 +1,19 @@
+from . import fusion_tracking_mixin
 from . import fusion_component
 from . import fusion_user
 from . import fusion_component_version
 from . import fusion_component_version_assembly_line
 from . import fusion_design
 from . import fusion_design_version
+from . import fusion_sync_engine
+from . import fusion_component_version_closure
+from . import fusion_sync_job
+from . import res_company
+from . import res_config_settings
+from . import fusion_assembly_change
+from . import fusion_sync_log
+from . import fusion_snapshot
+from . import fusion_rename_queue
+from . import fusion_report_mixin
+from . import fusion_component_version_report
+from . import fusion_design_version_report
@@ -0,0 +1,38 @@
+import logging
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+class FusionAssemblyChange(models.Model):
+    """Change log of assembly lines, consumed by the BOM generator.
+
+    One row is written per assembly whose lines were created, modified or
+    removed. The BOM generator only rebuilds the bills of materials of the
+    logged assemblies and deletes the rows it processed.
+    """
+    _name = 'fusion.assembly.change'
+    _description = 'Fusion Assembly Change'
+    _order = 'id'
+
+    component_version_id = fields.Many2one(comodel_name='fusion.component.version', string='Component Version', required=True, ondelete='cascade', index=True, help="Assembly whose lines changed")
+
+    @api.model
+    def _log_changes(self, component_version_ids):
+        component_version_ids = set(component_version_ids)
+        if component_version_ids:
+            self.sudo().create([{'component_version_id': version_id} for version_id in component_version_ids])
+
+    @api.model
+    def _cron_update_boms(self, limit=1000):
+        """Rebuild the BOMs of the assemblies changed since the last run."""
+        while True:
+            changes = self.sudo().search([], limit=limit)
+            if not changes:
+                break
+            versions = changes.component_version_id
+            all_changes = self.sudo().search([('component_version_id', 'in', versions.ids)])
+            versions._update_boms()
+            all_changes.unlink()
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+            _logger.info("Fusion Sync: updated BOMs of %d assemblies", len(versions))
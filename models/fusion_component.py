@@ -1,13 +1,13 @@
 import logging
-from odoo import api, fields, models, _
-from odoo.exceptions import UserError, ValidationError
+from odoo import api, fields, models
+from ..tools import create_trigram_index
 
 _logger = logging.getLogger(__name__)
 
 class FusionComponent(models.Model):
     _name = 'fusion.component'
     _description = 'Fusion Component'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'fusion.tracking.mixin']
     _order = 'name, id'
     _sql_constraints = [
         ('uuid_unique', 'unique(uuid)', 'UUID must be unique'),
@@ -47,6 +47,14 @@ class FusionComponent(models.Model):
         help="User who created the component in Fusion 360"
     )
 
+    product_tmpl_id = fields.Many2one(
+        comodel_name='product.template',
+        string='Product',
+        ondelete='set null',
+        tracking=True,
+        help="Product used for this component in generated bills of materials"
+    )
+
     # Relationships
     version_ids = fields.One2many(
         comodel_name='fusion.component.version',
@@ -65,20 +73,70 @@ class FusionComponent(models.Model):
     used_in_design_count = fields.Integer(
         string='Used In Designs',
         compute='_compute_usage_counts',
+        store=True,
         help="Number of designs using this component"
     )
+    where_used_count = fields.Integer(
+        string='Where Used',
+        compute='_compute_where_used_counts',
+        help="Number of assemblies using any version of this component at any level"
+    )
+    where_used_design_count = fields.Integer(
+        string='Used In Design Versions',
+        compute='_compute_where_used_counts',
+        help="Number of design versions using any version of this component at any level"
+    )
+
+    def init(self):
+        create_trigram_index(self.env.cr, 'fusion_component_name_trgm_idx', self._table, 'name')
 
     @api.depends('version_ids')
     def _compute_version_count(self):
         for component in self:
             component.version_count = len(component.version_ids)
 
+    @api.depends('version_ids.design_version_ids')
     def _compute_usage_counts(self):
+        counts = {}
+        component_ids = self.filtered('id').ids
+        if component_ids:
+            self.env['fusion.component.version'].flush(['fusion_component_id', 'design_version_ids'])
+            self.env.cr.execute("""
+                SELECT version.fusion_component_id, count(DISTINCT usage.design_version_id)
+                  FROM fusion_design_version_component_version_rel usage
+                  JOIN fusion_component_version version ON version.id = usage.component_version_id
+                 WHERE version.fusion_component_id IN %s
+              GROUP BY version.fusion_component_id
+            """, [tuple(component_ids)])
+            counts = dict(self.env.cr.fetchall())
         for component in self:
-            designs = self.env['fusion.design.version'].search_count([
-                ('component_version_ids.fusion_component_id', '=', component.id)
-            ])
-            component.used_in_design_count = designs
+            component.used_in_design_count = counts.get(component.id, 0)
+
+    def _compute_where_used_counts(self):
+        versions = self.filtered('id')._get_all_versions()
+        assembly_counts, design_counts = self.env['fusion.component.version.closure']._get_where_used_counts(
+            [(version.fusion_component_id.id, version.id) for version in versions]
+        )
+        for component in self:
+            component.where_used_count = assembly_counts.get(component.id, 0)
+            component.where_used_design_count = design_counts.get(component.id, 0)
+
+    def _get_all_versions(self):
+        return self.with_context(active_test=False).version_ids.with_env(self.env)
+
+    def get_where_used(self, offset=0, limit=80):
+        """Return the assemblies and design versions using any version of
+        these components at any level.
+
+        See ``fusion.component.version.get_where_used``.
+        """
+        return self._get_all_versions().get_where_used(offset=offset, limit=limit)
+
+    def action_view_where_used(self):
+        return self._get_all_versions().action_view_where_used()
+
+    def action_view_where_used_designs(self):
+        return self._get_all_versions().action_view_where_used_designs()
 
     @api.model
     def sync_component_version(self, design_version, component_data):
@@ -98,41 +156,36 @@ class FusionComponent(models.Model):
         Raises:
             ValidationError: If required data is missing
         """
-        component_uuid = component_data.get('uuid')
-        if not component_uuid:
-            raise ValidationError(_("UUID is required to sync a component."))
-
-        # Fetch or create the component
-        component = self.search([('uuid', '=', component_uuid)], limit=1)
-        vals = {
-            'uuid': component_uuid,
-            'name': component_data.get('name'),
-            'creation_date': component_data.get('creation_date'),
-            'created_by': self.env['fusion.user'].get_or_create_user(component_data.get('created_by'))
-        }
-
-        if component:
-            component.write(vals)
-        else:
-            component = self.create(vals)
-
-        # Create or update version
-        version_number = component_data.get('version_number')
-        version = self.env['fusion.component.version'].search([
-            ('fusion_component_id', '=', component.id),
-            ('version_number', '=', version_number)
-        ], limit=1)
-
-        if not version:
-            self.env['fusion.component.version'].create({
-                'fusion_component_id': component.id,
-                'version_number': version_number,
-                'revision_date': component_data.get('revision_date'),
-                'modified_by': self.env['fusion.user'].get_or_create_user(component_data.get('modified_by')),
-                'fusion_design_version_id': design_version.id
-            })
-
-        return component
+        # The version is linked to the design version like a flat record of
+        # the sync engine; its assembly lines are not part of this payload
+        self.env['fusion.sync.engine'].sync_records([dict(
+            component_data,
+            type='component_version',
+            design_version_uuid=design_version.uuid,
+        )])
+        return self.with_context(active_test=False).search([('uuid', '=', component_data['uuid'])], limit=1)
+
+    def _ensure_products(self):
+        """Create the missing products of these components in one batch."""
+        missing = self.filtered(lambda component: not component.product_tmpl_id)
+        if missing:
+            templates = self.env['product.template'].sudo().create([
+                {'name': component.name} for component in missing
+            ])
+            self.env['fusion.sync.engine']._write_each(missing, 'product_tmpl_id', templates.ids)
+
+    def write(self, vals):
+        if 'name' in vals or 'uuid' in vals:
+            self.env['fusion.rename.queue']._enqueue(self)
+        return super().write(vals)
+
+    def unlink(self):
+        # Unlink versions through the ORM so the assembly closure stays consistent
+        self.with_context(active_test=False).version_ids.unlink()
+        cache = self.env['fusion.sync.engine']._get_component_cache()
+        for uuid in [uuid for uuid, component_id in cache.items() if component_id in self.ids]:
+            del cache[uuid]
+        return super().unlink()
 
     def name_get(self):
         """Override name_get to include version count."""
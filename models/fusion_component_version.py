@@ -1,112 +1,380 @@
 # -*- coding: utf-8 -*-
+import logging
+from collections import defaultdict
 from odoo import api, fields, models, _
 from odoo.exceptions import UserError, ValidationError
+from ..tools import SEARCH_KEY_OPERATORS, create_trigram_index
+
+_logger = logging.getLogger(__name__)
 
 class FusionComponentVersion(models.Model):
     _name = 'fusion.component.version'
     _description = 'Fusion Component Version'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'fusion.tracking.mixin']
     _order = 'version_number desc, id desc'
     _rec_name = 'display_name'
+    _sql_constraints = [
+        ('uuid_unique', 'unique(uuid)', 'UUID must be unique'),
+        ('component_version_number_unique', 'unique(fusion_component_id, version_number)', 'Version number must be unique per component'),
+        ('version_number_positive', 'CHECK(version_number > 0)', 'Version number must be greater than zero.'),
+    ]
 
     fusion_component_id = fields.Many2one(comodel_name='fusion.component', string='Fusion Component', required=True, ondelete='cascade', tracking=True, index=True, help="Reference to the parent component")
     version_number = fields.Integer(string='Version Number', required=True, tracking=True, help="Version number from Fusion 360")
+    uuid = fields.Char(string='UUID', required=True, index=True, copy=False, help="Unique identifier of the version in Fusion 360, derived from the component UUID and version number when Fusion 360 does not send one")
     active = fields.Boolean(string='Active', default=True, help="If unchecked, it will hide the version without deleting it.")
     revision_date = fields.Datetime(string='Revision Date', required=True, tracking=True, help="Date when this version was created in Fusion 360")
     modified_by = fields.Many2one(comodel_name='fusion.user', string='Modified By', tracking=True, help="User who created this version in Fusion 360")
-    fusion_design_version_id = fields.Many2one(comodel_name='fusion.design.version', string='Design Version', ondelete='cascade', tracking=True, help="Design version where this component is used")
+    fusion_design_version_id = fields.Many2one(comodel_name='fusion.design.version', string='Design Version', ondelete='set null', tracking=True, help="Design version in which this component version was first synchronized")
+    design_version_ids = fields.Many2many(comodel_name='fusion.design.version', relation='fusion_design_version_component_version_rel', column1='component_version_id', column2='design_version_id', string='Used In Design Versions', help="Design versions using this component version")
     external_design_version_id = fields.Many2one(comodel_name='fusion.design.version', string='External Design Version', tracking=True, help="Reference to external design version if this component is linked to another design")
     assembly_lines = fields.One2many(comodel_name='fusion.component.version.assembly.line', inverse_name='fusion_component_version_id', string='Assembly Lines', help="List of child components in this assembly")
     assembly_line_count = fields.Integer(string='Number of Assembly Lines', compute='_compute_assembly_line_count', store=True, help="Number of child components in this assembly")
-    used_in_count = fields.Integer(string='Used In', compute='_compute_used_in_count', help="Number of other components using this version")
+    used_in_line_ids = fields.One2many(comodel_name='fusion.component.version.assembly.line', inverse_name='child_component_version_id', string='Used In Lines', help="Assembly lines using this version as a child")
+    used_in_count = fields.Integer(string='Used In', compute='_compute_used_in_count', store=True, help="Number of other components using this version")
     display_name = fields.Char(string='Display Name', compute='_compute_display_name', store=True, help="Combination of component name and version number")
+    search_key = fields.Char(string='Search Key', compute='_compute_search_key', store=True, help="Component name, version and UUID, indexed for name searches")
+    bom_id = fields.Many2one(comodel_name='mrp.bom', string='Bill of Materials', readonly=True, copy=False, ondelete='set null', help="Bill of materials generated from the assembly lines of this version")
+    sync_hash = fields.Char(string='Sync Hash', readonly=True, copy=False, help="Hash of the Fusion 360 payload subtree this version was last synchronized from")
+    pinned = fields.Boolean(string='Pinned', copy=False, help="Pinned versions are never archived by the version retention policy")
+    descendant_version_ids = fields.Many2many(comodel_name='fusion.component.version', string='Uses (All Levels)', compute='_compute_descendant_version_ids', search='_search_descendant_version_ids', help="Component versions used by this version at any level")
+    where_used_count = fields.Integer(string='Where Used', compute='_compute_where_used_counts', help="Number of assemblies using this version at any level")
+    where_used_design_count = fields.Integer(string='Used In Design Versions', compute='_compute_where_used_counts', help="Number of design versions using this version at any level")
+
+    @api.model
+    def _default_uuid(self, component_uuid, version_number):
+        """Return the UUID of a version synchronized without one."""
+        return '%s:v%s' % (component_uuid, version_number)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            if not vals.get('uuid') and vals.get('fusion_component_id'):
+                component = self.env['fusion.component'].browse(vals['fusion_component_id'])
+                vals['uuid'] = self._default_uuid(component.uuid, vals.get('version_number'))
+        return super().create(vals_list)
 
-    @api.depends('fusion_component_id.name', 'version_number')
+    # Component renames are propagated by fusion.rename.queue in batches
+    @api.depends('fusion_component_id', 'version_number')
     def _compute_display_name(self):
         for version in self:
             version.display_name = f"{version.fusion_component_id.name} (v{version.version_number})"
 
+    @api.depends('fusion_component_id', 'version_number')
+    def _compute_search_key(self):
+        for version in self:
+            component = version.fusion_component_id
+            version.search_key = f"{component.name} v{version.version_number} {component.uuid}"
+
+    def init(self):
+        create_trigram_index(self.env.cr, 'fusion_component_version_search_key_trgm_idx', self._table, 'search_key')
+        # The version lists and counts of the default domain read the active
+        # versions of a parent in the model order; sync lookups also read
+        # archived versions and use the unique version number index. The
+        # former partial index did not cover the id of the model order
+        self.env.cr.execute("DROP INDEX IF EXISTS fusion_component_version_active_component_idx")
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS fusion_component_version_active_order_idx
+                ON fusion_component_version (fusion_component_id, version_number DESC, id DESC)
+             WHERE active
+        """)
+
     @api.depends('assembly_lines')
     def _compute_assembly_line_count(self):
         for version in self:
             version.assembly_line_count = len(version.assembly_lines)
 
+    @api.depends('used_in_line_ids')
     def _compute_used_in_count(self):
+        counts = {}
+        version_ids = self.filtered('id').ids
+        if version_ids:
+            groups = self.env['fusion.component.version.assembly.line'].read_group(
+                [('child_component_version_id', 'in', version_ids)],
+                ['child_component_version_id'],
+                ['child_component_version_id'],
+            )
+            counts = {
+                group['child_component_version_id'][0]: group['child_component_version_id_count']
+                for group in groups
+            }
         for version in self:
-            used_in = self.env['fusion.component.version.assembly.line'].search_count([('child_component_version_id', '=', version.id)])
-            version.used_in_count = used_in
+            version.used_in_count = counts.get(version.id, 0)
 
-    @api.constrains('version_number')
-    def _check_version_number(self):
+    def _compute_descendant_version_ids(self):
+        Closure = self.env['fusion.component.version.closure']
         for version in self:
-            if version.version_number < 1:
-                raise ValidationError(_("Version number must be greater than zero."))
-            duplicate = self.search([
-                ('fusion_component_id', '=', version.fusion_component_id.id),
-                ('version_number', '=', version.version_number),
-                ('id', '!=', version.id)
-            ], limit=1)
-            if duplicate:
-                raise ValidationError(_(
-                    "Version number %(version)s already exists for component %(component)s",
-                    version=version.version_number,
-                    component=version.fusion_component_id.name
-                ))
+            version.descendant_version_ids = self.browse(Closure._get_descendant_ids(version._origin.ids))
+
+    def _search_descendant_version_ids(self, operator, value):
+        if operator not in ('in', '='):
+            raise UserError(_("Operation not supported"))
+        version_ids = [value] if isinstance(value, int) else list(value)
+        if not version_ids:
+            return [(0, '=', 1)]
+        return [('id', 'inselect', (
+            "SELECT ancestor_id FROM fusion_component_version_closure WHERE descendant_id IN %s",
+            [tuple(version_ids)],
+        ))]
+
+    def _compute_where_used_counts(self):
+        versions = self.filtered('id')
+        assembly_counts, design_counts = self.env['fusion.component.version.closure']._get_where_used_counts(
+            [(version.id, version.id) for version in versions]
+        )
+        for version in self:
+            version.where_used_count = assembly_counts.get(version.id, 0)
+            version.where_used_design_count = design_counts.get(version.id, 0)
 
     @api.model
     def sync_component_version(self, component_version_data, design_version_uuid):
-        component_uuid = component_version_data.get('uuid')
-        if not component_uuid:
-            raise ValidationError(_("UUID is required to sync a component."))
-
-        component = self.env['fusion.component'].search([('uuid', '=', component_uuid)], limit=1)
-        if not component:
-            component_data = component_version_data.copy()
-            component_data['uuid'] = component_uuid
-            component = self.env['fusion.component'].create(component_data)
-        
-        version_number_str = component_version_data.get('version_number')
-        if version_number_str is not None:
-            if isinstance(version_number_str, str) and version_number_str.isdigit():
-                version_number = int(version_number_str)
-            elif isinstance(version_number_str, int):
-                version_number = version_number_str
-            else:
-                raise ValidationError(_("Invalid version number format."))
-        else:
-            version_number = 1
+        """Synchronize one component version and its assembly lines through
+        the sync engine, as flat records.
 
-        version = self.search([
-            ('fusion_component_id', '=', component.id),
-            ('version_number', '=', version_number)
+        Args:
+            component_version_data (dict): Component version payload, as
+                nested in ``fusion.design.sync_design_structure``
+            design_version_uuid (str): The design version using it
+        Returns:
+            record: The synchronized component version
+        """
+        Engine = self.env['fusion.sync.engine']
+        records = Engine._component_version_records(component_version_data, design_version_uuid)
+        Engine.sync_records(records)
+        return self.with_context(active_test=False).search([
+            ('fusion_component_id.uuid', '=', component_version_data['uuid']),
+            ('version_number', '=', Engine._parse_version_number(component_version_data.get('version_number'))),
         ], limit=1)
 
-        design_version = self.env['fusion.design.version'].search([('uuid', '=', design_version_uuid)], limit=1)
-        if not design_version:
-            raise ValidationError(_("Design version not found."))
+    def action_unarchive(self):
+        """Restore archived versions together with the versions they use,
+        and pin them so the retention policy keeps them."""
+        versions = self | self._get_descendant_versions()
+        versions.filtered(lambda version: not version.active).write({'active': True})
+        return self.write({'pinned': True})
+
+    def unlink(self):
+        # Assembly lines are removed by the database cascade, which bypasses
+        # the closure maintenance of the assembly line model
+        self.env['fusion.component.version.closure']._remove_edges(self.assembly_lines._closure_edges())
+        return super().unlink()
+
+    def _update_boms(self):
+        """Create or refresh the bills of materials of these assemblies.
+
+        Only the latest version of a component keeps an active BOM, so the
+        BOM lookup of MRP finds a single one per product; the BOMs of
+        superseded versions and of versions without assembly lines are
+        archived. Products, BOMs and BOM lines are created in batches, and
+        the existing BOM lines are only updated or removed where the
+        assembly lines changed.
+        """
+        versions = self.exists().with_context(active_test=False)
+        all_versions = versions.fusion_component_id.with_context(active_test=False).version_ids
+        latest = {}
+        for version in all_versions.sorted('version_number'):
+            latest[version.fusion_component_id.id] = version.id
+        assemblies = versions.browse(list(latest.values())).filtered('assembly_lines')
+        (all_versions - assemblies).bom_id.filtered('active').sudo().write({'active': False})
+        if not assemblies:
+            return
+
+        lines = assemblies.assembly_lines
+        (assemblies.fusion_component_id | lines.child_component_version_id.fusion_component_id)._ensure_products()
 
+        Bom = self.env['mrp.bom'].sudo().with_context(active_test=False)
+        for version in assemblies.filtered('bom_id'):
+            product_tmpl = version.fusion_component_id.product_tmpl_id
+            if not version.bom_id.active or version.bom_id.product_tmpl_id != product_tmpl:
+                version.bom_id.sudo().write({'active': True, 'product_tmpl_id': product_tmpl.id})
+        new_assemblies = assemblies.filtered(lambda version: not version.bom_id)
+        new_boms = Bom.create([{
+            'product_tmpl_id': version.fusion_component_id.product_tmpl_id.id,
+            'product_qty': 1,
+            'code': version.display_name,
+        } for version in new_assemblies])
+        self.env['fusion.sync.engine']._write_each(new_assemblies, 'bom_id', new_boms.ids)
 
-        vals = {
-            'fusion_component_id': component.id,
-            'version_number': version_number,
-            'revision_date': component_version_data.get('revision_date'),
-            'modified_by': self.env['fusion.user'].get_or_create_user(component_version_data.get('modified_by')),
-            'fusion_design_version_id': design_version.id
+        quantities = defaultdict(int)
+        for line in lines:
+            product = line.child_component_version_id.fusion_component_id.product_tmpl_id.product_variant_id
+            quantities[(line.fusion_component_version_id.bom_id.id, product.id)] += line.quantity
+
+        obsolete_lines = self.env['mrp.bom.line']
+        for bom_line in assemblies.bom_id.sudo().bom_line_ids:
+            key = (bom_line.bom_id.id, bom_line.product_id.id)
+            if key not in quantities:
+                # Removed from the assembly, or a second line of one product
+                obsolete_lines |= bom_line
+                continue
+            quantity = quantities.pop(key)
+            if bom_line.product_qty != quantity:
+                bom_line.write({'product_qty': quantity})
+        obsolete_lines.unlink()
+        self.env['mrp.bom.line'].sudo().create([{
+            'bom_id': bom_id,
+            'product_id': product_id,
+            'product_qty': quantity,
+        } for (bom_id, product_id), quantity in quantities.items()])
+
+    def action_update_bom(self):
+        self._update_boms()
+        return True
+
+    def _get_where_used_domain(self):
+        """Return the domain of the assemblies using these versions at any level."""
+        return [('descendant_version_ids', 'in', self.ids)]
+
+    def _get_design_where_used_domain(self):
+        """Return the domain of the design versions using these versions at any level."""
+        return [('all_component_version_ids', 'in', self.ids)]
+
+    def get_where_used(self, offset=0, limit=80):
+        """Return the assemblies and design versions using these versions at
+        any level, one page at a time.
+
+        Ancestors are read from the assembly closure, so the cost does not
+        depend on the depth of the assembly tree.
+
+        Args:
+            offset (int): Number of records to skip in both lists
+            limit (int): Maximum number of records in both lists
+        Returns:
+            dict: ``component_versions`` and ``design_versions``, each with
+                the total ``count`` and the ``records`` of the page
+        """
+        DesignVersion = self.env['fusion.design.version']
+        assembly_domain = self._get_where_used_domain()
+        design_domain = self._get_design_where_used_domain()
+        return {
+            'component_versions': {
+                'count': self.search_count(assembly_domain),
+                'records': self.search_read(
+                    assembly_domain, ['display_name', 'fusion_component_id', 'version_number'],
+                    offset=offset, limit=limit,
+                ),
+            },
+            'design_versions': {
+                'count': DesignVersion.search_count(design_domain),
+                'records': DesignVersion.search_read(
+                    design_domain, ['display_name', 'fusion_design_id', 'version_number'],
+                    offset=offset, limit=limit,
+                ),
+            },
         }
 
-        if version:
-            version.write(vals)
-        else:
-            version = self.create(vals)
+    def action_view_where_used(self):
+        return {
+            'name': _("Where Used"),
+            'type': 'ir.actions.act_window',
+            'res_model': 'fusion.component.version',
+            'view_mode': 'tree,form',
+            'domain': self._get_where_used_domain(),
+            'context': {'create': False},
+        }
+
+    def action_view_where_used_designs(self):
+        return {
+            'name': _("Used In Design Versions"),
+            'type': 'ir.actions.act_window',
+            'res_model': 'fusion.design.version',
+            'view_mode': 'tree,form',
+            'domain': self._get_design_where_used_domain(),
+            'context': {'create': False},
+        }
+
+    def _get_ancestor_versions(self):
+        """Return every assembly using these versions at any level."""
+        ancestor_ids = self.env['fusion.component.version.closure']._get_ancestor_ids(self.ids)
+        return self.browse(ancestor_ids)
+
+    def _get_descendant_versions(self):
+        """Return every component version used by these versions at any level."""
+        descendant_ids = self.env['fusion.component.version.closure']._get_descendant_ids(self.ids)
+        return self.browse(descendant_ids)
+
+    _EXPLODE_BOM_QUERY = """
+        WITH RECURSIVE bom(line_id, parent_id, component_version_id, quantity, total_quantity, level, sort_path) AS (
+            SELECT line.id, line.fusion_component_version_id, line.child_component_version_id,
+                   line.quantity::bigint, line.quantity::bigint, 1, ARRAY[line.sequence, line.id]
+              FROM fusion_component_version_assembly_line line
+             WHERE line.fusion_component_version_id = %(root_id)s
+             UNION ALL
+            SELECT line.id, line.fusion_component_version_id, line.child_component_version_id,
+                   line.quantity::bigint, bom.total_quantity * line.quantity, bom.level + 1,
+                   bom.sort_path || ARRAY[line.sequence, line.id]
+              FROM bom
+              JOIN fusion_component_version_assembly_line line
+                ON line.fusion_component_version_id = bom.component_version_id
+             WHERE %(levels)s::integer IS NULL OR bom.level < %(levels)s::integer
+        ),
+        nodes AS (
+            SELECT bom.*,
+                   (bom.level = %(levels)s::integer OR NOT EXISTS (
+                        SELECT 1
+                          FROM fusion_component_version_assembly_line child
+                         WHERE child.fusion_component_version_id = bom.component_version_id
+                   )) AS is_leaf
+              FROM bom
+        )
+    """
+
+    def explode_bom(self, levels=None, flatten=True):
+        """Return the bill of materials of this version across all levels.
+
+        The assembly tree is resolved with a single recursive query and
+        quantities are multiplied along every path.
 
-        assembly_lines_data = component_version_data.get('assembly_lines')
-        if assembly_lines_data:
-            for assembly_line_data in assembly_lines_data:
-                self.env['fusion.component.version.assembly.line'].sync_assembly_line(
-                    assembly_line_data, version.id
-                )
+        Args:
+            levels (int): Maximum depth to explode, all levels when None
+            flatten (bool): Aggregate the leaf parts instead of returning the
+                indented tree
+        Returns:
+            list: When flattening, one dictionary per leaf component version
+                with its total quantity. Otherwise one dictionary per assembly
+                line in tree order, with its level, own quantity and total
+                quantity.
+        """
+        self.ensure_one()
+        if levels is not None and int(levels) < 1:
+            raise ValidationError(_("The number of levels to explode must be greater than zero."))
+        self.env['fusion.component.version.assembly.line'].flush(
+            ['fusion_component_version_id', 'child_component_version_id', 'quantity', 'sequence']
+        )
+        self.flush(['display_name'])
+        params = {'root_id': self.id, 'levels': int(levels) if levels is not None else None}
+        if flatten:
+            self.env.cr.execute(self._EXPLODE_BOM_QUERY + """
+                SELECT nodes.component_version_id, version.display_name, SUM(nodes.total_quantity)
+                  FROM nodes
+                  JOIN fusion_component_version version ON version.id = nodes.component_version_id
+                 WHERE nodes.is_leaf
+              GROUP BY nodes.component_version_id, version.display_name
+              ORDER BY version.display_name, nodes.component_version_id
+            """, params)
+            return [{
+                'component_version_id': version_id,
+                'display_name': display_name,
+                'quantity': int(quantity),
+            } for version_id, display_name, quantity in self.env.cr.fetchall()]
 
-        return version
+        self.env.cr.execute(self._EXPLODE_BOM_QUERY + """
+            SELECT nodes.line_id, nodes.parent_id, nodes.component_version_id, version.display_name,
+                   nodes.quantity, nodes.total_quantity, nodes.level, nodes.is_leaf
+              FROM nodes
+              JOIN fusion_component_version version ON version.id = nodes.component_version_id
+          ORDER BY nodes.sort_path
+        """, params)
+        return [{
+            'line_id': line_id,
+            'parent_id': parent_id,
+            'component_version_id': version_id,
+            'display_name': display_name,
+            'quantity': int(quantity),
+            'total_quantity': int(total_quantity),
+            'level': level,
+            'is_leaf': bool(is_leaf),
+        } for line_id, parent_id, version_id, display_name, quantity, total_quantity, level, is_leaf in self.env.cr.fetchall()]
 
     def name_get(self):
         return [(version.id, version.display_name) for version in self]
@@ -118,6 +386,8 @@ class FusionComponentVersion(models.Model):
         if name:
             if name.isdigit():
                 domain = [('version_number', '=', int(name))]
+            elif operator in SEARCH_KEY_OPERATORS:
+                domain = [('search_key', operator, name)]
             else:
                 domain = [('fusion_component_id.name', operator, name)]
         return self._search(domain + args, limit=limit)
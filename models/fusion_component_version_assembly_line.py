@@ -5,9 +5,12 @@ from odoo.exceptions import UserError, ValidationError
 class FusionComponentVersionAssemblyLine(models.Model):
     _name = 'fusion.component.version.assembly.line'
     _description = 'Fusion Component Version Assembly Line'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'fusion.tracking.mixin']
     _order = 'sequence, id'
     _rec_name = 'display_name'
+    _sql_constraints = [
+        ('parent_child_unique', 'unique(fusion_component_version_id, child_component_version_id)', 'A component version can only appear once in an assembly'),
+    ]
 
     fusion_component_version_id = fields.Many2one(
         comodel_name='fusion.component.version',
@@ -35,15 +38,23 @@ class FusionComponentVersionAssemblyLine(models.Model):
     )
     sequence = fields.Integer(string='Sequence', default=10, help="Sequence order in the assembly list")
     child_component_name = fields.Char(
-        string='Component Name', related='child_component_version_id.fusion_component_id.name', store=True, help="Name of the child component"
+        string='Component Name', compute='_compute_child_fields', store=True, help="Name of the child component"
     )
     child_version_number = fields.Integer(
-        string='Version', related='child_component_version_id.version_number', store=True, help="Version number of the child component"
+        string='Version', compute='_compute_child_fields', store=True, help="Version number of the child component"
     )
     display_name = fields.Char(
         string='Display Name', compute='_compute_display_name', store=True, help="Combination of component name, version and quantity"
     )
 
+    # Not related fields: component renames are propagated by
+    # fusion.rename.queue in batches instead of inside the renaming request
+    @api.depends('child_component_version_id', 'child_component_version_id.version_number')
+    def _compute_child_fields(self):
+        for line in self:
+            line.child_component_name = line.child_component_version_id.fusion_component_id.name
+            line.child_version_number = line.child_component_version_id.version_number
+
     @api.depends('child_component_name', 'child_version_number', 'quantity')
     def _compute_display_name(self):
         for line in self:
@@ -60,22 +71,52 @@ class FusionComponentVersionAssemblyLine(models.Model):
         for line in self:
             if line.fusion_component_version_id == line.child_component_version_id:
                 raise ValidationError(_("A component cannot reference itself in its assembly."))
-            if self._has_recursive_reference(line.fusion_component_version_id, line.child_component_version_id):
-                raise ValidationError(_("Recursive assembly reference detected."))
 
     def _has_recursive_reference(self, parent_version, child_version):
-        child_assemblies = self.search([('fusion_component_version_id', '=', child_version.id)])
-        for assembly in child_assemblies:
-            if assembly.child_component_version_id == parent_version:
-                return True
-            if self._has_recursive_reference(parent_version, assembly.child_component_version_id):
-                return True
-        return False
+        return self.env['fusion.component.version.closure']._path_exists(child_version.id, parent_version.id)
+
+    def _closure_edges(self):
+        return [(line.fusion_component_version_id.id, line.child_component_version_id.id) for line in self]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        # Cycles are detected while the edges are added to the closure
+        self.env['fusion.component.version.closure']._add_edges(lines._closure_edges())
+        self.env['fusion.assembly.change']._log_changes(lines.fusion_component_version_id.ids)
+        return lines
+
+    def write(self, vals):
+        relink = {'fusion_component_version_id', 'child_component_version_id'} & set(vals)
+        Closure = self.env['fusion.component.version.closure']
+        changed_versions = self.fusion_component_version_id
+        if relink:
+            Closure._remove_edges(self._closure_edges())
+        res = super().write(vals)
+        if relink:
+            Closure._add_edges(self._closure_edges())
+        if {'fusion_component_version_id', 'child_component_version_id', 'quantity', 'sequence'} & set(vals):
+            changed_versions |= self.fusion_component_version_id
+            self.env['fusion.assembly.change']._log_changes(changed_versions.ids)
+        return res
+
+    def unlink(self):
+        self.env['fusion.component.version.closure']._remove_edges(self._closure_edges())
+        self.env['fusion.assembly.change']._log_changes(self.fusion_component_version_id.ids)
+        return super().unlink()
 
     @api.model
     def sync_assembly_line(self, assembly_line_data, component_version_id):
-        child_component_uuid = assembly_line_data.get('child_component_version_id')
-        child_component_version = self.env['fusion.component.version'].search([('uuid', '=', child_component_uuid)], limit=1)
+        ComponentVersion = self.env['fusion.component.version']
+        if assembly_line_data.get('child_version_uuid'):
+            domain = [('uuid', '=', assembly_line_data['child_version_uuid'])]
+        else:
+            # The child is referenced by its component UUID, and its version
+            # number when given
+            domain = [('fusion_component_id.uuid', '=', assembly_line_data.get('child_component_version_id'))]
+            if assembly_line_data.get('child_version_number') is not None:
+                domain.append(('version_number', '=', int(assembly_line_data['child_version_number'])))
+        child_component_version = ComponentVersion.search(domain, order='version_number desc', limit=1)
         if not child_component_version:
             raise ValidationError(_("Child component version not found."))
 
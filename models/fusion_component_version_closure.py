@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+
+class FusionComponentVersionClosure(models.Model):
+    """Transitive closure of the assembly graph.
+
+    Every row links a component version to one of its direct or indirect
+    children. ``path_count`` holds the number of distinct assembly paths
+    between both versions, which lets shared sub-assemblies be added and
+    removed incrementally. Rows are maintained in SQL by the assembly line
+    model and are never written through the ORM.
+    """
+    _name = 'fusion.component.version.closure'
+    _description = 'Fusion Component Version Assembly Closure'
+    _log_access = False
+    _sql_constraints = [
+        ('ancestor_descendant_uniq', 'unique(ancestor_id, descendant_id)', 'Closure rows must be unique!'),
+    ]
+
+    ancestor_id = fields.Many2one(comodel_name='fusion.component.version', string='Ancestor', required=True, ondelete='cascade', readonly=True, help="Assembly containing the descendant at any level")
+    descendant_id = fields.Many2one(comodel_name='fusion.component.version', string='Descendant', required=True, ondelete='cascade', readonly=True, index=True, help="Component version used by the ancestor at any level")
+    path_count = fields.Integer(string='Path Count', required=True, default=1, readonly=True, help="Number of distinct assembly paths from the ancestor to the descendant")
+
+    def init(self):
+        self.env.cr.execute("SELECT 1 FROM fusion_component_version_closure LIMIT 1")
+        if not self.env.cr.fetchone():
+            self._rebuild()
+
+    @api.model
+    def _rebuild(self):
+        """Recompute the whole closure from the assembly lines."""
+        self.env['fusion.component.version.assembly.line'].flush(
+            ['fusion_component_version_id', 'child_component_version_id']
+        )
+        self.env.cr.execute("DELETE FROM fusion_component_version_closure")
+        self.env.cr.execute("""
+            WITH RECURSIVE paths(ancestor_id, descendant_id) AS (
+                SELECT fusion_component_version_id, child_component_version_id
+                  FROM fusion_component_version_assembly_line
+                 UNION ALL
+                SELECT paths.ancestor_id, line.child_component_version_id
+                  FROM paths
+                  JOIN fusion_component_version_assembly_line line
+                    ON line.fusion_component_version_id = paths.descendant_id
+            )
+            INSERT INTO fusion_component_version_closure (ancestor_id, descendant_id, path_count)
+            SELECT ancestor_id, descendant_id, count(*)
+              FROM paths
+          GROUP BY ancestor_id, descendant_id
+        """)
+        self.invalidate_cache()
+
+    @api.model
+    def _path_exists(self, ancestor_id, descendant_id):
+        """Return whether ``descendant_id`` is used by ``ancestor_id`` at any level."""
+        self.env.cr.execute("""
+            SELECT 1
+              FROM fusion_component_version_closure
+             WHERE ancestor_id = %s AND descendant_id = %s
+        """, (ancestor_id, descendant_id))
+        return bool(self.env.cr.fetchone())
+
+    # Chains of the given edges joined by closure paths: every row stands for
+    # a sequence of edges, from the parent of the first one to the child of
+    # the last one, and the number of closure paths linking them. With the
+    # closure of the graph without the edges, every new path is the chain of
+    # the edges it uses, so it is counted exactly once.
+    _EDGE_CHAINS_QUERY = """
+        WITH RECURSIVE edges(id, parent_id, child_id) AS (
+            SELECT row_number() OVER (), parent_id, child_id
+              FROM unnest(%(parents)s::integer[], %(children)s::integer[]) AS edge(parent_id, child_id)
+        ),
+        links(ancestor_id, descendant_id, path_count) AS (
+            SELECT ancestor_id, descendant_id, path_count
+              FROM fusion_component_version_closure
+             WHERE ancestor_id IN (SELECT child_id FROM edges)
+               AND descendant_id IN (SELECT parent_id FROM edges)
+             UNION ALL
+            SELECT DISTINCT child_id, child_id, 1 FROM edges
+        ),
+        chains(parent_id, child_id, path_count, edge_ids) AS (
+            SELECT parent_id, child_id, 1::bigint, ARRAY[id] FROM edges
+             UNION ALL
+            SELECT chains.parent_id, edges.child_id, chains.path_count * links.path_count, chains.edge_ids || edges.id
+              FROM chains
+              JOIN links ON links.ancestor_id = chains.child_id
+              JOIN edges ON edges.parent_id = links.descendant_id
+             -- Only reached when the edges close a cycle, which is rejected
+             WHERE edges.id <> ALL(chains.edge_ids)
+        )
+    """
+
+    # Closure rows going through the chains, extended by the ancestors of
+    # their first parent and the descendants of their last child
+    _CHAIN_PATHS_QUERY = """
+        SELECT ancestors.ancestor_id, descendants.descendant_id,
+               sum({sign}ancestors.path_count * chains.path_count * descendants.path_count) AS path_count
+          FROM chains
+          JOIN (SELECT ancestor_id, descendant_id, path_count
+                  FROM fusion_component_version_closure
+                 WHERE descendant_id IN (SELECT parent_id FROM edges)
+                 UNION ALL
+                SELECT DISTINCT parent_id, parent_id, 1 FROM edges) ancestors
+            ON ancestors.descendant_id = chains.parent_id
+          JOIN (SELECT ancestor_id, descendant_id, path_count
+                  FROM fusion_component_version_closure
+                 WHERE ancestor_id IN (SELECT child_id FROM edges)
+                 UNION ALL
+                SELECT DISTINCT child_id, child_id, 1 FROM edges) descendants
+            ON descendants.ancestor_id = chains.child_id
+      GROUP BY ancestors.ancestor_id, descendants.descendant_id
+    """
+
+    @api.model
+    def _edge_params(self, edges):
+        parents, children = zip(*edges)
+        return {'parents': list(parents), 'children': list(children)}
+
+    @api.model
+    def _add_edges(self, edges):
+        """Register assembly edges in the closure, with two queries for any
+        number of edges.
+
+        Args:
+            edges (list): ``(parent_id, child_id)`` pairs, one per assembly
+                line, not registered yet
+        Raises:
+            ValidationError: If the edges would close an assembly cycle
+        """
+        if not edges:
+            return
+        params = self._edge_params(edges)
+        self.env.cr.execute(self._EDGE_CHAINS_QUERY + """
+            SELECT 1
+              FROM chains
+             WHERE chains.child_id = chains.parent_id
+                OR EXISTS (SELECT 1
+                             FROM fusion_component_version_closure closure
+                            WHERE closure.ancestor_id = chains.child_id
+                              AND closure.descendant_id = chains.parent_id)
+             LIMIT 1
+        """, params)
+        if self.env.cr.fetchone():
+            raise ValidationError(_("Recursive assembly reference detected."))
+        self.env.cr.execute(self._EDGE_CHAINS_QUERY + """
+            INSERT INTO fusion_component_version_closure (ancestor_id, descendant_id, path_count)
+            {}
+            ON CONFLICT (ancestor_id, descendant_id)
+            DO UPDATE SET path_count = fusion_component_version_closure.path_count + EXCLUDED.path_count
+        """.format(self._CHAIN_PATHS_QUERY.format(sign='')), params)
+        self.invalidate_cache()
+
+    @api.model
+    def _remove_edges(self, edges):
+        """Unregister assembly edges from the closure, with two queries for
+        any number of edges.
+
+        The closure still holds the edges, so a path using several of them
+        appears in the chains of every subsequence of its edges; chains are
+        counted with alternating signs by length so that every such path is
+        removed exactly once.
+
+        Args:
+            edges (list): ``(parent_id, child_id)`` pairs, one per assembly
+                line, still registered
+        """
+        if not edges:
+            return
+        self.env.cr.execute(self._EDGE_CHAINS_QUERY + """
+            UPDATE fusion_component_version_closure closure
+               SET path_count = closure.path_count - edge_paths.path_count
+              FROM ({}) edge_paths
+             WHERE closure.ancestor_id = edge_paths.ancestor_id
+               AND closure.descendant_id = edge_paths.descendant_id
+        """.format(self._CHAIN_PATHS_QUERY.format(
+            sign="CASE WHEN cardinality(chains.edge_ids) %% 2 = 1 THEN 1 ELSE -1 END * ",
+        )), self._edge_params(edges))
+        self.env.cr.execute("DELETE FROM fusion_component_version_closure WHERE path_count <= 0")
+        self.invalidate_cache()
+
+    @api.model
+    def _get_ancestor_ids(self, version_ids):
+        """Return the ids of all assemblies using any of ``version_ids``."""
+        if not version_ids:
+            return []
+        self.env.cr.execute("""
+            SELECT DISTINCT ancestor_id
+              FROM fusion_component_version_closure
+             WHERE descendant_id IN %s
+        """, [tuple(version_ids)])
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _get_descendant_ids(self, version_ids):
+        """Return the ids of all component versions used by ``version_ids``."""
+        if not version_ids:
+            return []
+        self.env.cr.execute("""
+            SELECT DISTINCT descendant_id
+              FROM fusion_component_version_closure
+             WHERE ancestor_id IN %s
+        """, [tuple(version_ids)])
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    @api.model
+    def _get_where_used_counts(self, targets):
+        """Count the active assemblies and design versions using component
+        versions at any level.
+
+        Args:
+            targets (list): ``(key, version_id)`` pairs; counts are aggregated
+                per key, so several versions can be counted together
+        Returns:
+            tuple: Assembly counts and design version counts, keyed by key
+        """
+        if not targets:
+            return {}, {}
+        self.env['fusion.component.version'].flush(['active', 'design_version_ids'])
+        self.env['fusion.design.version'].flush(['active'])
+        keys, version_ids = zip(*targets)
+        self.env.cr.execute("""
+            WITH targets(target, version_id) AS (
+                SELECT * FROM unnest(%s::integer[], %s::integer[])
+            ),
+            assemblies AS (
+                SELECT targets.target, closure.ancestor_id AS version_id
+                  FROM targets
+                  JOIN fusion_component_version_closure closure ON closure.descendant_id = targets.version_id
+                  JOIN fusion_component_version version ON version.id = closure.ancestor_id AND version.active
+            ),
+            designs AS (
+                SELECT users.target, usage.design_version_id
+                  FROM (SELECT * FROM targets UNION SELECT * FROM assemblies) users
+                  JOIN fusion_design_version_component_version_rel usage ON usage.component_version_id = users.version_id
+                  JOIN fusion_design_version design_version ON design_version.id = usage.design_version_id AND design_version.active
+            )
+            SELECT target, 'assembly', count(DISTINCT version_id) FROM assemblies GROUP BY target
+             UNION ALL
+            SELECT target, 'design', count(DISTINCT design_version_id) FROM designs GROUP BY target
+        """, [list(keys), list(version_ids)])
+        assembly_counts, design_counts = {}, {}
+        for target, kind, count in self.env.cr.fetchall():
+            (assembly_counts if kind == 'assembly' else design_counts)[target] = count
+        return assembly_counts, design_counts
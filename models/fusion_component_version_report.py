@@ -0,0 +1,70 @@
+from odoo import fields, models
+
+
+class FusionComponentVersionReport(models.Model):
+    _name = 'fusion.component.version.report'
+    _inherit = 'fusion.report.mixin'
+    _description = 'Fusion Component Version Analysis'
+    _auto = False
+    _order = 'revision_date desc'
+
+    component_id = fields.Many2one(comodel_name='fusion.component', string='Component', readonly=True)
+    component_version_id = fields.Many2one(comodel_name='fusion.component.version', string='Component Version', readonly=True)
+    version_number = fields.Integer(string='Version Number', readonly=True, group_operator='max')
+    revision_date = fields.Datetime(string='Revision Date', readonly=True)
+    modified_by = fields.Many2one(comodel_name='fusion.user', string='Modified By', readonly=True)
+    active = fields.Boolean(string='Active', readonly=True)
+    is_assembly = fields.Boolean(string='Is Assembly', readonly=True)
+    assembly_size = fields.Selection(
+        selection=[
+            ('0', 'Part'),
+            ('1-10', '1-10 Lines'),
+            ('11-50', '11-50 Lines'),
+            ('51-200', '51-200 Lines'),
+            ('200+', 'Over 200 Lines'),
+        ],
+        string='Assembly Size',
+        readonly=True,
+    )
+    assembly_line_count = fields.Integer(string='Assembly Lines', readonly=True)
+    part_quantity = fields.Integer(string='Part Quantity', readonly=True, help="Sum of the quantities of the direct assembly lines")
+    used_in_count = fields.Integer(string='Used In Assemblies', readonly=True, help="Number of assemblies using the version directly")
+    where_used_count = fields.Integer(string='Used In Assemblies (All Levels)', readonly=True)
+    used_in_design_count = fields.Integer(string='Used In Design Versions', readonly=True)
+
+    def _query(self):
+        return """
+            SELECT version.id,
+                   version.id AS component_version_id,
+                   version.fusion_component_id AS component_id,
+                   version.version_number,
+                   version.revision_date,
+                   version.modified_by,
+                   version.active,
+                   COALESCE(lines.line_count, 0) > 0 AS is_assembly,
+                   CASE
+                       WHEN COALESCE(lines.line_count, 0) = 0 THEN '0'
+                       WHEN lines.line_count <= 10 THEN '1-10'
+                       WHEN lines.line_count <= 50 THEN '11-50'
+                       WHEN lines.line_count <= 200 THEN '51-200'
+                       ELSE '200+'
+                   END AS assembly_size,
+                   COALESCE(lines.line_count, 0) AS assembly_line_count,
+                   COALESCE(lines.quantity, 0) AS part_quantity,
+                   COALESCE(parents.parent_count, 0) AS used_in_count,
+                   COALESCE(ancestors.ancestor_count, 0) AS where_used_count,
+                   COALESCE(usages.design_version_count, 0) AS used_in_design_count
+              FROM fusion_component_version version
+         LEFT JOIN (SELECT fusion_component_version_id AS version_id, count(*) AS line_count, sum(quantity) AS quantity
+                      FROM fusion_component_version_assembly_line
+                  GROUP BY fusion_component_version_id) lines ON lines.version_id = version.id
+         LEFT JOIN (SELECT child_component_version_id AS version_id, count(*) AS parent_count
+                      FROM fusion_component_version_assembly_line
+                  GROUP BY child_component_version_id) parents ON parents.version_id = version.id
+         LEFT JOIN (SELECT descendant_id AS version_id, count(*) AS ancestor_count
+                      FROM fusion_component_version_closure
+                  GROUP BY descendant_id) ancestors ON ancestors.version_id = version.id
+         LEFT JOIN (SELECT component_version_id AS version_id, count(*) AS design_version_count
+                      FROM fusion_design_version_component_version_rel
+                  GROUP BY component_version_id) usages ON usages.version_id = version.id
+        """
@@ -1,14 +1,13 @@
 import logging
-import json
-from odoo import api, fields, models, _
-from odoo.exceptions import UserError, ValidationError
+from odoo import api, fields, models
+from ..tools import create_trigram_index
 
 _logger = logging.getLogger(__name__)
 
 class FusionDesign(models.Model):
     _name = 'fusion.design'
     _description = 'Fusion Design Document'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'fusion.tracking.mixin']
     _order = 'name, id'
     _sql_constraints = [
         ('uuid_unique', 'unique(uuid)', 'UUID must be unique'),
@@ -22,41 +21,53 @@ class FusionDesign(models.Model):
     version_ids = fields.One2many(comodel_name='fusion.design.version', inverse_name='fusion_design_id', string='Design Versions', help="List of all versions of this design")
     version_count = fields.Integer(string='Version Count', compute='_compute_version_count', store=True, help="Number of versions for this design")
 
+    def init(self):
+        create_trigram_index(self.env.cr, 'fusion_design_name_trgm_idx', self._table, 'name')
+
     @api.depends('version_ids')
     def _compute_version_count(self):
         for design in self:
             design.version_count = len(design.version_ids)
 
+    def write(self, vals):
+        if 'name' in vals or 'uuid' in vals:
+            self.env['fusion.rename.queue']._enqueue(self)
+        return super().write(vals)
+
     @api.model
     def sync_design_structure(self, design_structure):
-        design_data = design_structure.get('fusion_design')
-        if not design_data:
-            raise ValidationError(_("Invalid design structure: Missing fusion_design data."))
+        """Synchronize a complete design structure from Fusion 360.
 
-        design_uuid = design_data.get('uuid')
-        if not design_uuid:
-            raise ValidationError(_("UUID is required to sync a Fusion design."))
+        The nested payload is handed to the batched sync engine, which
+        resolves all UUIDs with one search per model and creates or updates
+        records in groups.
 
-        design = self.search([('uuid', '=', design_uuid)], limit=1)
-        design_vals = {
-            'uuid': design_uuid,
-            'name': design_data.get('name'),
-            'creation_date': design_data.get('creation_date'),
-            'created_by': self.env['fusion.user'].get_or_create_user(design_data.get('created_by'))
-        }
+        Args:
+            design_structure (dict): Dictionary with a ``fusion_design`` key
+                holding the design, its versions, component versions and
+                assembly lines
+        Returns:
+            record: The synchronized design record
+        """
+        return self.env['fusion.sync.engine'].sync_payloads([design_structure])
 
-        if design:
-            design.write(design_vals)
-        else:
-            design = self.create(design_vals)
 
-        versions_data = design_data.get('versions')
-        if versions_data:
-            for version_data in versions_data:
-                self.env['fusion.design.version'].sync_design_version(version_data, design.id)
+    @api.model
+    def sync_design_structures(self, design_structures):
+        """Synchronize many design structures in one call.
 
-        return design
+        Every design is synchronized in its own savepoint, so a failing
+        design does not roll back the others.
 
+        Args:
+            design_structures (list): Design structures as accepted by
+                ``sync_design_structure``
+        Returns:
+            list: One summary dictionary per design with its ``uuid``,
+                ``name``, ``status`` (``done`` or ``failed``) and either the
+                ``design_id`` or the ``error``
+        """
+        return self.env['fusion.sync.engine'].sync_design_batch(design_structures)
 
     def name_get(self):
         result = []
@@ -1,15 +1,22 @@
 import logging
-from odoo import api, fields, models, _
+from collections import defaultdict
+from odoo import api, fields, models, tools, _
 from odoo.exceptions import UserError, ValidationError
+from ..tools import SEARCH_KEY_OPERATORS, create_trigram_index
 
 _logger = logging.getLogger(__name__)
 
 class FusionDesignVersion(models.Model):
     _name = 'fusion.design.version'
     _description = 'Fusion Design Version'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'fusion.tracking.mixin']
     _order = 'version_number desc, id desc'
     _rec_name = 'display_name'
+    _sql_constraints = [
+        ('uuid_unique', 'unique(uuid)', 'UUID must be unique'),
+        ('design_version_number_unique', 'unique(fusion_design_id, version_number)', 'Version number must be unique per design'),
+        ('version_number_positive', 'CHECK(version_number > 0)', 'Version number must be greater than zero.'),
+    ]
 
     fusion_design_id = fields.Many2one(comodel_name='fusion.design', string='Fusion Design', required=True, ondelete='cascade', tracking=True, index=True, help="Reference to the parent design")
     version_number = fields.Integer(string='Version Number', required=True, tracking=True, help="Version number from Fusion 360")
@@ -17,67 +24,295 @@ class FusionDesignVersion(models.Model):
     active = fields.Boolean(string='Active', default=True, help="If unchecked, it will hide the version without deleting it.")
     revision_date = fields.Datetime(string='Revision Date', required=True, tracking=True, help="Date when this version was created in Fusion 360")
     modified_by = fields.Many2one(comodel_name='fusion.user', string='Modified By', tracking=True, help="User who created this version in Fusion 360")
-    component_version_ids = fields.One2many(comodel_name='fusion.component.version', inverse_name='fusion_design_version_id', string='Component Versions', help="Components used in this version of the design")
+    component_version_ids = fields.Many2many(comodel_name='fusion.component.version', relation='fusion_design_version_component_version_rel', column1='design_version_id', column2='component_version_id', string='Component Versions', help="Components used in this version of the design")
+    all_component_version_ids = fields.Many2many(comodel_name='fusion.component.version', string='Component Versions (All Levels)', compute='_compute_all_component_version_ids', search='_search_all_component_version_ids', help="Component versions used by this version, directly or inside its assemblies")
     component_count = fields.Integer(string='Component Count', compute='_compute_component_count', store=True, help="Number of components in this version")
     display_name = fields.Char(string='Display Name', compute='_compute_display_name', store=True, help="Combination of design name and version number")
+    search_key = fields.Char(string='Search Key', compute='_compute_search_key', store=True, help="Design name, version and UUIDs, indexed for name searches")
+    sync_hash = fields.Char(string='Sync Hash', readonly=True, copy=False, help="Hash of the Fusion 360 payload subtree this version was last synchronized from")
+    pinned = fields.Boolean(string='Pinned', copy=False, help="Pinned versions are never archived by the version retention policy")
 
-    @api.depends('fusion_design_id.name', 'version_number')
+    # Design renames are propagated by fusion.rename.queue in batches
+    @api.depends('fusion_design_id', 'version_number')
     def _compute_display_name(self):
         for version in self:
             version.display_name = f"{version.fusion_design_id.name} (v{version.version_number})"
 
+    @api.depends('fusion_design_id', 'version_number', 'uuid')
+    def _compute_search_key(self):
+        for version in self:
+            design = version.fusion_design_id
+            version.search_key = f"{design.name} v{version.version_number} {version.uuid} {design.uuid}"
+
+    def init(self):
+        create_trigram_index(self.env.cr, 'fusion_design_version_search_key_trgm_idx', self._table, 'search_key')
+        # The version lists and counts of the default domain read the active
+        # versions of a parent in the model order; sync lookups also read
+        # archived versions and use the unique version number index. The
+        # former partial index did not cover the id of the model order
+        self.env.cr.execute("DROP INDEX IF EXISTS fusion_design_version_active_design_idx")
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS fusion_design_version_active_order_idx
+                ON fusion_design_version (fusion_design_id, version_number DESC, id DESC)
+             WHERE active
+        """)
+
     @api.depends('component_version_ids')
     def _compute_component_count(self):
         for version in self:
             version.component_count = len(version.component_version_ids)
 
-    @api.constrains('version_number')
-    def _check_version_number(self):
+    def _compute_all_component_version_ids(self):
+        Closure = self.env['fusion.component.version.closure']
         for version in self:
-            if version.version_number < 1:
-                raise ValidationError(_("Version number must be greater than zero."))
-            duplicate = self.search([
-                ('fusion_design_id', '=', version.fusion_design_id.id),
-                ('version_number', '=', version.version_number),
-                ('id', '!=', version.id)
-            ], limit=1)
-            if duplicate:
-                raise ValidationError(_(
-                    "Version number %(version)s already exists for design %(design)s",
-                    version=version.version_number,
-                    design=version.fusion_design_id.name
-                ))
+            component_versions = version.component_version_ids
+            version.all_component_version_ids = component_versions | component_versions.browse(
+                Closure._get_descendant_ids(component_versions._origin.ids)
+            )
+
+    def _search_all_component_version_ids(self, operator, value):
+        if operator not in ('in', '='):
+            raise UserError(_("Operation not supported"))
+        version_ids = [value] if isinstance(value, int) else list(value)
+        if not version_ids:
+            return [(0, '=', 1)]
+        self.flush(['component_version_ids'])
+        return [('id', 'inselect', ("""
+            SELECT usage.design_version_id
+              FROM fusion_design_version_component_version_rel usage
+             WHERE usage.component_version_id IN %s
+             UNION
+            SELECT usage.design_version_id
+              FROM fusion_component_version_closure closure
+              JOIN fusion_design_version_component_version_rel usage ON usage.component_version_id = closure.ancestor_id
+             WHERE closure.descendant_id IN %s
+        """, [tuple(version_ids), tuple(version_ids)]))]
 
     @api.model
     def sync_design_version(self, version_data, design_id):
+        """Synchronize one design version and its component versions through
+        the sync engine, as flat records.
+
+        Args:
+            version_data (dict): Design version payload, as nested in
+                ``fusion.design.sync_design_structure``
+            design_id (int): The design of the version
+        Returns:
+            record: The synchronized design version
+        """
         version_uuid = version_data.get('uuid')
         if not version_uuid:
             raise ValidationError(_("UUID is required to sync a design version."))
+        Engine = self.env['fusion.sync.engine']
+        records = [dict(
+            {key: value for key, value in version_data.items() if key != 'component_versions'},
+            type='design_version',
+            design_uuid=self.env['fusion.design'].browse(design_id).uuid,
+        )]
+        for component_version_entry in version_data.get('component_versions') or []:
+            records += Engine._component_version_records(
+                component_version_entry.get('fusion_component_version') or {}, version_uuid
+            )
+        Engine.sync_records(records)
+        return self.with_context(active_test=False).search([('uuid', '=', version_uuid)], limit=1)
+
+
+    @api.model
+    def _fetch_diff_data(self, version_ids):
+        """Read the component versions and assembly quantities of design
+        versions with two queries.
+
+        Returns:
+            tuple: ``{design version id: {component id: {version id: version
+                number}}}`` and ``{design version id: {(parent component id,
+                child component id): quantity}}``
+        """
+        self.env['fusion.component.version'].flush(['fusion_component_id', 'version_number', 'design_version_ids'])
+        self.env['fusion.component.version.assembly.line'].flush(
+            ['fusion_component_version_id', 'child_component_version_id', 'quantity']
+        )
+        components = {version_id: defaultdict(dict) for version_id in version_ids}
+        self.env.cr.execute("""
+            SELECT usage.design_version_id, version.fusion_component_id, version.id, version.version_number
+              FROM fusion_design_version_component_version_rel usage
+              JOIN fusion_component_version version ON version.id = usage.component_version_id
+             WHERE usage.design_version_id IN %s
+        """, [tuple(version_ids)])
+        for design_version_id, component_id, version_id, version_number in self.env.cr.fetchall():
+            components[design_version_id][component_id][version_id] = version_number
+
+        quantities = {version_id: {} for version_id in version_ids}
+        self.env.cr.execute("""
+            SELECT usage.design_version_id, parent.fusion_component_id, child.fusion_component_id, SUM(line.quantity)
+              FROM fusion_design_version_component_version_rel usage
+              JOIN fusion_component_version_assembly_line line ON line.fusion_component_version_id = usage.component_version_id
+              JOIN fusion_component_version parent ON parent.id = line.fusion_component_version_id
+              JOIN fusion_component_version child ON child.id = line.child_component_version_id
+             WHERE usage.design_version_id IN %s
+          GROUP BY usage.design_version_id, parent.fusion_component_id, child.fusion_component_id
+        """, [tuple(version_ids)])
+        for design_version_id, parent_id, child_id, quantity in self.env.cr.fetchall():
+            quantities[design_version_id][(parent_id, child_id)] = quantity
+        return components, quantities
+
+    @api.model
+    def _compute_diff(self, old_id, new_id):
+        """Compare two design versions with set operations on their
+        component and assembly maps.
+
+        Returns:
+            dict: Tuples of ``added`` and ``removed`` component version ids,
+                ``reversioned`` ``(old version id, new version id)`` pairs and
+                ``quantity_changes`` ``(parent component id, child component
+                id, old quantity, new quantity)``, where a quantity of 0
+                stands for an added or removed assembly line
+        """
+        components, quantities = self._fetch_diff_data((old_id, new_id))
+        old_components, new_components = components[old_id], components[new_id]
+        old_keys, new_keys = set(old_components), set(new_components)
 
-        version = self.search([('uuid', '=', version_uuid)], limit=1)
+        def latest(versions):
+            return max(versions, key=versions.get)
 
-        version_vals = {
-            'fusion_design_id': design_id,
-            'version_number': version_data.get('version_number'),
-            'uuid': version_uuid,
-            'revision_date': version_data.get('revision_date'),
-            'modified_by': self.env['fusion.user'].get_or_create_user(version_data.get('modified_by'))
+        reversioned = tuple(sorted(
+            (latest(old_components[component_id]), latest(new_components[component_id]))
+            for component_id in old_keys & new_keys
+            if set(old_components[component_id]) != set(new_components[component_id])
+        ))
+        old_quantities, new_quantities = quantities[old_id], quantities[new_id]
+        quantity_changes = tuple(sorted(
+            (parent_id, child_id, old_quantities.get((parent_id, child_id), 0), new_quantities.get((parent_id, child_id), 0))
+            for parent_id, child_id in set(old_quantities) | set(new_quantities)
+            if old_quantities.get((parent_id, child_id)) != new_quantities.get((parent_id, child_id))
+        ))
+        return {
+            'added': tuple(sorted(latest(new_components[component_id]) for component_id in new_keys - old_keys)),
+            'removed': tuple(sorted(latest(old_components[component_id]) for component_id in old_keys - new_keys)),
+            'reversioned': reversioned,
+            'quantity_changes': quantity_changes,
         }
 
-        if version:
-            version.write(version_vals)
+    @api.model
+    def _get_diff_fingerprint(self, version_ids):
+        """Summarize the component versions and assembly lines used by design
+        versions, so that editing them outside of a synchronization changes
+        the key of the cached diff.
+
+        Returns:
+            tuple: ``(design version id, usage count, sum of component version
+                ids, line count, sum of quantities, last line update)`` rows
+        """
+        self.env['fusion.component.version'].flush(['design_version_ids'])
+        self.env['fusion.component.version.assembly.line'].flush(
+            ['fusion_component_version_id', 'child_component_version_id', 'quantity']
+        )
+        self.env.cr.execute("""
+            SELECT usage.design_version_id, COUNT(DISTINCT usage.component_version_id),
+                   SUM(DISTINCT usage.component_version_id), COUNT(line.id), SUM(line.quantity), MAX(line.write_date)
+              FROM fusion_design_version_component_version_rel usage
+         LEFT JOIN fusion_component_version_assembly_line line ON line.fusion_component_version_id = usage.component_version_id
+             WHERE usage.design_version_id IN %s
+          GROUP BY usage.design_version_id
+          ORDER BY usage.design_version_id
+        """, [tuple(version_ids)])
+        return tuple(self.env.cr.fetchall())
+
+    @tools.ormcache('old_id', 'new_id', 'old_hash', 'new_hash', 'fingerprint')
+    def _get_cached_diff(self, old_id, new_id, old_hash, new_hash, fingerprint):
+        return self._compute_diff(old_id, new_id)
+
+    def get_version_diff(self, other_version_id):
+        """Return what changed from another design version to this one.
+
+        Versions synchronized from a nested payload are compared once per
+        pair of payload hashes and usage fingerprint, so a re-synchronized
+        version or an edited assembly line invalidates the cached result;
+        other versions are compared on every call.
+
+        Args:
+            other_version_id (int): The design version to compare with,
+                usually the previous version of the same design
+        Returns:
+            dict: ``added``, ``removed`` and ``reversioned`` component
+                versions and assembly ``quantity_changes``, as lists of
+                dictionaries
+        """
+        self.ensure_one()
+        old_version = self.browse(other_version_id).exists()
+        if not old_version:
+            raise UserError(_("The design version to compare with does not exist."))
+        if self.sync_hash and old_version.sync_hash:
+            fingerprint = self._get_diff_fingerprint((old_version.id, self.id))
+            diff = self._get_cached_diff(old_version.id, self.id, old_version.sync_hash, self.sync_hash, fingerprint)
         else:
-            version = self.create(version_vals)
+            diff = self._compute_diff(old_version.id, self.id)
+
+        # Browse all records at once so their fields are read in batches
+        version_ids = set(diff['added']) | set(diff['removed'])
+        version_ids.update(version_id for pair in diff['reversioned'] for version_id in pair)
+        versions = {
+            version.id: version
+            for version in self.env['fusion.component.version'].with_context(active_test=False).browse(version_ids)
+        }
+        component_ids = {component_id for change in diff['quantity_changes'] for component_id in change[:2]}
+        components = {
+            component.id: component
+            for component in self.env['fusion.component'].with_context(active_test=False).browse(component_ids)
+        }
+
+        def version_info(version_id):
+            version = versions[version_id]
+            return {
+                'id': version.id,
+                'component_id': version.fusion_component_id.id,
+                'display_name': version.display_name,
+                'version_number': version.version_number,
+            }
+
+        return {
+            'added': [version_info(version_id) for version_id in diff['added']],
+            'removed': [version_info(version_id) for version_id in diff['removed']],
+            'reversioned': [{
+                'old': version_info(old_id),
+                'new': version_info(new_id),
+            } for old_id, new_id in diff['reversioned']],
+            'quantity_changes': [{
+                'parent_component_id': parent_id,
+                'parent_name': components[parent_id].name,
+                'child_component_id': child_id,
+                'child_name': components[child_id].name,
+                'old_quantity': old_quantity,
+                'new_quantity': new_quantity,
+            } for parent_id, child_id, old_quantity, new_quantity in diff['quantity_changes']],
+        }
 
-        component_versions_data = version_data.get('component_versions')
-        if component_versions_data:
-            for component_version_data in component_versions_data:
-                self.env['fusion.component.version'].sync_component_version(
-                    component_version_data.get('fusion_component_version'), version.uuid
-                )
+    def action_unarchive(self):
+        """Restore archived design versions with their component versions,
+        and pin them so the retention policy keeps them."""
+        component_versions = self.with_context(active_test=False).component_version_ids
+        component_versions.filtered(lambda version: not version.active).action_unarchive()
+        self.filtered(lambda version: not version.active).write({'active': True})
+        return self.write({'pinned': True})
 
-        return version
+    def _get_previous_version(self):
+        self.ensure_one()
+        return self.search([
+            ('fusion_design_id', '=', self.fusion_design_id.id),
+            ('version_number', '<', self.version_number),
+        ], order='version_number desc', limit=1)
 
+    def action_compare_versions(self):
+        self.ensure_one()
+        previous_version = self._get_previous_version()
+        if not previous_version:
+            action = self.env['ir.actions.act_window']._for_xml_id('fusion_sync.action_fusion_design_version_diff')
+            action['context'] = {'default_new_version_id': self.id}
+            return action
+        wizard = self.env['fusion.design.version.diff'].create({
+            'old_version_id': previous_version.id,
+            'new_version_id': self.id,
+        })
+        return wizard.action_compare()
 
     def name_get(self):
         return [(version.id, version.display_name) for version in self]
@@ -89,6 +324,8 @@ class FusionDesignVersion(models.Model):
         if name:
             if name.isdigit():
                 domain = [('version_number', '=', int(name))]
+            elif operator in SEARCH_KEY_OPERATORS:
+                domain = [('search_key', operator, name)]
             else:
                 domain = [('fusion_design_id.name', operator, name)]
         return self._search(domain + args, limit=limit)
@@ -0,0 +1,43 @@
+from odoo import fields, models
+
+
+class FusionDesignVersionReport(models.Model):
+    _name = 'fusion.design.version.report'
+    _inherit = 'fusion.report.mixin'
+    _description = 'Fusion Design Version Analysis'
+    _auto = False
+    _order = 'revision_date desc'
+
+    design_id = fields.Many2one(comodel_name='fusion.design', string='Design', readonly=True)
+    design_version_id = fields.Many2one(comodel_name='fusion.design.version', string='Design Version', readonly=True)
+    version_number = fields.Integer(string='Version Number', readonly=True, group_operator='max')
+    revision_date = fields.Datetime(string='Revision Date', readonly=True)
+    modified_by = fields.Many2one(comodel_name='fusion.user', string='Modified By', readonly=True)
+    active = fields.Boolean(string='Active', readonly=True)
+    component_count = fields.Integer(string='Component Versions', readonly=True)
+    assembly_count = fields.Integer(string='Assemblies', readonly=True, help="Component versions with assembly lines")
+    assembly_line_count = fields.Integer(string='Assembly Lines', readonly=True)
+
+    def _query(self):
+        return """
+            SELECT version.id,
+                   version.id AS design_version_id,
+                   version.fusion_design_id AS design_id,
+                   version.version_number,
+                   version.revision_date,
+                   version.modified_by,
+                   version.active,
+                   COALESCE(usages.component_count, 0) AS component_count,
+                   COALESCE(usages.assembly_count, 0) AS assembly_count,
+                   COALESCE(usages.line_count, 0) AS assembly_line_count
+              FROM fusion_design_version version
+         LEFT JOIN (SELECT usage.design_version_id,
+                           count(*) AS component_count,
+                           count(*) FILTER (WHERE lines.line_count > 0) AS assembly_count,
+                           sum(COALESCE(lines.line_count, 0)) AS line_count
+                      FROM fusion_design_version_component_version_rel usage
+                 LEFT JOIN (SELECT fusion_component_version_id AS version_id, count(*) AS line_count
+                              FROM fusion_component_version_assembly_line
+                          GROUP BY fusion_component_version_id) lines ON lines.version_id = usage.component_version_id
+                  GROUP BY usage.design_version_id) usages ON usages.design_version_id = version.id
+        """
@@ -0,0 +1,115 @@
+import logging
+from odoo import api, fields, models
+
+_logger = logging.getLogger(__name__)
+
+class FusionRenameQueue(models.Model):
+    """Renamed components and designs whose dependent names are outdated.
+
+    Renaming a widely reused component would rewrite the stored names of all
+    its versions and of every assembly line using them within the renaming
+    request. The rename is queued instead, and the cron rewrites the
+    dependent names with chunked SQL updates.
+    """
+    _name = 'fusion.rename.queue'
+    _description = 'Fusion Rename Queue'
+    _order = 'id'
+    _log_access = False
+
+    res_model = fields.Selection(
+        selection=[('fusion.component', 'Component'), ('fusion.design', 'Design')],
+        string='Model',
+        required=True,
+    )
+    res_id = fields.Integer(string='Record ID', required=True, help="Renamed component or design")
+
+    # Every query rewrites at most %(chunk_size)s rows among those still
+    # outdated, so it is repeated until it updates fewer rows
+    _RENAME_QUERIES = {
+        'fusion.component': [("fusion.component.version", ['display_name', 'search_key'], """
+            UPDATE fusion_component_version version
+               SET display_name = component.name || ' (v' || version.version_number || ')',
+                   search_key = component.name || ' v' || version.version_number || ' ' || component.uuid
+              FROM fusion_component component
+             WHERE component.id = version.fusion_component_id
+               AND version.id IN (
+                   SELECT outdated.id
+                     FROM fusion_component_version outdated
+                     JOIN fusion_component component ON component.id = outdated.fusion_component_id
+                    WHERE component.id IN %(ids)s
+                      AND (outdated.display_name IS DISTINCT FROM component.name || ' (v' || outdated.version_number || ')'
+                           OR outdated.search_key IS DISTINCT FROM component.name || ' v' || outdated.version_number || ' ' || component.uuid)
+                    LIMIT %(chunk_size)s
+               )
+        """), ("fusion.component.version.assembly.line", ['child_component_name', 'display_name'], """
+            UPDATE fusion_component_version_assembly_line line
+               SET child_component_name = component.name,
+                   display_name = component.name || ' (v' || line.child_version_number || ') x' || line.quantity
+              FROM fusion_component_version version
+              JOIN fusion_component component ON component.id = version.fusion_component_id
+             WHERE version.id = line.child_component_version_id
+               AND line.id IN (
+                   SELECT outdated.id
+                     FROM fusion_component_version_assembly_line outdated
+                     JOIN fusion_component_version version ON version.id = outdated.child_component_version_id
+                     JOIN fusion_component component ON component.id = version.fusion_component_id
+                    WHERE component.id IN %(ids)s
+                      AND outdated.child_component_name IS DISTINCT FROM component.name
+                    LIMIT %(chunk_size)s
+               )
+        """)],
+        'fusion.design': [("fusion.design.version", ['display_name', 'search_key'], """
+            UPDATE fusion_design_version version
+               SET display_name = design.name || ' (v' || version.version_number || ')',
+                   search_key = design.name || ' v' || version.version_number || ' ' || version.uuid || ' ' || design.uuid
+              FROM fusion_design design
+             WHERE design.id = version.fusion_design_id
+               AND version.id IN (
+                   SELECT outdated.id
+                     FROM fusion_design_version outdated
+                     JOIN fusion_design design ON design.id = outdated.fusion_design_id
+                    WHERE design.id IN %(ids)s
+                      AND (outdated.display_name IS DISTINCT FROM design.name || ' (v' || outdated.version_number || ')'
+                           OR outdated.search_key IS DISTINCT FROM design.name || ' v' || outdated.version_number || ' ' || outdated.uuid || ' ' || design.uuid)
+                    LIMIT %(chunk_size)s
+               )
+        """)],
+    }
+
+    @api.model
+    def _enqueue(self, records):
+        """Queue the propagation of the names of renamed ``records``."""
+        if records.ids:
+            self.sudo().create([{'res_model': records._name, 'res_id': record_id} for record_id in records.ids])
+            self.env.ref('fusion_sync.ir_cron_fusion_sync_renames')._trigger()
+
+    @api.model
+    def _cron_process_renames(self, chunk_size=5000):
+        """Rewrite the names depending on queued renames, committing after
+        every chunk."""
+        queue = self.sudo().search([])
+        if not queue:
+            return
+        queue.flush()
+        for model_name, queries in self._RENAME_QUERIES.items():
+            entries = queue.filtered(lambda entry: entry.res_model == model_name)
+            if not entries:
+                continue
+            self.env[model_name].flush(['name', 'uuid'])
+            params = {'ids': tuple(set(entries.mapped('res_id'))), 'chunk_size': chunk_size}
+            for dependent_model, fnames, query in queries:
+                self.env[dependent_model].flush()
+                while True:
+                    self.env.cr.execute(query, params)
+                    updated = self.env.cr.rowcount
+                    self.env[dependent_model].invalidate_cache(fnames)
+                    self._commit()
+                    if updated < chunk_size:
+                        break
+        _logger.info("Fusion Sync: propagated %d renames", len(queue))
+        queue.unlink()
+        self._commit()
+
+    def _commit(self):
+        if not self.env.registry.in_test_mode():
+            self.env.cr.commit()
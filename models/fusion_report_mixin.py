@@ -0,0 +1,48 @@
+from odoo import api, models
+
+
+class FusionReportMixin(models.AbstractModel):
+    """Read-only reporting model backed by an aggregated SQL view.
+
+    When the ``fusion_sync.report_materialized`` parameter is set, the view
+    is created as a materialized view on module update and refreshed in the
+    background after every sync, so reports never aggregate the catalog on
+    the fly.
+    """
+    _name = 'fusion.report.mixin'
+    _description = 'Fusion Reporting Mixin'
+
+    def _query(self):
+        """Return the SELECT statement of the view, with an ``id`` column."""
+        raise NotImplementedError()
+
+    @api.model
+    def _is_materialized(self):
+        return self.env['ir.config_parameter'].sudo().get_param('fusion_sync.report_materialized', 'False') not in ('False', '0')
+
+    def _get_relkind(self):
+        self.env.cr.execute("SELECT relkind FROM pg_class WHERE relname = %s", (self._table,))
+        row = self.env.cr.fetchone()
+        return row and row[0]
+
+    def init(self):
+        if self._abstract:
+            return
+        relkind = self._get_relkind()
+        if relkind == 'm':
+            self.env.cr.execute('DROP MATERIALIZED VIEW "{}"'.format(self._table))
+        elif relkind == 'v':
+            self.env.cr.execute('DROP VIEW "{}"'.format(self._table))
+        if self._is_materialized():
+            self.env.cr.execute('CREATE MATERIALIZED VIEW "{}" AS ({})'.format(self._table, self._query()))
+            # Required to refresh the view without locking out readers
+            self.env.cr.execute('CREATE UNIQUE INDEX "{0}_id_idx" ON "{0}" (id)'.format(self._table))
+        else:
+            self.env.cr.execute('CREATE VIEW "{}" AS ({})'.format(self._table, self._query()))
+
+    @api.model
+    def _refresh(self):
+        """Refresh the materialized view, if the report is materialized."""
+        if self._get_relkind() == 'm':
+            self.env.cr.execute('REFRESH MATERIALIZED VIEW CONCURRENTLY "{}"'.format(self._table))
+            self.invalidate_cache()
@@ -0,0 +1,255 @@
+import base64
+import gzip
+import hashlib
+import json
+import logging
+from datetime import timedelta
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+
+class FusionSnapshot(models.AbstractModel):
+    """Compact export of whole design structures.
+
+    A snapshot holds design versions, the component versions they use and
+    the assembly lines between them as columnar arrays; references between
+    tables are indexes into the referenced arrays. It is built with a few
+    queries, stored as gzipped JSON and cached as an attachment until any of
+    the exported records changes. Cached snapshots not regenerated for a
+    while are removed by a cron.
+    """
+    _name = 'fusion.snapshot'
+    _description = 'Fusion Design Snapshot'
+
+    SNAPSHOT_FORMAT_VERSION = 1
+
+    # Component versions used by the exported design versions at any level
+    _COMPONENT_VERSION_IDS_QUERY = """
+        SELECT usage.component_version_id
+          FROM fusion_design_version_component_version_rel usage
+         WHERE usage.design_version_id = ANY(%(design_version_ids)s::integer[])
+         UNION
+        SELECT closure.descendant_id
+          FROM fusion_design_version_component_version_rel usage
+          JOIN fusion_component_version_closure closure ON closure.ancestor_id = usage.component_version_id
+         WHERE usage.design_version_id = ANY(%(design_version_ids)s::integer[])
+    """
+
+    @api.model
+    def _get_design_version_ids(self, design_version_ids=None):
+        """Return the design versions to export, all active ones when none
+        are given."""
+        DesignVersion = self.env['fusion.design.version']
+        if design_version_ids:
+            # Explicitly requested versions are exported even when archived
+            return sorted(DesignVersion.with_context(active_test=False).search([('id', 'in', list(design_version_ids))]).ids)
+        return sorted(DesignVersion.search([]).ids)
+
+    @api.model
+    def _get_component_version_ids(self, design_version_ids):
+        """Return the component versions used by design versions at any
+        level, which the snapshot exports.
+
+        Raises:
+            AccessError: If the user may not read all of them
+        """
+        self.env['fusion.design.version'].flush(['component_version_ids'])
+        self.env.cr.execute(self._COMPONENT_VERSION_IDS_QUERY + " ORDER BY 1", {'design_version_ids': design_version_ids})
+        component_version_ids = [row[0] for row in self.env.cr.fetchall()]
+        # Read in SQL, so the access rules are checked explicitly
+        component_versions = self.env['fusion.component.version'].browse(component_version_ids)
+        component_versions.check_access_rights('read')
+        component_versions.check_access_rule('read')
+        return component_version_ids
+
+    @api.model
+    def _get_fingerprint(self, design_version_ids, component_version_ids):
+        """Return a hash changing whenever an exported record changes."""
+        self.env['fusion.design'].flush(['name'])
+        self.env['fusion.design.version'].flush()
+        self.env['fusion.component.version'].flush()
+        self.env['fusion.component'].flush(['name'])
+        self.env['fusion.component.version.assembly.line'].flush()
+        self.env.cr.execute("""
+            SELECT (SELECT string_agg(version.id || ':' || version.write_date || ':' || design.write_date || ':' || design.name,
+                                      ',' ORDER BY version.id)
+                      FROM fusion_design_version version
+                      JOIN fusion_design design ON design.id = version.fusion_design_id
+                     WHERE version.id = ANY(%(design_version_ids)s::integer[])),
+                   (SELECT count(*) FROM fusion_design_version_component_version_rel
+                     WHERE design_version_id = ANY(%(design_version_ids)s::integer[])),
+                   (SELECT count(*) || ':' || max(version.write_date) || ':' || max(component.write_date)
+                      FROM fusion_component_version version
+                      JOIN fusion_component component ON component.id = version.fusion_component_id
+                     WHERE version.id = ANY(%(component_version_ids)s::integer[])),
+                   (SELECT count(*) || ':' || sum(quantity) || ':' || max(write_date)
+                      FROM fusion_component_version_assembly_line
+                     WHERE fusion_component_version_id = ANY(%(component_version_ids)s::integer[]))
+        """, {'design_version_ids': design_version_ids, 'component_version_ids': component_version_ids})
+        row = self.env.cr.fetchone()
+        return hashlib.sha1(repr((self.SNAPSHOT_FORMAT_VERSION,) + row).encode()).hexdigest()
+
+    @api.model
+    def _build_snapshot(self, design_version_ids, component_version_ids):
+        """Read the design structures with four queries.
+
+        Returns:
+            dict: One dictionary of equally long columns per table
+        """
+        params = {'design_version_ids': design_version_ids, 'component_version_ids': component_version_ids}
+        cr = self.env.cr
+        cr.execute("""
+            SELECT version.id, version.uuid, design.uuid, design.name, version.version_number
+              FROM fusion_design_version version
+              JOIN fusion_design design ON design.id = version.fusion_design_id
+             WHERE version.id = ANY(%(design_version_ids)s::integer[])
+          ORDER BY version.id
+        """, params)
+        design_versions = cr.fetchall()
+
+        cr.execute("""
+            SELECT version.id, version.uuid, component.uuid, component.name, version.version_number
+              FROM fusion_component_version version
+              JOIN fusion_component component ON component.id = version.fusion_component_id
+             WHERE version.id = ANY(%(component_version_ids)s::integer[])
+          ORDER BY version.id
+        """, params)
+        component_versions = cr.fetchall()
+        component_ids = [row[0] for row in component_versions]
+
+        cr.execute("""
+            SELECT design_version_id, component_version_id
+              FROM fusion_design_version_component_version_rel
+             WHERE design_version_id = ANY(%(design_version_ids)s::integer[])
+          ORDER BY design_version_id, component_version_id
+        """, params)
+        usages = cr.fetchall()
+
+        cr.execute("""
+            SELECT fusion_component_version_id, child_component_version_id, quantity, sequence
+              FROM fusion_component_version_assembly_line
+             WHERE fusion_component_version_id = ANY(%(component_version_ids)s::integer[])
+          ORDER BY fusion_component_version_id, sequence, id
+        """, params)
+        lines = cr.fetchall()
+
+        design_index = {row[0]: index for index, row in enumerate(design_versions)}
+        component_index = {version_id: index for index, version_id in enumerate(component_ids)}
+        return {
+            'format': 'fusion_sync.snapshot',
+            'format_version': self.SNAPSHOT_FORMAT_VERSION,
+            'design_versions': {
+                'id': [row[0] for row in design_versions],
+                'uuid': [row[1] for row in design_versions],
+                'design_uuid': [row[2] for row in design_versions],
+                'design_name': [row[3] for row in design_versions],
+                'version_number': [row[4] for row in design_versions],
+            },
+            'component_versions': {
+                'id': component_ids,
+                'uuid': [row[1] for row in component_versions],
+                'component_uuid': [row[2] for row in component_versions],
+                'name': [row[3] for row in component_versions],
+                'version_number': [row[4] for row in component_versions],
+            },
+            'usages': {
+                'design_version': [design_index[row[0]] for row in usages],
+                'component_version': [component_index[row[1]] for row in usages],
+            },
+            'assembly_lines': {
+                'parent': [component_index[row[0]] for row in lines],
+                'child': [component_index[row[1]] for row in lines],
+                'quantity': [row[2] for row in lines],
+                'sequence': [row[3] for row in lines],
+            },
+        }
+
+    @api.model
+    def _get_snapshot_attachment(self, design_version_ids=None):
+        """Return the cached snapshot of design versions, or of the whole
+        catalog, generating it when missing or outdated.
+
+        Design versions are searched, so the record rules apply to them,
+        and reading the component versions they use is checked against the
+        record rules. Concurrent requests may both store the same snapshot;
+        the newest one is used and the other is removed by the cleanup cron.
+
+        Returns:
+            record: The ``ir.attachment`` holding the gzipped snapshot, its
+                description holds the fingerprint of the exported records
+        """
+        self.env['fusion.design.version'].check_access_rights('read')
+        if design_version_ids:
+            design_version_ids = self._get_design_version_ids(design_version_ids)
+            if not design_version_ids:
+                raise UserError(_("The design versions to export do not exist."))
+            if len(design_version_ids) == 1:
+                scope = 'design_version_%s' % design_version_ids[0]
+            else:
+                scope = 'design_versions_%s' % hashlib.sha1(repr(design_version_ids).encode()).hexdigest()
+        else:
+            design_version_ids = self._get_design_version_ids()
+            scope = 'catalog'
+        name = 'fusion_snapshot_%s.json.gz' % scope
+        component_version_ids = self._get_component_version_ids(design_version_ids)
+        fingerprint = self._get_fingerprint(design_version_ids, component_version_ids)
+
+        Attachment = self.env['ir.attachment'].sudo()
+        attachment = Attachment.search([
+            ('res_model', '=', self._name),
+            ('name', '=', name),
+        ], order='id desc', limit=1)
+        if attachment and attachment.description == fingerprint:
+            return attachment
+
+        data = json.dumps(self._build_snapshot(design_version_ids, component_version_ids), separators=(',', ':'))
+        vals = {
+            'datas': base64.b64encode(gzip.compress(data.encode(), mtime=0)),
+            'description': fingerprint,
+        }
+        if attachment:
+            attachment.write(vals)
+        else:
+            attachment = Attachment.create(dict(
+                vals, name=name, res_model=self._name, res_id=0, mimetype='application/gzip',
+            ))
+        return attachment
+
+    @api.model
+    def export_snapshot(self, design_version_ids=None):
+        """Prepare a snapshot for download.
+
+        Args:
+            design_version_ids (list): Design versions to export, the whole
+                catalog of active design versions when empty
+        Returns:
+            dict: The ``url`` to download the gzipped JSON snapshot from and
+                its ``fingerprint``, which only changes with the data
+        """
+        attachment = self._get_snapshot_attachment(design_version_ids)
+        url = '/fusion_sync/snapshot'
+        if design_version_ids:
+            url += '?design_version_ids=%s' % ','.join(map(str, design_version_ids))
+        return {'url': url, 'fingerprint': attachment.description}
+
+    @api.model
+    def _cron_gc_snapshots(self):
+        """Remove the cached snapshots not regenerated for
+        ``fusion_sync.snapshot_retention_days`` days, and the older copies
+        of snapshots stored twice by concurrent requests."""
+        retention_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'fusion_sync.snapshot_retention_days', 7
+        ))
+        limit_date = fields.Datetime.now() - timedelta(days=retention_days)
+        Attachment = self.env['ir.attachment'].sudo()
+        obsolete = Attachment
+        names = set()
+        for attachment in Attachment.search([('res_model', '=', self._name)], order='id desc'):
+            if attachment.name in names or attachment.write_date < limit_date:
+                obsolete |= attachment
+            names.add(attachment.name)
+        obsolete.unlink()
+        if obsolete:
+            _logger.info("Fusion Sync: removed %d cached snapshots", len(obsolete))
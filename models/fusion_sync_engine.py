@@ -0,0 +1,1335 @@
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+from psycopg2 import OperationalError
+from odoo import api, fields, models, _
+from odoo.exceptions import ValidationError
+from odoo.service.model import PG_CONCURRENCY_ERRORS_TO_RETRY
+
+_logger = logging.getLogger(__name__)
+
+# Namespaces of the transaction level advisory locks taken by the sync
+LOCK_DESIGN = 0x465301
+LOCK_ASSEMBLY = 0x465302
+
+
+class FusionSyncCache:
+    """Ids of users and components resolved by UUID during a sync call.
+
+    The cache travels in the ``fusion_sync_cache`` context key for the length
+    of the call, so it survives the savepoints taken by batch imports. It is
+    cleared whenever the sync rolls back, and dropped with the call, so ids
+    never leak across transactions.
+    """
+
+    def __init__(self):
+        self.users = {}
+        self.components = {}
+
+    def clear(self):
+        self.users.clear()
+        self.components.clear()
+
+
+class FusionSyncEngine(models.AbstractModel):
+    """Set-based synchronization of Fusion 360 design structures.
+
+    The payload is flattened first, every UUID is resolved with a single
+    search per model and records are then created and written in groups,
+    so the number of queries no longer grows with the size of the tree.
+
+    Design and component versions remember a hash of the payload subtree
+    they were synchronized from; unchanged subtrees are skipped entirely
+    unless the ``fusion_sync_force`` context key is set.
+
+    Unless the company enables it or the ``fusion_sync_tracking`` context key
+    is set, synchronized records are written without mail tracking and a
+    single summary is posted in the chatter of each synced design version.
+
+    Concurrent imports of the same design are serialized by an advisory lock
+    on the design UUID. The transaction snapshot predates the lock, so an
+    import that had to wait for another one is restarted with a
+    serialization failure, which Odoo retries with a fresh snapshot. Records
+    shared between designs are inserted with ``ON CONFLICT`` upserts; two
+    imports of different designs creating the same shared record collide
+    the same way, the later one being retried.
+    """
+    _name = 'fusion.sync.engine'
+    _description = 'Fusion Batched Sync Engine'
+
+    # ------------------------------------------------------------------
+    # Entry point
+    # ------------------------------------------------------------------
+
+    @api.model
+    def sync_payloads(self, design_structures):
+        """Synchronize a list of design structures as a single payload, all
+        of them or none.
+
+        Args:
+            design_structures (list): Dictionaries shaped like the argument of
+                ``fusion.design.sync_design_structure``
+        Returns:
+            recordset: The synchronized ``fusion.design`` records
+        """
+        return self._sync_payload(self._collect_payload(design_structures))
+
+    @api.model
+    def sync_design_batch(self, design_structures):
+        """Synchronize many designs in one call, each in its own savepoint.
+
+        A failing design is rolled back alone and reported, the others are
+        kept. Users and components of the whole batch are resolved up front
+        and cached for the call, so designs sharing them do not look them up
+        again.
+
+        Args:
+            design_structures (list): Dictionaries shaped like the argument of
+                ``fusion.design.sync_design_structure``
+        Returns:
+            list: One summary per design, in payload order, with its ``uuid``
+                and ``name``, ``status`` (``done`` or ``failed``) and either
+                the ``design_id`` or the ``error``
+        """
+        engine = self._with_sync_cache()
+        engine._warm_caches(design_structures)
+        results = []
+        for design_structure in design_structures:
+            design_data = (design_structure or {}).get('fusion_design') or {}
+            result = {'uuid': design_data.get('uuid'), 'name': design_data.get('name')}
+            try:
+                with self.env.cr.savepoint():
+                    design = engine.sync_payloads([design_structure])
+                result.update(status='done', design_id=design.id)
+            except Exception as e:
+                if self._is_concurrency_error(e):
+                    # The snapshot is outdated, the whole batch must be retried
+                    raise
+                engine._clear_caches()
+                _logger.info("Fusion sync of design %s failed: %s", result['uuid'], e)
+                result.update(status='failed', error=str(e))
+            results.append(result)
+        return results
+
+    @api.model
+    def _warm_caches(self, design_structures):
+        """Resolve the users and components of many designs with one query
+        per model; invalid designs are skipped and fail later on their own."""
+        payload = self._new_payload()
+        for design_structure in design_structures:
+            try:
+                single = self._collect_payload([design_structure])
+            except ValidationError:
+                continue
+            payload['users'].update(single['users'])
+            payload['components'].update(single['components'])
+        if payload['users']:
+            self.env['fusion.user'].get_or_create_users(list(payload['users'].values()))
+        cache = self._get_component_cache()
+        missing = [uuid for uuid in payload['components'] if uuid not in cache]
+        if missing:
+            Component = self.env['fusion.component'].with_context(active_test=False)
+            cache.update((component.uuid, component.id) for component in Component.search([('uuid', 'in', missing)]))
+
+    @api.model
+    def _with_sync_cache(self):
+        """Return the engine holding a UUID cache for the calls made through
+        it, reusing the cache of an enclosing call."""
+        if self.env.context.get('fusion_sync_cache') is not None:
+            return self
+        return self.with_context(fusion_sync_cache=FusionSyncCache())
+
+    @api.model
+    def _get_component_cache(self):
+        """Return the component UUID -> id cache of the current call, or an
+        empty dictionary outside of a sync call."""
+        cache = self.env.context.get('fusion_sync_cache')
+        return cache.components if cache is not None else {}
+
+    @api.model
+    def _clear_caches(self):
+        """Forget cached ids and values after rolling back to a savepoint."""
+        cache = self.env.context.get('fusion_sync_cache')
+        if cache is not None:
+            cache.clear()
+        self.env['fusion.design'].invalidate_cache()
+
+    @api.model
+    def sync_records(self, records):
+        """Synchronize a batch of flat records.
+
+        Every record is a dictionary with a ``type`` key (``design``,
+        ``design_version``, ``component_version`` or ``assembly_line``)
+        referencing its parent by UUID instead of being nested in it. Parents
+        may be part of the same batch or already exist in the database.
+
+        Args:
+            records (list): Flat record dictionaries, see ``_collect_record``
+        Returns:
+            recordset: The synchronized ``fusion.design`` records
+        """
+        payload = self._new_payload()
+        for record in records:
+            self._collect_record(payload, record)
+        return self._sync_payload(payload)
+
+    @api.model
+    def _component_version_records(self, component_version_data, design_version_uuid):
+        """Return a nested component version payload and its assembly lines
+        as flat records for ``sync_records``."""
+        records = [dict(component_version_data, type='component_version', design_version_uuid=design_version_uuid)]
+        for line_data in component_version_data.get('assembly_lines') or []:
+            records.append(dict(
+                line_data,
+                type='assembly_line',
+                parent_uuid=component_version_data.get('uuid'),
+                parent_version_number=component_version_data.get('version_number'),
+            ))
+        return records
+
+    @api.model
+    def _is_tracking_enabled(self):
+        tracking = self.env.context.get('fusion_sync_tracking')
+        if tracking is None:
+            tracking = self.env.company.fusion_sync_tracking
+        return tracking
+
+    @api.model
+    def _sync_payload(self, payload):
+        SyncLog = self.env['fusion.sync.log']
+        profiler = SyncLog._new_profiler()
+        tracking = self._is_tracking_enabled()
+        engine = self._with_sync_cache().with_context(fusion_sync_import=True)
+        if not tracking:
+            engine = engine.with_context(tracking_disable=True)
+        if profiler:
+            engine = engine.with_context(fusion_sync_profiler=profiler)
+        try:
+            with profiler.run() if profiler else nullcontext():
+                designs, synced_design_versions = engine._sync_payload_stages(payload)
+                if not tracking:
+                    with engine._profile_stage('summary', 'fusion.design.version') as stats:
+                        engine._post_sync_summaries(payload, synced_design_versions)
+                        stats['rows'] = len(synced_design_versions)
+                # Stored computed fields are recomputed here
+                with engine._profile_stage('flush', False):
+                    engine.flush()
+        except Exception as e:
+            if profiler:
+                SyncLog._log_profiler(profiler, payload, error=e)
+            raise
+        if profiler:
+            SyncLog._log_profiler(profiler, payload)
+        self._trigger_report_refresh()
+        return designs.with_env(self.env)
+
+    @api.model
+    @contextmanager
+    def _profile_stage(self, name, model_name):
+        """Measure a sync stage when the import is profiled.
+
+        Yields:
+            dict: Stage statistics; callers set the ``rows`` key
+        """
+        profiler = self.env.context.get('fusion_sync_profiler')
+        if not profiler:
+            yield {}
+            return
+        with profiler.stage(name, model_name) as stats:
+            yield stats
+
+    @api.model
+    def _post_sync_summaries(self, payload, design_versions):
+        """Post one chatter summary per synced design version, replacing the
+        per-field tracking messages."""
+        component_counts = defaultdict(int)
+        design_version_uuids = defaultdict(set)
+        for design_version_uuid, key in payload['component_usages']:
+            component_counts[design_version_uuid] += 1
+            design_version_uuids[key].add(design_version_uuid)
+        line_counts = defaultdict(int)
+        for parent_key, __ in payload['assembly_lines']:
+            for design_version_uuid in design_version_uuids[parent_key]:
+                line_counts[design_version_uuid] += 1
+
+        DesignVersion = self.env['fusion.design.version']
+        for uuid, version_id in design_versions.items():
+            DesignVersion.browse(version_id).message_post(
+                body=_(
+                    "Synchronized from Fusion 360: %(components)s component versions, %(lines)s assembly lines.",
+                    components=component_counts[uuid],
+                    lines=line_counts[uuid],
+                ),
+                subtype_xmlid='mail.mt_note',
+            )
+
+    @api.model
+    def _sync_payload_stages(self, payload):
+        """Run every sync stage on a flattened payload.
+
+        Returns:
+            tuple: The synchronized designs, and the ids of the design
+                versions that were created or updated keyed by UUID
+        """
+        with self._profile_stage('lock', 'fusion.design') as stats:
+            design_uuids = set(payload['designs'])
+            design_uuids.update(data['design_uuid'] for data in payload['design_versions'].values())
+            self._advisory_lock(LOCK_DESIGN, design_uuids)
+            stats['rows'] = len(design_uuids)
+        with self._profile_stage('users', 'fusion.user') as stats:
+            users = self._resolve_users(payload['users'])
+            stats['rows'] = len(users)
+        with self._profile_stage('design_structure', 'fusion.design') as stats:
+            designs = self._sync_designs(payload['designs'], users)
+            stats['rows'] = len(payload['designs'])
+        with self._profile_stage('design_version', 'fusion.design.version') as stats:
+            design_versions, unchanged_design_versions = self._sync_design_versions(
+                payload['design_versions'], designs, users
+            )
+            stats['rows'] = len(payload['design_versions']) - len(unchanged_design_versions)
+        with self._profile_stage('component', 'fusion.component') as stats:
+            components = self._sync_components(payload['components'], users)
+            stats['rows'] = len(payload['components'])
+        with self._profile_stage('component_version', 'fusion.component.version') as stats:
+            component_versions, unchanged_component_versions = self._sync_component_versions(
+                payload['component_versions'], components, design_versions, users, unchanged_design_versions
+            )
+            stats['rows'] = len(payload['component_versions']) - len(unchanged_component_versions)
+        with self._profile_stage('component_usage', 'fusion.design.version') as stats:
+            usages = [usage for usage in payload['component_usages'] if usage[0] not in unchanged_design_versions]
+            replace_uuids = {
+                uuid for uuid, data in payload['design_versions'].items()
+                if data['sync_hash'] and uuid not in unchanged_design_versions
+            }
+            self._sync_component_usages(usages, design_versions, component_versions, replace_uuids)
+            stats['rows'] = len(usages)
+        with self._profile_stage('assembly_line', 'fusion.component.version.assembly.line') as stats:
+            assembly_lines = [
+                (parent_key, line_data)
+                for parent_key, line_data in payload['assembly_lines']
+                if parent_key not in unchanged_component_versions
+            ]
+            self._sync_assembly_lines(assembly_lines, component_versions, payload['version_uuids'])
+            stats['rows'] = len(assembly_lines)
+        synced_design_versions = {
+            uuid: version_id
+            for uuid, version_id in design_versions.items()
+            if uuid in payload['design_versions'] and uuid not in unchanged_design_versions
+        }
+        return self.env['fusion.design'].browse(list(designs.values())), synced_design_versions
+
+    # ------------------------------------------------------------------
+    # Payload flattening
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _parse_version_number(self, value):
+        if value is None:
+            return 1
+        if isinstance(value, bool):
+            raise ValidationError(_("Invalid version number format."))
+        if isinstance(value, int):
+            return value
+        if isinstance(value, str) and value.isdigit():
+            return int(value)
+        raise ValidationError(_("Invalid version number format."))
+
+    @api.model
+    def _payload_hash(self, data):
+        """Return a stable hash of a payload subtree."""
+        serialized = json.dumps(data, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha1(serialized.encode('utf-8')).hexdigest()
+
+    @api.model
+    def _user_key(self, user_data):
+        """Return the UUID identifying a Fusion user payload, if any."""
+        return self.env['fusion.user']._parse_user_data(user_data)[0]
+
+    @api.model
+    def _new_payload(self):
+        """Return an empty flattened payload.
+
+        Component versions are keyed by ``(component uuid, version number)``
+        and assembly lines reference their parent by that same key;
+        ``version_uuids`` maps the UUID of every component version of the
+        payload to its key.
+        """
+        return {
+            'users': {},
+            'designs': {},
+            'design_versions': {},
+            'components': {},
+            'component_versions': {},
+            'version_uuids': {},
+            'component_usages': [],
+            'assembly_lines': [],
+        }
+
+    @api.model
+    def _collect_payload(self, design_structures):
+        """Flatten nested design structures into per-model dictionaries."""
+        payload = self._new_payload()
+
+        def add_user(user_data):
+            key = self._user_key(user_data)
+            if key and key not in payload['users']:
+                payload['users'][key] = user_data
+
+        for design_structure in design_structures:
+            design_data = design_structure.get('fusion_design')
+            if not design_data:
+                raise ValidationError(_("Invalid design structure: Missing fusion_design data."))
+            design_uuid = design_data.get('uuid')
+            if not design_uuid:
+                raise ValidationError(_("UUID is required to sync a Fusion design."))
+            payload['designs'][design_uuid] = design_data
+            add_user(design_data.get('created_by'))
+
+            for version_data in design_data.get('versions') or []:
+                version_uuid = version_data.get('uuid')
+                if not version_uuid:
+                    raise ValidationError(_("UUID is required to sync a design version."))
+                payload['design_versions'][version_uuid] = dict(
+                    version_data,
+                    design_uuid=design_uuid,
+                    sync_hash=self._payload_hash(version_data),
+                )
+                add_user(version_data.get('modified_by'))
+
+                for component_version_entry in version_data.get('component_versions') or []:
+                    component_version_data = component_version_entry.get('fusion_component_version') or {}
+                    self._collect_component_version(payload, component_version_data, version_uuid)
+                    add_user(component_version_data.get('created_by'))
+                    add_user(component_version_data.get('modified_by'))
+
+        return payload
+
+    @api.model
+    def _collect_record(self, payload, record):
+        """Add one flat record to ``payload``.
+
+        Flat records carry no subtree, so they are never compared with the
+        content hash of nested payloads.
+
+        Raises:
+            ValidationError: If the record is malformed
+        """
+        record_type = record.get('type')
+        data = {key: value for key, value in record.items() if key != 'type'}
+        for user_field in ('created_by', 'modified_by'):
+            user_key = self._user_key(data.get(user_field))
+            if user_key:
+                payload['users'].setdefault(user_key, data[user_field])
+
+        if record_type == 'design':
+            if not data.get('uuid'):
+                raise ValidationError(_("UUID is required to sync a Fusion design."))
+            payload['designs'][data['uuid']] = data
+        elif record_type == 'design_version':
+            if not data.get('uuid'):
+                raise ValidationError(_("UUID is required to sync a design version."))
+            if not data.get('design_uuid'):
+                raise ValidationError(_("A design version record requires a design_uuid."))
+            payload['design_versions'][data['uuid']] = dict(data, sync_hash=False)
+        elif record_type == 'component_version':
+            if not data.get('design_version_uuid'):
+                raise ValidationError(_("A component version record requires a design_version_uuid."))
+            key = self._collect_component_version(payload, dict(data, assembly_lines=None), data['design_version_uuid'])
+            payload['component_versions'][key]['sync_hash'] = False
+        elif record_type == 'assembly_line':
+            if not data.get('parent_uuid'):
+                raise ValidationError(_("An assembly line record requires a parent_uuid."))
+            parent_key = (data['parent_uuid'], self._parse_version_number(data.get('parent_version_number')))
+            payload['assembly_lines'].append((parent_key, data))
+        else:
+            raise ValidationError(_("Unknown record type: %s", record_type))
+
+    @api.model
+    def _collect_component_version(self, payload, component_version_data, design_version_uuid):
+        component_uuid = component_version_data.get('uuid')
+        if not component_uuid:
+            raise ValidationError(_("UUID is required to sync a component."))
+        version_number = self._parse_version_number(component_version_data.get('version_number'))
+        key = (component_uuid, version_number)
+        version_uuid = component_version_data.get('version_uuid') \
+            or self.env['fusion.component.version']._default_uuid(component_uuid, version_number)
+
+        payload['components'].setdefault(component_uuid, component_version_data)
+        payload['component_versions'][key] = dict(
+            component_version_data,
+            version_number=version_number,
+            version_uuid=version_uuid,
+            version_uuid_given=bool(component_version_data.get('version_uuid')),
+            design_version_uuid=design_version_uuid,
+            sync_hash=self._payload_hash(component_version_data),
+        )
+        payload['version_uuids'][version_uuid] = key
+        payload['component_usages'].append((design_version_uuid, key))
+        for assembly_line_data in component_version_data.get('assembly_lines') or []:
+            payload['assembly_lines'].append((key, assembly_line_data))
+        return key
+
+    # ------------------------------------------------------------------
+    # Generic helpers
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _is_concurrency_error(self, error):
+        """Return whether ``error`` is a transaction conflict that Odoo
+        retries with a fresh snapshot."""
+        return isinstance(error, OperationalError) and error.pgcode in PG_CONCURRENCY_ERRORS_TO_RETRY
+
+    @api.model
+    def _advisory_lock(self, namespace, keys):
+        """Take transaction level advisory locks on ``keys``.
+
+        Locks are tried in a fixed order, so two transactions locking
+        overlapping keys cannot deadlock. The transaction snapshot was taken
+        by its first query, before the lock: when another transaction holds
+        one of the keys, this one waits for it to finish and then raises a
+        serialization failure, so Odoo retries it with a snapshot that sees
+        the changes of the other transaction.
+
+        Args:
+            namespace (int): One of the ``LOCK_*`` constants
+            keys (iterable): UUID strings or record ids
+        Raises:
+            psycopg2.OperationalError: A ``serialization_failure`` if a key
+                was held by another transaction
+        """
+        keys = [str(key) for key in keys if key]
+        if not keys:
+            return
+        # Stops at the first key held by another transaction
+        self.env.cr.execute("""
+            WITH RECURSIVE lock_keys(rank, lock_key) AS (
+                SELECT row_number() OVER (ORDER BY lock_key), lock_key
+                  FROM (SELECT DISTINCT hashtext(key) AS lock_key FROM unnest(%(keys)s::text[]) key) hashed
+            ),
+            attempts(rank, locked) AS (
+                SELECT 0::bigint, true
+                 UNION ALL
+                SELECT lock_keys.rank, pg_try_advisory_xact_lock(%(namespace)s, lock_keys.lock_key)
+                  FROM attempts
+                  JOIN lock_keys ON lock_keys.rank = attempts.rank + 1
+                 WHERE attempts.locked
+            )
+            SELECT lock_keys.lock_key
+              FROM attempts
+              JOIN lock_keys ON lock_keys.rank = attempts.rank
+             WHERE NOT attempts.locked
+        """, {'namespace': namespace, 'keys': keys})
+        row = self.env.cr.fetchone()
+        if not row:
+            return
+        _logger.info("Fusion sync: waiting for a concurrent import")
+        # Queue behind the other transaction, which holds no smaller key
+        self.env.cr.execute("SELECT pg_advisory_xact_lock(%s, %s)", (namespace, row[0]))
+        self.env.cr.execute("""
+            DO $$
+            BEGIN
+                RAISE EXCEPTION USING
+                    ERRCODE = 'serialization_failure',
+                    MESSAGE = 'Fusion sync: waited for a concurrent import, restarting with a fresh snapshot';
+            END
+            $$
+        """, log_exceptions=False)
+
+    @api.model
+    def _changed_vals(self, record, vals):
+        """Return the subset of ``vals`` that differs from ``record``."""
+        changed = {}
+        for name, value in vals.items():
+            field = record._fields[name]
+            new_value = field.convert_to_record(field.convert_to_cache(value, record), record)
+            if new_value != record[name]:
+                changed[name] = value
+        return changed
+
+    @api.model
+    def _write_grouped(self, record_vals):
+        """Write a list of ``(record, vals)`` pairs with one ``write`` per
+        distinct set of changed values."""
+        groups = defaultdict(list)
+        for record, vals in record_vals:
+            changed = self._changed_vals(record, vals)
+            if changed:
+                groups[tuple(sorted(changed.items()))].append(record.id)
+        for items, ids in groups.items():
+            record_vals[0][0].browse(ids).write(dict(items))
+
+    @api.model
+    def _write_each(self, records, fname, value_ids):
+        """Write a different many2one value on every record with one query.
+
+        Values are written in SQL without mail tracking, for links generated
+        by the module such as products and bills of materials.
+
+        Args:
+            records: Records to write on
+            fname (str): Name of a stored many2one field of ``records``
+            value_ids (list): Ids to write, in the order of ``records``
+        """
+        if not records:
+            return
+        records.flush([fname])
+        records.modified([fname])
+        self.env.cr.execute("""
+            UPDATE "{table}" record
+               SET "{column}" = data.value_id, write_uid = %s, write_date = %s
+              FROM unnest(%s::integer[], %s::integer[]) AS data(id, value_id)
+             WHERE record.id = data.id
+        """.format(table=records._table, column=fname), (
+            self.env.uid, fields.Datetime.now(), records.ids, list(value_ids),
+        ))
+        records.invalidate_cache([fname])
+        records.modified([fname])
+
+    @api.model
+    def _upsert(self, model_name, keyed_vals, existing, conflict_columns=None):
+        """Create or update records of ``model_name`` in bulk.
+
+        Args:
+            keyed_vals (dict): Values to store, keyed by business key
+            existing (dict): Already existing records, keyed the same way
+            conflict_columns (tuple): Columns of a unique constraint; when
+                given, new records are inserted with ``_sql_upsert`` instead
+                of the ORM
+        Returns:
+            dict: Record ids keyed by business key
+        """
+        model = self.env[model_name]
+        to_write = [(existing[key], vals) for key, vals in keyed_vals.items() if key in existing]
+        if to_write:
+            self._write_grouped(to_write)
+
+        new_keys = [key for key in keyed_vals if key not in existing]
+        result = {key: record.id for key, record in existing.items()}
+        if not new_keys:
+            return result
+        vals_list = [keyed_vals[key] for key in new_keys]
+        if conflict_columns:
+            ids = self._sql_upsert(model_name, vals_list, conflict_columns)
+            result.update(
+                (key, ids[tuple(vals[column] for column in conflict_columns)])
+                for key, vals in zip(new_keys, vals_list)
+            )
+        else:
+            result.update(zip(new_keys, model.create(vals_list).ids))
+        return result
+
+    @api.model
+    def _sql_upsert(self, model_name, vals_list, conflict_columns):
+        """Insert records with ``INSERT ... ON CONFLICT DO UPDATE``.
+
+        A row inserted meanwhile by a concurrent transaction makes the
+        statement wait for that transaction. If it commits, the snapshot of
+        this one cannot see the row and PostgreSQL raises a serialization
+        failure, which Odoo retries, instead of a unique violation. Rows are
+        inserted in key order, so concurrent upserts of overlapping rows wait
+        for each other instead of deadlocking.
+
+        Stored computed fields of the new rows and their dependents are
+        marked for recomputation as the ORM would do on ``create``.
+
+        Args:
+            vals_list (list): Values of the records, as for ``create``
+            conflict_columns (tuple): Columns of the unique constraint
+        Returns:
+            dict: Record ids keyed by the tuple of their conflict column values
+        """
+        Model = self.env[model_name]
+        Model.flush()
+        vals_list = sorted(vals_list, key=lambda vals: tuple(str(vals[column]) for column in conflict_columns))
+        defaults = {'active': True} if 'active' in Model._fields else {}
+        names = sorted(set(defaults).union(*vals_list))
+        now = fields.Datetime.now()
+        rows = []
+        for vals in vals_list:
+            vals = dict(defaults, **vals)
+            rows.append([
+                Model._fields[name].convert_to_column(vals.get(name, False), Model)
+                for name in names
+            ] + [self.env.uid, now, self.env.uid, now])
+
+        columns = names + ['create_uid', 'create_date', 'write_uid', 'write_date']
+        updates = [name for name in names if name not in conflict_columns] + ['write_uid', 'write_date']
+        query = """
+            INSERT INTO "{table}" ({columns})
+            VALUES {values}
+            ON CONFLICT ({conflict})
+            DO UPDATE SET {updates}
+            RETURNING id, {conflict}
+        """.format(
+            table=Model._table,
+            columns=", ".join('"%s"' % column for column in columns),
+            values=", ".join(["(%s)" % ", ".join(["%s"] * len(columns))] * len(rows)),
+            conflict=", ".join('"%s"' % column for column in conflict_columns),
+            updates=", ".join('"{0}" = EXCLUDED."{0}"'.format(column) for column in updates),
+        )
+        self.env.cr.execute(query, [value for row in rows for value in row])
+        ids = {tuple(row[1:]): row[0] for row in self.env.cr.fetchall()}
+
+        records = Model.browse(list(ids.values()))
+        records.invalidate_cache()
+        records.modified(names, create=True)
+        for field in Model._fields.values():
+            if field.compute and field.store:
+                self.env.add_to_compute(field, records)
+        return ids
+
+    @api.model
+    def _resolve_missing_uuids(self, model_name, uuids, known):
+        """Add the ids of records referenced by UUID but absent from the
+        payload to ``known``, with a single search.
+
+        Raises:
+            ValidationError: If a referenced record does not exist
+        """
+        missing = set(uuids) - set(known)
+        if not missing:
+            return known
+        Model = self.env[model_name].with_context(active_test=False)
+        found = {record.uuid: record.id for record in Model.search([('uuid', 'in', list(missing))])}
+        if len(found) != len(missing):
+            raise ValidationError(_(
+                "Referenced %(model)s not found: %(uuids)s",
+                model=Model._description,
+                uuids=", ".join(sorted(missing - set(found))),
+            ))
+        known.update(found)
+        return known
+
+    @api.model
+    def _search_component_versions(self, keys):
+        """Return existing component version records keyed by
+        ``(component uuid, version number)``, with a single search."""
+        if not keys:
+            return {}
+        ComponentVersion = self.env['fusion.component.version'].with_context(active_test=False)
+        candidates = ComponentVersion.search([
+            ('fusion_component_id.uuid', 'in', list({key[0] for key in keys})),
+            ('version_number', 'in', list({key[1] for key in keys})),
+        ])
+        found = {}
+        for version in candidates:
+            key = (version.fusion_component_id.uuid, version.version_number)
+            if key in keys:
+                found[key] = version
+        return found
+
+    # ------------------------------------------------------------------
+    # Per-model stages
+    # ------------------------------------------------------------------
+
+    @api.model
+    def _resolve_users(self, users_data):
+        """Return a mapping of Fusion user UUID to ``fusion.user`` id."""
+        if not users_data:
+            return {}
+        return self.env['fusion.user'].get_or_create_users(list(users_data.values()))
+
+    @api.model
+    def _sync_designs(self, designs_data, users):
+        if not designs_data:
+            return {}
+        Design = self.env['fusion.design'].with_context(active_test=False)
+        existing = {
+            design.uuid: design
+            for design in Design.search([('uuid', 'in', list(designs_data))])
+        }
+        keyed_vals = {
+            uuid: {
+                'uuid': uuid,
+                'name': data.get('name'),
+                'creation_date': data.get('creation_date'),
+                'created_by': users.get(self._user_key(data.get('created_by')), False),
+            }
+            for uuid, data in designs_data.items()
+        }
+        return self._upsert('fusion.design', keyed_vals, existing, conflict_columns=('uuid',))
+
+    @api.model
+    def _is_unchanged(self, record, data):
+        """Return whether ``record`` was last synchronized from ``data``.
+
+        Flat records carry no content hash and are always written.
+        """
+        if not record or not data['sync_hash'] or self.env.context.get('fusion_sync_force'):
+            return False
+        return record.sync_hash == data['sync_hash']
+
+    @api.model
+    def _sync_design_versions(self, versions_data, designs, users):
+        """Create or update design versions, skipping unchanged ones.
+
+        Returns:
+            tuple: Design version ids keyed by UUID, and the set of UUIDs
+                whose payload did not change since the last sync
+        """
+        if not versions_data:
+            return {}, set()
+        self._resolve_missing_uuids(
+            'fusion.design', [data['design_uuid'] for data in versions_data.values()], designs
+        )
+        DesignVersion = self.env['fusion.design.version'].with_context(active_test=False)
+        existing = {
+            version.uuid: version
+            for version in DesignVersion.search([('uuid', 'in', list(versions_data))])
+        }
+        unchanged = {
+            uuid for uuid, data in versions_data.items()
+            if self._is_unchanged(existing.get(uuid), data)
+        }
+        keyed_vals = {
+            uuid: {
+                'fusion_design_id': designs[data['design_uuid']],
+                'version_number': data.get('version_number'),
+                'uuid': uuid,
+                'revision_date': data.get('revision_date'),
+                'modified_by': users.get(self._user_key(data.get('modified_by')), False),
+                'sync_hash': data['sync_hash'],
+            }
+            for uuid, data in versions_data.items()
+            if uuid not in unchanged
+        }
+        return self._upsert('fusion.design.version', keyed_vals, existing, conflict_columns=('uuid',)), unchanged
+
+    @api.model
+    def _sync_components(self, components_data, users):
+        if not components_data:
+            return {}
+        Component = self.env['fusion.component'].with_context(active_test=False)
+        cache = self._get_component_cache()
+        components = Component.browse([cache[uuid] for uuid in components_data if uuid in cache])
+        missing = [uuid for uuid in components_data if uuid not in cache]
+        if missing:
+            components |= Component.search([('uuid', 'in', missing)])
+        existing = {component.uuid: component for component in components}
+        keyed_vals = {}
+        for uuid, data in components_data.items():
+            vals = {
+                'uuid': uuid,
+                'name': data.get('name'),
+                'creation_date': data.get('creation_date') or data.get('revision_date'),
+            }
+            created_by = users.get(self._user_key(data.get('created_by')))
+            if created_by:
+                vals['created_by'] = created_by
+            keyed_vals[uuid] = vals
+        ids = self._upsert('fusion.component', keyed_vals, existing, conflict_columns=('uuid',))
+        cache.update(ids)
+        return ids
+
+    @api.model
+    def _sync_component_versions(self, versions_data, components, design_versions, users,
+                                 unchanged_design_versions=()):
+        """Create or update component versions, skipping unchanged ones.
+
+        Returns:
+            tuple: Component version ids keyed by ``(component uuid, version
+                number)``, and the set of keys whose payload did not change
+                since the last sync
+        """
+        if not versions_data:
+            return {}, set()
+        self._resolve_missing_uuids(
+            'fusion.design.version', [data['design_version_uuid'] for data in versions_data.values()], design_versions
+        )
+        ComponentVersion = self.env['fusion.component.version'].with_context(active_test=False)
+        candidates = ComponentVersion.search([
+            ('fusion_component_id', 'in', list(set(components.values()))),
+            ('version_number', 'in', list({key[1] for key in versions_data})),
+        ])
+        component_uuids = {component_id: uuid for uuid, component_id in components.items()}
+        existing = {}
+        for version in candidates:
+            key = (component_uuids[version.fusion_component_id.id], version.version_number)
+            if key in versions_data:
+                existing[key] = version
+        unchanged = {
+            key for key, data in versions_data.items()
+            if data['design_version_uuid'] in unchanged_design_versions
+            or self._is_unchanged(existing.get(key), data)
+        }
+        unchanged.intersection_update(existing)
+        keyed_vals = {}
+        for key, data in versions_data.items():
+            if key in unchanged:
+                continue
+            vals = {
+                'fusion_component_id': components[key[0]],
+                'version_number': key[1],
+                'revision_date': data.get('revision_date'),
+                'modified_by': users.get(self._user_key(data.get('modified_by')), False),
+                'sync_hash': data['sync_hash'],
+            }
+            if key not in existing:
+                # Shared versions keep the design version they were first seen in
+                vals['fusion_design_version_id'] = design_versions[data['design_version_uuid']]
+            if key not in existing or data['version_uuid_given']:
+                # Derived UUIDs never replace one sent by Fusion 360
+                vals['uuid'] = data['version_uuid']
+            keyed_vals[key] = vals
+        return self._upsert(
+            'fusion.component.version', keyed_vals, existing,
+            conflict_columns=('fusion_component_id', 'version_number'),
+        ), unchanged
+
+    @api.model
+    def _sync_component_usages(self, usages, design_versions, component_versions, replace_uuids):
+        """Link component versions to the design versions using them.
+
+        Args:
+            usages (list): ``(design version uuid, component version key)`` pairs
+            replace_uuids (set): Design versions whose complete component list
+                is in the payload; their links are replaced instead of
+                extended
+        """
+        linked = defaultdict(set)
+        for design_version_uuid, key in usages:
+            linked[design_version_uuid].add(component_versions[key])
+        DesignVersion = self.env['fusion.design.version']
+        for design_version_uuid in replace_uuids:
+            linked.setdefault(design_version_uuid, set())
+        for design_version_uuid, component_version_ids in linked.items():
+            design_version = DesignVersion.browse(design_versions[design_version_uuid])
+            if design_version_uuid in replace_uuids:
+                if set(design_version.component_version_ids.ids) != component_version_ids:
+                    design_version.write({'component_version_ids': [(6, 0, list(component_version_ids))]})
+            elif component_version_ids - set(design_version.component_version_ids.ids):
+                design_version.write({'component_version_ids': [(4, version_id) for version_id in component_version_ids]})
+
+    @api.model
+    def _child_ref(self, line_data):
+        """Return the reference of an assembly line to its child: the
+        version UUID when given, the component UUID and optional version
+        number otherwise."""
+        if line_data.get('child_version_uuid'):
+            return ('version', line_data['child_version_uuid'])
+        return ('component', line_data.get('child_component_version_id'), line_data.get('child_version_number'))
+
+    @api.model
+    def _resolve_child_keys(self, assembly_lines, component_versions, version_uuids):
+        """Map the child reference of every assembly line to a component
+        version id.
+
+        Children are looked up in the UUID map of the payload first, which
+        costs no query; the remaining references are resolved with one
+        search by version UUID and one search on the versions of the
+        referenced components.
+        """
+        latest_in_payload = {}
+        for component_uuid, version_number in component_versions:
+            if version_number >= latest_in_payload.get(component_uuid, 0):
+                latest_in_payload[component_uuid] = version_number
+
+        resolved = {}
+        unresolved = set()
+        for __, line_data in assembly_lines:
+            ref = self._child_ref(line_data)
+            if ref in resolved:
+                continue
+            if ref[0] == 'version':
+                key = version_uuids.get(ref[1])
+            elif ref[2] is not None:
+                key = (ref[1], self._parse_version_number(ref[2]))
+            else:
+                key = (ref[1], latest_in_payload.get(ref[1]))
+            if key in component_versions:
+                resolved[ref] = component_versions[key]
+            else:
+                unresolved.add(ref)
+
+        ComponentVersion = self.env['fusion.component.version'].with_context(active_test=False)
+        uuid_refs = {ref[1] for ref in unresolved if ref[0] == 'version'}
+        if uuid_refs:
+            for version in ComponentVersion.search([('uuid', 'in', list(uuid_refs))]):
+                resolved[('version', version.uuid)] = version.id
+        component_refs = [ref for ref in unresolved if ref[0] == 'component']
+        if component_refs:
+            candidates = ComponentVersion.search([
+                ('fusion_component_id.uuid', 'in', list({ref[1] for ref in component_refs})),
+            ])
+            by_uuid = defaultdict(dict)
+            for version in candidates:
+                by_uuid[version.fusion_component_id.uuid][version.version_number] = version.id
+            for ref in component_refs:
+                versions = by_uuid.get(ref[1])
+                if not versions:
+                    continue
+                if ref[2] is None:
+                    resolved[ref] = versions[max(versions)]
+                elif self._parse_version_number(ref[2]) in versions:
+                    resolved[ref] = versions[self._parse_version_number(ref[2])]
+        if not unresolved.issubset(resolved):
+            raise ValidationError(_("Child component version not found."))
+        return resolved
+
+    @api.model
+    def _topological_order(self, edges):
+        """Return the parents of ``edges`` with every sub-assembly before the
+        assemblies using it.
+
+        Args:
+            edges (iterable): ``(parent_id, child_id)`` pairs
+        Raises:
+            ValidationError: If the edges contain an assembly cycle
+        """
+        pending = defaultdict(set)
+        for parent_id, child_id in edges:
+            pending[parent_id].add(child_id)
+        for parent_id, children in pending.items():
+            children.intersection_update(pending)
+        users = defaultdict(set)
+        for parent_id, children in pending.items():
+            for child_id in children:
+                users[child_id].add(parent_id)
+
+        ready = sorted(parent_id for parent_id, children in pending.items() if not children)
+        order = []
+        while ready:
+            child_id = ready.pop()
+            order.append(child_id)
+            for parent_id in users[child_id]:
+                pending[parent_id].discard(child_id)
+                if not pending[parent_id]:
+                    ready.append(parent_id)
+        if len(order) != len(pending):
+            raise ValidationError(_("Recursive assembly reference detected."))
+        return order
+
+    @api.model
+    def _sync_assembly_lines(self, assembly_lines, component_versions, version_uuids=None):
+        """Create or update assembly lines in one bulk pass.
+
+        Lines are written once every component version of the payload
+        exists, sub-assemblies first, so the order of the payload does not
+        matter and cycles are rejected before anything is written.
+        """
+        if not assembly_lines:
+            return {}
+        missing_parents = {key for key, __ in assembly_lines if key not in component_versions}
+        if missing_parents:
+            found = self._search_component_versions(missing_parents)
+            if len(found) != len(missing_parents):
+                raise ValidationError(_("Parent component version not found."))
+            component_versions = dict(component_versions)
+            component_versions.update((key, version.id) for key, version in found.items())
+        # Shared sub-assemblies may be synced by other designs at the same time
+        self._advisory_lock(LOCK_ASSEMBLY, {component_versions[key] for key, __ in assembly_lines})
+        children = self._resolve_child_keys(assembly_lines, component_versions, version_uuids or {})
+        keyed_vals = {}
+        for parent_key, line_data in assembly_lines:
+            parent_id = component_versions[parent_key]
+            child_id = children[self._child_ref(line_data)]
+            keyed_vals[(parent_id, child_id)] = {
+                'fusion_component_version_id': parent_id,
+                'child_component_version_id': child_id,
+                'quantity': line_data.get('quantity', 1),
+                'sequence': line_data.get('sequence', 10),
+            }
+        rank = {parent_id: index for index, parent_id in enumerate(self._topological_order(keyed_vals))}
+        keyed_vals = dict(sorted(keyed_vals.items(), key=lambda item: rank[item[0][0]]))
+
+        AssemblyLine = self.env['fusion.component.version.assembly.line']
+        existing = {}
+        for line in AssemblyLine.search([('fusion_component_version_id', 'in', list({key[0] for key in keyed_vals}))]):
+            key = (line.fusion_component_version_id.id, line.child_component_version_id.id)
+            if key in keyed_vals and key not in existing:
+                existing[key] = line
+        return self._upsert('fusion.component.version.assembly.line', keyed_vals, existing)
+
+    # ------------------------------------------------------------------
+    # Tracking retention
+    # ------------------------------------------------------------------
+
+    _TRACKED_MODELS = (
+        'fusion.design',
+        'fusion.design.version',
+        'fusion.component',
+        'fusion.component.version',
+        'fusion.component.version.assembly.line',
+    )
+
+    # Tracked fields only written by the sync; tracking values of these
+    # fields posted before the sync subtype existed came from imports
+    _SYNC_TRACKED_FIELDS = (
+        'uuid', 'creation_date', 'created_by', 'revision_date', 'modified_by', 'version_number',
+        'fusion_design_id', 'fusion_design_version_id', 'fusion_component_id',
+        'fusion_component_version_id', 'child_component_version_id',
+    )
+
+    # Messages posted by imports: with the sync subtype, or before the
+    # upgrade with a note or no subtype and only tracking values of fields
+    # written by the sync
+    _SYNC_MESSAGE_CONDITIONS = {
+        'sync': """
+            message.subtype_id = %(subtype_id)s
+        """,
+        'legacy': """
+            (message.subtype_id IS NULL OR message.subtype_id = %(note_subtype_id)s)
+            AND NOT EXISTS (
+                SELECT 1
+                  FROM mail_tracking_value value
+                  JOIN ir_model_fields field ON field.id = value.field
+                 WHERE value.mail_message_id = message.id
+                   AND field.name NOT IN %(sync_fields)s
+            )
+        """,
+    }
+
+    @api.model
+    def _cron_compact_tracking(self, chunk_size=10000):
+        """Remove old tracking values posted by Fusion 360 imports and the
+        notification messages left empty by their removal, in chunks.
+
+        Messages with the ``mt_fusion_sync`` subtype are compacted, as well as
+        the tracking messages posted by imports before the upgrade that
+        introduced it, dated before ``fusion_sync.legacy_tracking_date``; the
+        tracking of manual edits is kept.
+        """
+        subtype = self.env.ref('fusion_sync.mt_fusion_sync', raise_if_not_found=False)
+        if not subtype:
+            return
+        ICP = self.env['ir.config_parameter'].sudo()
+        retention_days = int(ICP.get_param('fusion_sync.tracking_retention_days', 30))
+        limit_date = fields.Datetime.now() - timedelta(days=retention_days)
+        params = {
+            'models': self._TRACKED_MODELS,
+            'subtype_id': subtype.id,
+            'note_subtype_id': self.env.ref('mail.mt_note').id,
+            'sync_fields': self._SYNC_TRACKED_FIELDS,
+            'limit_date': limit_date,
+            'chunk_size': chunk_size,
+        }
+        self.env['mail.message'].flush()
+        self._compact_tracking('sync', params)
+
+        legacy_date = ICP.get_param('fusion_sync.legacy_tracking_date')
+        if legacy_date:
+            legacy_date = fields.Datetime.to_datetime(legacy_date)
+            removed = self._compact_tracking('legacy', dict(params, limit_date=min(limit_date, legacy_date)))
+            if not removed and limit_date >= legacy_date:
+                # Every legacy message has been compacted
+                ICP.set_param('fusion_sync.legacy_tracking_date', False)
+        self.env['mail.message'].invalidate_cache()
+
+    @api.model
+    def _compact_tracking(self, messages, params):
+        """Remove the tracking values of the messages matching a condition of
+        ``_SYNC_MESSAGE_CONDITIONS``, then the messages left empty.
+
+        Returns:
+            int: The number of removed tracking values and messages
+        """
+        condition = self._SYNC_MESSAGE_CONDITIONS[messages]
+        queries = ["""
+            DELETE FROM mail_tracking_value
+             WHERE id IN (
+                SELECT value.id
+                  FROM mail_tracking_value value
+                  JOIN mail_message message ON message.id = value.mail_message_id
+                 WHERE message.model IN %(models)s
+                   AND message.date < %(limit_date)s
+                   AND {condition}
+                 LIMIT %(chunk_size)s
+             )
+        """, """
+            DELETE FROM mail_message
+             WHERE id IN (
+                SELECT message.id
+                  FROM mail_message message
+                 WHERE message.model IN %(models)s
+                   AND message.date < %(limit_date)s
+                   AND {condition}
+                   AND message.message_type = 'notification'
+                   AND COALESCE(message.body, '') = ''
+                   AND NOT EXISTS (SELECT 1 FROM mail_tracking_value value WHERE value.mail_message_id = message.id)
+                   AND NOT EXISTS (SELECT 1 FROM message_attachment_rel rel WHERE rel.message_id = message.id)
+                 LIMIT %(chunk_size)s
+             )
+        """]
+        total = 0
+        for query in queries:
+            while True:
+                self.env.cr.execute(query.format(condition=condition), params)
+                removed = self.env.cr.rowcount
+                total += removed
+                if not self.env.registry.in_test_mode():
+                    self.env.cr.commit()
+                if removed < params['chunk_size']:
+                    break
+        return total
+
+    # ------------------------------------------------------------------
+    # Version retention
+    # ------------------------------------------------------------------
+
+    _SUPERSEDED_VERSIONS_QUERIES = {
+        'fusion.design.version': """
+            SELECT version.id
+              FROM (SELECT id, active, pinned,
+                           row_number() OVER (PARTITION BY fusion_design_id ORDER BY version_number DESC) AS rank
+                      FROM fusion_design_version) version
+             WHERE version.active
+               AND version.pinned IS NOT TRUE
+               AND version.rank > %(keep)s
+             LIMIT %(chunk_size)s
+        """,
+        # Component versions still used by an active design version or
+        # assembly, or referenced by an active bill of materials, are kept
+        'fusion.component.version': """
+            SELECT version.id
+              FROM (SELECT id, active, pinned, bom_id,
+                           row_number() OVER (PARTITION BY fusion_component_id ORDER BY version_number DESC) AS rank
+                      FROM fusion_component_version) version
+             WHERE version.active
+               AND version.pinned IS NOT TRUE
+               AND version.rank > %(keep)s
+               AND NOT EXISTS (
+                   SELECT 1 FROM mrp_bom bom WHERE bom.id = version.bom_id AND bom.active
+               )
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM fusion_design_version_component_version_rel usage
+                     JOIN fusion_design_version design_version ON design_version.id = usage.design_version_id
+                    WHERE usage.component_version_id = version.id AND design_version.active
+               )
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM fusion_component_version_assembly_line line
+                     JOIN fusion_component_version parent ON parent.id = line.fusion_component_version_id
+                    WHERE line.child_component_version_id = version.id AND parent.active
+               )
+             LIMIT %(chunk_size)s
+        """,
+    }
+
+    @api.model
+    def _cron_archive_versions(self, chunk_size=1000):
+        """Archive design and component versions superseded by the last
+        ``fusion_sync.version_retention`` versions, in chunks.
+
+        Archived versions stay in their tables but drop out of the default
+        searches, the version counts and the partial indexes of the working
+        set; they are restored with ``action_unarchive``.
+        """
+        keep = int(self.env['ir.config_parameter'].sudo().get_param('fusion_sync.version_retention', 0))
+        if keep < 1:
+            return
+        params = {'keep': keep, 'chunk_size': chunk_size}
+        for model_name, query in self._SUPERSEDED_VERSIONS_QUERIES.items():
+            Model = self.env[model_name].with_context(tracking_disable=True)
+            while True:
+                self.flush()
+                self.env.cr.execute(query, params)
+                ids = [row[0] for row in self.env.cr.fetchall()]
+                if not ids:
+                    break
+                Model.browse(ids).write({'active': False})
+                _logger.info("Archived %d superseded %s records", len(ids), model_name)
+                if not self.env.registry.in_test_mode():
+                    self.env.cr.commit()
+
+    # ------------------------------------------------------------------
+    # Catalog maintenance
+    # ------------------------------------------------------------------
+
+    # Stored counters and the SQL counting them for the row ``parent``, with
+    # the same active filtering as the one2many and many2many fields
+    _CATALOG_COUNTS = [
+        ('fusion.design', 'version_count', """
+            SELECT count(*) FROM fusion_design_version child
+             WHERE child.fusion_design_id = parent.id AND child.active
+        """),
+        ('fusion.component', 'version_count', """
+            SELECT count(*) FROM fusion_component_version child
+             WHERE child.fusion_component_id = parent.id AND child.active
+        """),
+        ('fusion.design.version', 'component_count', """
+            SELECT count(*)
+              FROM fusion_design_version_component_version_rel usage
+              JOIN fusion_component_version child ON child.id = usage.component_version_id
+             WHERE usage.design_version_id = parent.id AND child.active
+        """),
+        ('fusion.component.version', 'assembly_line_count', """
+            SELECT count(*) FROM fusion_component_version_assembly_line child
+             WHERE child.fusion_component_version_id = parent.id
+        """),
+        ('fusion.component.version', 'used_in_count', """
+            SELECT count(*) FROM fusion_component_version_assembly_line child
+             WHERE child.child_component_version_id = parent.id
+        """),
+    ]
+
+    @api.model
+    def _recompute_catalog_counts(self, chunk_size=10000):
+        """Recompute the stored counters of the whole catalog.
+
+        Records are processed in id ranges of ``chunk_size`` rows with one
+        SQL update per range, committing after each, so memory use does not
+        depend on the size of the catalog.
+
+        Returns:
+            dict: Number of corrected rows per ``model.field``
+        """
+        self.flush()
+        corrected = {}
+        for model_name, fname, count_query in self._CATALOG_COUNTS:
+            table = self.env[model_name]._table
+            corrected['%s.%s' % (model_name, fname)] = 0
+            last_id = 0
+            while True:
+                self.env.cr.execute(
+                    'SELECT id FROM "{}" WHERE id > %s ORDER BY id LIMIT %s'.format(table),
+                    (last_id, chunk_size),
+                )
+                ids = [row[0] for row in self.env.cr.fetchall()]
+                if not ids:
+                    break
+                last_id = ids[-1]
+                self.env.cr.execute("""
+                    UPDATE "{table}" parent
+                       SET "{fname}" = ({count})
+                     WHERE parent.id = ANY(%s)
+                       AND parent."{fname}" IS DISTINCT FROM ({count})
+                """.format(table=table, fname=fname, count=count_query), [ids])
+                corrected['%s.%s' % (model_name, fname)] += self.env.cr.rowcount
+                if not self.env.registry.in_test_mode():
+                    self.env.cr.commit()
+            self.env[model_name].invalidate_cache([fname])
+        _logger.info("Fusion Sync: recomputed catalog counts, corrected %s", corrected)
+        return corrected
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    _REPORT_MODELS = ['fusion.component.version.report', 'fusion.design.version.report']
+
+    @api.model
+    def _trigger_report_refresh(self):
+        """Schedule the refresh of the reporting views when they are
+        materialized, so imports never wait for the aggregation."""
+        if self.env['fusion.report.mixin']._is_materialized():
+            self.env.ref('fusion_sync.ir_cron_fusion_sync_refresh_reports')._trigger()
+
+    @api.model
+    def _rebuild_reports(self):
+        """Recreate the reporting views, as plain or materialized views
+        depending on the ``fusion_sync.report_materialized`` parameter."""
+        self.flush()
+        for model_name in self._REPORT_MODELS:
+            self.env[model_name].init()
+            self.env[model_name].invalidate_cache()
+
+    @api.model
+    def _refresh_reports(self):
+        """Refresh the materialized reporting views."""
+        self.flush()
+        for model_name in self._REPORT_MODELS:
+            self.env[model_name]._refresh()
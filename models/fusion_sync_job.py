@@ -0,0 +1,232 @@
+import json
+import logging
+from datetime import timedelta
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError, ValidationError
+
+_logger = logging.getLogger(__name__)
+
+class FusionSyncJob(models.Model):
+    """Background synchronization of one Fusion 360 design.
+
+    The add-in enqueues its payload and polls the job state; the payload is
+    processed by the job cron workers, each job in its own transaction.
+    Jobs for the same design run in submission order, jobs for different
+    designs run in parallel on as many workers as configured.
+    """
+    _name = 'fusion.sync.job'
+    _description = 'Fusion Sync Job'
+    _order = 'id desc'
+
+    name = fields.Char(string='Design Name', readonly=True, help="Name of the design in the payload")
+    design_uuid = fields.Char(string='Design UUID', required=True, readonly=True, index=True, help="UUID of the design in the payload")
+    payload = fields.Text(string='Payload', required=True, readonly=True, help="JSON design structure to synchronize")
+    state = fields.Selection(
+        selection=[
+            ('pending', 'Pending'),
+            ('running', 'Running'),
+            ('done', 'Done'),
+            ('failed', 'Failed'),
+        ],
+        string='Status',
+        required=True,
+        default='pending',
+        readonly=True,
+        index=True,
+    )
+    attempts = fields.Integer(string='Attempts', readonly=True, help="Number of times the job has been run")
+    max_attempts = fields.Integer(string='Max Attempts', default=lambda self: self._default_max_attempts(), help="Number of runs after which the job is marked as failed")
+    next_attempt_date = fields.Datetime(string='Next Attempt', readonly=True, help="The job is not run before this date")
+    date_started = fields.Datetime(string='Started On', readonly=True)
+    date_done = fields.Datetime(string='Done On', readonly=True)
+    fusion_design_id = fields.Many2one(comodel_name='fusion.design', string='Fusion Design', readonly=True, ondelete='set null', help="Design synchronized by this job")
+    error = fields.Text(string='Error', readonly=True, help="Error raised by the last attempt")
+
+    @api.model
+    def _get_param(self, key, default):
+        return int(self.env['ir.config_parameter'].sudo().get_param('fusion_sync.%s' % key, default))
+
+    @api.model
+    def _default_max_attempts(self):
+        return self._get_param('job_max_attempts', 5)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    @api.model
+    def enqueue_design_structure(self, design_structure):
+        """Queue a design structure for background synchronization.
+
+        Args:
+            design_structure (dict): Same structure as accepted by
+                ``fusion.design.sync_design_structure``
+        Returns:
+            int: The id of the created job
+        """
+        return self.enqueue_design_structures([design_structure])[0]
+
+    @api.model
+    def enqueue_design_structures(self, design_structures):
+        """Queue several design structures, one job per design.
+
+        Returns:
+            list: The ids of the created jobs, in payload order
+        """
+        vals_list = []
+        for design_structure in design_structures:
+            design_data = design_structure.get('fusion_design') or {}
+            if not design_data.get('uuid'):
+                raise ValidationError(_("UUID is required to sync a Fusion design."))
+            vals_list.append({
+                'name': design_data.get('name'),
+                'design_uuid': design_data['uuid'],
+                'payload': json.dumps(design_structure),
+            })
+        jobs = self.create(vals_list)
+        self.env.ref('fusion_sync.ir_cron_fusion_sync_job')._trigger()
+        return jobs.ids
+
+    @api.model
+    def get_job_status(self, job_ids):
+        """Return the status of the given jobs for polling clients."""
+        return [{
+            'id': job.id,
+            'state': job.state,
+            'attempts': job.attempts,
+            'next_attempt_date': job.next_attempt_date,
+            'fusion_design_id': job.fusion_design_id.id,
+            'error': job.error,
+        } for job in self.browse(job_ids).exists()]
+
+    def action_retry(self):
+        if any(job.state not in ('failed', 'done') for job in self):
+            raise UserError(_("Only finished jobs can be retried."))
+        self.write({'state': 'pending', 'attempts': 0, 'next_attempt_date': False, 'error': False})
+        self.env.ref('fusion_sync.ir_cron_fusion_sync_job')._trigger()
+
+    # ------------------------------------------------------------------
+    # Workers
+    # ------------------------------------------------------------------
+
+    def _commit(self):
+        if not self.env.registry.in_test_mode():
+            self.env.cr.commit()
+
+    @api.model
+    def _ensure_worker_crons(self):
+        """Keep one cron per configured worker so jobs run in parallel.
+
+        The main cron manages the additional worker crons, which only process
+        jobs.
+        """
+        main_cron = self.env.ref('fusion_sync.ir_cron_fusion_sync_job').sudo()
+        workers = max(self._get_param('job_workers', 1), 1)
+        worker_code = 'model._cron_process_jobs()'
+        Cron = self.env['ir.cron'].sudo().with_context(active_test=False)
+        extra_crons = Cron.search([
+            ('model_id', '=', main_cron.model_id.id),
+            ('code', '=', worker_code),
+            ('id', '!=', main_cron.id),
+        ], order='id')
+        for index in range(len(extra_crons) + 1, workers):
+            extra_crons |= main_cron.copy({
+                'name': _("%(name)s (worker %(index)s)", name=main_cron.name, index=index + 1),
+                'code': worker_code,
+            })
+        extra_crons[:workers - 1].filtered(lambda cron: not cron.active).write({'active': True})
+        extra_crons[workers - 1:].filtered('active').write({'active': False})
+
+    @api.model
+    def _requeue_stale_jobs(self):
+        """Put back jobs whose worker died while running them."""
+        timeout = self._get_param('job_timeout', 3600)
+        stale = self.search([
+            ('state', '=', 'running'),
+            ('date_started', '<', fields.Datetime.now() - timedelta(seconds=timeout)),
+        ])
+        if stale:
+            _logger.warning("Requeuing %d stale Fusion sync jobs", len(stale))
+            stale.write({'state': 'pending'})
+
+    @api.model
+    def _acquire_next_job(self):
+        """Lock and mark as running the oldest job ready to run.
+
+        A job is only eligible when no earlier job of the same design is
+        still pending or running, so designs are synchronized in submission
+        order while different designs are picked up by different workers.
+        """
+        self.flush()
+        self.env.cr.execute("""
+            SELECT job.id
+              FROM fusion_sync_job job
+             WHERE job.state = 'pending'
+               AND (job.next_attempt_date IS NULL OR job.next_attempt_date <= now() at time zone 'UTC')
+               AND NOT EXISTS (
+                   SELECT 1
+                     FROM fusion_sync_job previous
+                    WHERE previous.design_uuid = job.design_uuid
+                      AND previous.id < job.id
+                      AND previous.state IN ('pending', 'running')
+               )
+          ORDER BY job.id
+             LIMIT 1
+               FOR UPDATE SKIP LOCKED
+        """)
+        row = self.env.cr.fetchone()
+        if not row:
+            return self.browse()
+        job = self.browse(row[0])
+        job.write({'state': 'running', 'date_started': fields.Datetime.now()})
+        self._commit()
+        return job
+
+    @api.model
+    def _cron_process_jobs(self, limit=None, manage_workers=False):
+        """Run ready jobs until none are left or ``limit`` is reached."""
+        if manage_workers:
+            self._ensure_worker_crons()
+            self._requeue_stale_jobs()
+            self._commit()
+        limit = limit or self._get_param('job_batch_size', 50)
+        for __ in range(limit):
+            job = self._acquire_next_job()
+            if not job:
+                break
+            job._run()
+
+    def _run(self):
+        self.ensure_one()
+        attempts = self.attempts + 1
+        try:
+            with self.env.cr.savepoint():
+                design = self.env['fusion.design'].sync_design_structure(json.loads(self.payload))
+        except Exception as e:
+            # Values cached by the rolled back savepoint are no longer valid
+            Engine = self.env['fusion.sync.engine']
+            Engine._clear_caches()
+            if Engine._is_concurrency_error(e):
+                # Another transaction changed the same records: run again
+                # right away, in a new transaction, without using an attempt
+                _logger.info("Fusion sync job %s conflicted with a concurrent import, requeued", self.id)
+                self.write({'state': 'pending', 'next_attempt_date': False})
+                self._commit()
+                return
+            _logger.exception("Fusion sync job %s failed (attempt %d)", self.id, attempts)
+            vals = {'attempts': attempts, 'error': str(e)}
+            if attempts >= self.max_attempts:
+                vals.update(state='failed', date_done=fields.Datetime.now())
+            else:
+                delay = self._get_param('job_retry_delay', 60) * 2 ** (attempts - 1)
+                vals.update(state='pending', next_attempt_date=fields.Datetime.now() + timedelta(seconds=delay))
+        else:
+            vals = {
+                'state': 'done',
+                'attempts': attempts,
+                'date_done': fields.Datetime.now(),
+                'fusion_design_id': design.id,
+                'error': False,
+            }
+        self.write(vals)
+        self._commit()
@@ -0,0 +1,171 @@
+import base64
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from odoo import api, fields, models, SUPERUSER_ID
+
+_logger = logging.getLogger(__name__)
+
+
+class SyncProfiler:
+    """Collect wall time, query count and rows per stage of one sync."""
+
+    def __init__(self, cr, with_cprofile=False):
+        self.cr = cr
+        self.stages = []
+        self.duration = 0.0
+        self.query_count = 0
+        self.cprofile = cProfile.Profile() if with_cprofile else None
+
+    @contextmanager
+    def run(self):
+        start, queries = time.time(), self.cr.sql_log_count
+        if self.cprofile:
+            self.cprofile.enable()
+        try:
+            yield self
+        finally:
+            if self.cprofile:
+                self.cprofile.disable()
+            self.duration = time.time() - start
+            self.query_count = self.cr.sql_log_count - queries
+
+    @contextmanager
+    def stage(self, name, model_name):
+        stats = {'name': name, 'model': model_name, 'rows': 0}
+        start, queries = time.time(), self.cr.sql_log_count
+        try:
+            yield stats
+        finally:
+            stats['duration'] = time.time() - start
+            stats['query_count'] = self.cr.sql_log_count - queries
+            self.stages.append(stats)
+
+    def get_profile_data(self):
+        """Return the cProfile statistics as a pstats file and as text."""
+        if not self.cprofile:
+            return False, False
+        self.cprofile.create_stats()
+        stream = io.StringIO()
+        pstats.Stats(self.cprofile, stream=stream).sort_stats('cumulative').print_stats(50)
+        return base64.b64encode(marshal.dumps(self.cprofile.stats)), stream.getvalue()
+
+
+class FusionSyncLog(models.Model):
+    _name = 'fusion.sync.log'
+    _description = 'Fusion Sync Log'
+    _order = 'id desc'
+
+    name = fields.Char(string='Designs', readonly=True, help="Designs synchronized by this import")
+    state = fields.Selection(
+        selection=[('done', 'Done'), ('failed', 'Failed')],
+        string='Status',
+        required=True,
+        default='done',
+        readonly=True,
+    )
+    duration = fields.Float(string='Duration (s)', readonly=True, group_operator='avg', help="Wall time of the whole import")
+    query_count = fields.Integer(string='Queries', readonly=True, group_operator='avg', help="Number of SQL queries of the whole import")
+    record_count = fields.Integer(string='Records', readonly=True, group_operator='avg', help="Number of records in the payload")
+    error = fields.Text(string='Error', readonly=True)
+    stage_ids = fields.One2many(comodel_name='fusion.sync.log.stage', inverse_name='log_id', string='Stages', readonly=True)
+    profile_file = fields.Binary(string='cProfile Dump', attachment=True, readonly=True, help="pstats file, open with python -m pstats")
+    profile_filename = fields.Char(string='cProfile Filename', readonly=True)
+    profile_stats = fields.Text(string='cProfile Summary', readonly=True)
+
+    @api.model
+    def _new_profiler(self):
+        """Return a profiler for the next import, or None when the import is
+        not sampled.
+
+        A ``fusion_sync.sync_log_sample_rate`` share of the imports is
+        logged, none by default, so batches and per-record retries do not
+        pay for the measurements. The ``fusion_sync_profile`` context key
+        logs an import regardless; cProfile is enabled by
+        ``fusion_sync.sync_log_cprofile`` or the ``fusion_sync_cprofile``
+        context key.
+        """
+        get_param = self.env['ir.config_parameter'].sudo().get_param
+        context = self.env.context
+        if not (context.get('fusion_sync_profile') or context.get('fusion_sync_cprofile')):
+            try:
+                sample_rate = float(get_param('fusion_sync.sync_log_sample_rate', 0))
+            except ValueError:
+                sample_rate = 0
+            if sample_rate <= 0 or random.random() >= sample_rate:
+                return None
+        with_cprofile = context.get('fusion_sync_cprofile') or get_param('fusion_sync.sync_log_cprofile', 'False') not in ('False', '0')
+        return SyncProfiler(self.env.cr, with_cprofile=with_cprofile)
+
+    @api.model
+    def _log_profiler(self, profiler, payload, error=None):
+        """Store the measurements of an import.
+
+        Failed imports are logged from a separate cursor, since their
+        transaction is about to be rolled back.
+        """
+        profile_file, profile_stats = profiler.get_profile_data()
+        vals = {
+            'name': ", ".join(sorted(filter(None, (data.get('name') for data in payload['designs'].values())))),
+            'state': 'failed' if error else 'done',
+            'duration': profiler.duration,
+            'query_count': profiler.query_count,
+            'record_count': sum(
+                len(payload[key])
+                for key in ('designs', 'design_versions', 'component_versions', 'assembly_lines')
+            ),
+            'error': str(error) if error else False,
+            'stage_ids': [(0, 0, {
+                'name': stats['name'],
+                'res_model': stats['model'],
+                'duration': stats['duration'],
+                'query_count': stats['query_count'],
+                'rows': stats['rows'],
+            }) for stats in profiler.stages],
+            'profile_file': profile_file,
+            'profile_filename': profile_file and 'fusion_sync_%s.pstats' % fields.Datetime.now().strftime('%Y%m%d_%H%M%S'),
+            'profile_stats': profile_stats,
+        }
+        if not error:
+            return self.sudo().create(vals)
+        try:
+            with self.env.registry.cursor() as cr:
+                api.Environment(cr, SUPERUSER_ID, {})['fusion.sync.log'].create(vals)
+        except Exception:
+            _logger.exception("Could not log failed Fusion sync")
+
+    @api.model
+    def _cron_gc_logs(self, chunk_size=1000):
+        """Remove the logs older than ``fusion_sync.sync_log_retention_days``,
+        with their stages and cProfile dumps, in chunks."""
+        retention_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'fusion_sync.sync_log_retention_days', 7
+        ))
+        limit_date = fields.Datetime.now() - timedelta(days=retention_days)
+        while True:
+            logs = self.sudo().search([('create_date', '<', limit_date)], limit=chunk_size)
+            if not logs:
+                break
+            logs.unlink()
+            _logger.info("Fusion Sync: removed %d sync logs", len(logs))
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+
+
+class FusionSyncLogStage(models.Model):
+    _name = 'fusion.sync.log.stage'
+    _description = 'Fusion Sync Log Stage'
+    _order = 'log_id desc, id'
+
+    log_id = fields.Many2one(comodel_name='fusion.sync.log', string='Sync Log', required=True, ondelete='cascade', index=True)
+    name = fields.Char(string='Stage', required=True, readonly=True)
+    res_model = fields.Char(string='Model', readonly=True)
+    duration = fields.Float(string='Duration (s)', readonly=True, group_operator='avg')
+    query_count = fields.Integer(string='Queries', readonly=True, group_operator='avg')
+    rows = fields.Integer(string='Rows', readonly=True, group_operator='avg', help="Number of records handled by the stage")
@@ -0,0 +1,18 @@
+from odoo import models
+
+
+class FusionTrackingMixin(models.AbstractModel):
+    """Tag the tracking messages of Fusion 360 imports.
+
+    Field changes made by the sync engine are posted with the internal
+    ``mt_fusion_sync`` subtype instead of as plain notes, so the tracking
+    retention cron can remove them without touching manual edits.
+    """
+    _name = 'fusion.tracking.mixin'
+    _inherit = 'mail.thread'
+    _description = 'Fusion Sync Tracking Mixin'
+
+    def _track_subtype(self, init_values):
+        if self.env.context.get('fusion_sync_import'):
+            return self.env.ref('fusion_sync.mt_fusion_sync', raise_if_not_found=False) or super()._track_subtype(init_values)
+        return super()._track_subtype(init_values)
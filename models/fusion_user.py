@@ -17,3 +17,92 @@ class FusionUser(models.Model):
         string='Related Partner',
         ondelete='set null',
     )
+
+    @api.model
+    def _get_uuid_cache(self):
+        """Return the UUID -> id cache of the current sync call, see
+        ``fusion.sync.engine._with_sync_cache``, or an empty dictionary
+        outside of a sync call."""
+        cache = self.env.context.get('fusion_sync_cache')
+        return cache.users if cache is not None else {}
+
+    @api.model
+    def _parse_user_data(self, user_data):
+        """Return ``(uuid, email)`` for a user payload.
+
+        The payload is either a dictionary with ``uuid`` and ``email`` keys or
+        a plain UUID string.
+        """
+        if not user_data:
+            return False, False
+        if isinstance(user_data, dict):
+            uuid = user_data.get('uuid') or False
+            return uuid, user_data.get('email') or uuid
+        return str(user_data), str(user_data)
+
+    @api.model
+    def get_or_create_user(self, user_data):
+        """Return the id of the Fusion user matching ``user_data``.
+
+        Args:
+            user_data: User payload from Fusion 360, see ``_parse_user_data``
+        Returns:
+            int: The ``fusion.user`` id, or False when no user was given
+        """
+        uuid = self._parse_user_data(user_data)[0]
+        if not uuid:
+            return False
+        return self.get_or_create_users([user_data]).get(uuid, False)
+
+    @api.model
+    def get_or_create_users(self, users_data):
+        """Resolve many user payloads at once.
+
+        Known UUIDs are served from the sync call cache and the others are
+        read with a single query. Only the users still missing are inserted,
+        with ``ON CONFLICT DO NOTHING`` on the ``uuid_uniq`` constraint, so
+        existing users do not consume sequence values. A user inserted
+        meanwhile by a concurrent transaction is not visible to the snapshot
+        of this one: PostgreSQL raises a serialization failure instead of a
+        unique violation, and Odoo retries the transaction.
+
+        Args:
+            users_data (list): User payloads, see ``_parse_user_data``
+        Returns:
+            dict: ``fusion.user`` ids keyed by UUID
+        """
+        cache = self._get_uuid_cache()
+        emails = {}
+        for user_data in users_data:
+            uuid, email = self._parse_user_data(user_data)
+            if uuid and uuid not in cache:
+                emails.setdefault(uuid, email)
+
+        if emails:
+            self.flush(['uuid'])
+            self.env.cr.execute(
+                "SELECT uuid, id FROM fusion_user WHERE uuid IN %s",
+                [tuple(emails)],
+            )
+            cache.update(self.env.cr.fetchall())
+            values = [
+                (uuid, email, self.env.uid, self.env.uid)
+                for uuid, email in sorted(emails.items())
+                if uuid not in cache
+            ]
+            if values:
+                query = """
+                    INSERT INTO fusion_user (uuid, email, create_uid, write_uid, create_date, write_date)
+                    VALUES {}
+                    ON CONFLICT (uuid) DO NOTHING
+                    RETURNING uuid, id
+                """.format(", ".join(["(%s, %s, %s, %s, now() at time zone 'UTC', now() at time zone 'UTC')"] * len(values)))
+                self.env.cr.execute(query, [param for row in values for param in row])
+                cache.update(self.env.cr.fetchall())
+
+        result = {}
+        for user_data in users_data:
+            uuid = self._parse_user_data(user_data)[0]
+            if uuid:
+                result[uuid] = cache[uuid]
+        return result
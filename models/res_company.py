@@ -0,0 +1,10 @@
+from odoo import fields, models
+
+class ResCompany(models.Model):
+    _inherit = 'res.company'
+
+    fusion_sync_tracking = fields.Boolean(
+        string='Track Fusion Sync Changes',
+        help="Log field changes made by Fusion 360 synchronizations in the chatter. "
+             "When unchecked, a single summary is posted per synchronized design version."
+    )
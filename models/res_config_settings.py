@@ -0,0 +1,52 @@
+from odoo import fields, models
+
+class ResConfigSettings(models.TransientModel):
+    _inherit = 'res.config.settings'
+
+    fusion_sync_tracking = fields.Boolean(
+        related='company_id.fusion_sync_tracking',
+        readonly=False,
+    )
+    fusion_sync_tracking_retention_days = fields.Integer(
+        string='Tracking Retention (Days)',
+        config_parameter='fusion_sync.tracking_retention_days',
+        default=30,
+        help="Tracking values posted by Fusion 360 imports older than this, including those of imports made before the upgrade, are removed by the compaction job; manual edits are kept"
+    )
+    fusion_sync_log_retention_days = fields.Integer(
+        string='Sync Log Retention (Days)',
+        config_parameter='fusion_sync.sync_log_retention_days',
+        default=7,
+        help="Sync logs older than this are removed with their stage timings and profiles"
+    )
+    fusion_sync_log_sample_rate = fields.Float(
+        string='Sync Log Sample Rate',
+        config_parameter='fusion_sync.sync_log_sample_rate',
+        default=0.0,
+        help="Share of the imports timed in the sync logs, between 0 (none) and 1 (every import)"
+    )
+    fusion_sync_job_workers = fields.Integer(
+        string='Sync Job Workers',
+        config_parameter='fusion_sync.job_workers',
+        default=1,
+        help="Number of cron workers processing background sync jobs in parallel"
+    )
+    fusion_sync_version_retention = fields.Integer(
+        string='Versions to Keep',
+        config_parameter='fusion_sync.version_retention',
+        default=0,
+        help="Number of latest versions kept active per design and component; older versions are archived "
+             "unless pinned or used by a bill of materials. 0 keeps every version active."
+    )
+    fusion_sync_report_materialized = fields.Boolean(
+        string='Materialized Reports',
+        config_parameter='fusion_sync.report_materialized',
+        help="Store the catalog analysis as materialized views refreshed in the background after each sync, "
+             "instead of aggregating the catalog whenever a report is opened"
+    )
+
+    def set_values(self):
+        materialized = self.env['fusion.report.mixin']._is_materialized()
+        super().set_values()
+        if self.env['fusion.report.mixin']._is_materialized() != materialized:
+            self.env['fusion.sync.engine']._rebuild_reports()
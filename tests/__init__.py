@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+from . import test_sync_benchmark
+from . import test_assembly_closure
+from . import test_sync_records
+from . import test_sync_concurrency
+from . import test_rename_queue
+from . import test_usage_counts
+from . import test_explode_bom
+from . import test_sync_job
+from . import test_ndjson_import
+from . import test_tracking_compaction
+from . import test_version_constraints
+from . import test_shared_components
+from . import test_bom_update
+from . import test_where_used
+from . import test_version_diff
+from . import test_search_key
+from . import test_version_retention
+from . import test_snapshot
+from . import test_topological_sync
+from . import test_catalog_reports
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Benchmark of the Fusion design synchronization.
+
+Run standalone from an Odoo shell on a database with the module installed;
+all changes are rolled back::
+
+    odoo-bin shell -c odoo.conf -d mydb --no-http <<EOF
+    from odoo.addons.fusion_sync.tests.benchmark import main
+    main(env, ['--depth', '4', '--fan-out', '5', '--versions', '3'])
+    EOF
+"""
+import argparse
+import time
+
+from .generator import FusionDesignGenerator
+
+
+def measure(env, label, design_structure):
+    """Synchronize ``design_structure`` and return the time and queries spent.
+
+    The ORM cache is emptied first so every run starts from the database.
+    """
+    env['fusion.design'].flush()
+    env['fusion.design'].invalidate_cache()
+    cr = env.cr
+    start, queries = time.perf_counter(), cr.sql_log_count
+    design = env['fusion.design'].sync_design_structure(design_structure)
+    design.flush()
+    return {
+        'label': label,
+        'seconds': time.perf_counter() - start,
+        'queries': cr.sql_log_count - queries,
+        'design_id': design.id,
+    }
+
+
+def run_benchmark(env, **generator_options):
+    """Measure the first import, an idempotent re-import and an incremental
+    change of one synthetic design.
+
+    Args:
+        env: Environment to synchronize in; the caller owns the transaction
+        generator_options: Options of ``FusionDesignGenerator``
+    Returns:
+        tuple: The generator and the list of measurements
+    """
+    generator = FusionDesignGenerator(**generator_options)
+    results = [
+        measure(env, 'first import', generator.design_structure()),
+        measure(env, 're-import', generator.design_structure()),
+    ]
+    generator.add_version()
+    results.append(measure(env, 'incremental change', generator.design_structure(last_versions=1)))
+    return generator, results
+
+
+def format_results(results):
+    lines = ["%-20s %10s %10s" % ('scenario', 'seconds', 'queries')]
+    lines += ["%-20s %10.3f %10d" % (res['label'], res['seconds'], res['queries']) for res in results]
+    return "\n".join(lines)
+
+
+def main(env, args=None):
+    """Command line entry point, see the module docstring."""
+    parser = argparse.ArgumentParser(prog='fusion_sync.tests.benchmark', description="Benchmark the Fusion design synchronization.")
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--fan-out', type=int, default=4)
+    parser.add_argument('--shared-ratio', type=float, default=0.3)
+    parser.add_argument('--versions', type=int, default=1)
+    parser.add_argument('--change-ratio', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args(args or [])
+
+    try:
+        generator, results = run_benchmark(
+            env(context=dict(env.context, fusion_sync_tracking=False)),
+            depth=options.depth,
+            fan_out=options.fan_out,
+            shared_ratio=options.shared_ratio,
+            versions=options.versions,
+            change_ratio=options.change_ratio,
+            seed=options.seed,
+        )
+    finally:
+        env.cr.rollback()
+    print("%d components, %d component versions" % (
+        len(generator.components), generator.expected_counts()['fusion.component.version'],
+    ))
+    print(format_results(results))
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+import random
+import uuid
+from datetime import datetime, timedelta
+
+
+class FusionDesignGenerator:
+    """Build synthetic Fusion 360 design structures.
+
+    The payloads have the exact shape accepted by
+    ``fusion.design.sync_design_structure``. The assembly tree has ``depth``
+    levels below the root assembly and every assembly uses ``fan_out``
+    children. A ``shared_ratio`` share of the children reuses parts already
+    used elsewhere in the tree instead of adding new ones. Each design
+    version after the first revises a ``change_ratio`` share of the parts,
+    which bumps the version of every assembly above them as Fusion 360 does.
+
+    Generation is deterministic for a given ``seed``.
+    """
+
+    def __init__(self, depth=3, fan_out=4, shared_ratio=0.3, versions=1, change_ratio=0.1, seed=0):
+        self.depth = depth
+        self.fan_out = fan_out
+        self.shared_ratio = shared_ratio
+        self.versions = versions
+        self.change_ratio = change_ratio
+        self.random = random.Random(seed)
+        self.date = datetime(2024, 1, 1)
+        self.user = {'uuid': self._uuid(), 'email': 'designer@example.com'}
+        self.design = {
+            'uuid': self._uuid(),
+            'name': 'Synthetic Design %s' % seed,
+            'creation_date': self._next_date(),
+            'created_by': self.user,
+        }
+        # Component uuid -> {'name', 'version', 'children': [(uuid, quantity)]}
+        self.components = {}
+        self.parents = {}
+        self.parts = []
+        self.root = self._add_component(0)
+        self.design_versions = []
+        for __ in range(versions):
+            self.add_version()
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self.random.getrandbits(128)))
+
+    def _next_date(self):
+        self.date += timedelta(minutes=1)
+        return self.date.strftime('%Y-%m-%d %H:%M:%S')
+
+    def _add_component(self, level):
+        component_uuid = self._uuid()
+        component = {
+            'name': 'Component %s' % (len(self.components) + 1),
+            'version': 1,
+            'revision_date': self._next_date(),
+            'children': [],
+        }
+        self.components[component_uuid] = component
+        self.parents[component_uuid] = set()
+        if level >= self.depth:
+            self.parts.append(component_uuid)
+            return component_uuid
+        for __ in range(self.fan_out):
+            if self.parts and self.random.random() < self.shared_ratio:
+                child_uuid = self.random.choice(self.parts)
+            else:
+                child_uuid = self._add_component(level + 1)
+            component['children'].append((child_uuid, self.random.randint(1, 4)))
+            self.parents[child_uuid].add(component_uuid)
+        return component_uuid
+
+    def _revise(self):
+        """Bump the version of some parts and of all assemblies using them."""
+        count = max(1, int(len(self.parts) * self.change_ratio))
+        to_bump = set(self.random.sample(self.parts, min(count, len(self.parts))))
+        pending = list(to_bump)
+        while pending:
+            for parent_uuid in self.parents[pending.pop()]:
+                if parent_uuid not in to_bump:
+                    to_bump.add(parent_uuid)
+                    pending.append(parent_uuid)
+        date = self._next_date()
+        for component_uuid in to_bump:
+            self.components[component_uuid]['version'] += 1
+            self.components[component_uuid]['revision_date'] = date
+
+    def _component_version_data(self, component_uuid):
+        component = self.components[component_uuid]
+        return {
+            'uuid': component_uuid,
+            'name': component['name'],
+            'version_number': component['version'],
+            'revision_date': component['revision_date'],
+            'created_by': self.user,
+            'modified_by': self.user,
+            'assembly_lines': [{
+                'child_component_version_id': child_uuid,
+                'child_version_number': self.components[child_uuid]['version'],
+                'quantity': quantity,
+                'sequence': (index + 1) * 10,
+            } for index, (child_uuid, quantity) in enumerate(component['children'])],
+        }
+
+    def add_version(self):
+        """Append a design version, revising some parts if it is not the
+        first one.
+
+        Returns:
+            dict: The design structure including all versions so far
+        """
+        if self.design_versions:
+            self._revise()
+        self.design_versions.append({
+            'uuid': self._uuid(),
+            'version_number': len(self.design_versions) + 1,
+            'revision_date': self._next_date(),
+            'modified_by': self.user,
+            'component_versions': [
+                {'fusion_component_version': self._component_version_data(component_uuid)}
+                for component_uuid in self.components
+            ],
+        })
+        return self.design_structure()
+
+    def design_structure(self, last_versions=None):
+        """Return the design structure.
+
+        Args:
+            last_versions (int): Only include that many of the latest design
+                versions, as the add-in does when pushing a new version
+        """
+        versions = self.design_versions[-last_versions:] if last_versions else self.design_versions
+        return {'fusion_design': dict(self.design, versions=list(versions))}
+
+    def expected_counts(self):
+        """Return the number of records the generated design should produce."""
+        version_counts = [component['version'] for component in self.components.values()]
+        return {
+            'fusion.design.version': len(self.design_versions),
+            'fusion.component': len(self.components),
+            'fusion.component.version': sum(version_counts),
+        }
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import mute_logger
+
+
+@tagged('post_install', '-at_install')
+class TestAssemblyClosure(TransactionCase):
+    """The closure maintained incrementally by the assembly lines must match
+    the closure rebuilt from scratch."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Line = cls.env['fusion.component.version.assembly.line']
+        cls.Closure = cls.env['fusion.component.version.closure']
+        components = cls.env['fusion.component'].create([{
+            'uuid': 'closure-test-%s' % name,
+            'name': name,
+            'creation_date': '2024-01-01 00:00:00',
+        } for name in 'ABCDE'])
+        versions = cls.env['fusion.component.version'].create([{
+            'fusion_component_id': component.id,
+            'version_number': 1,
+            'revision_date': '2024-01-01 00:00:00',
+        } for component in components])
+        cls.a, cls.b, cls.c, cls.d, cls.e = versions
+
+    def _link(self, *edges):
+        return self.Line.create([{
+            'fusion_component_version_id': parent.id,
+            'child_component_version_id': child.id,
+        } for parent, child in edges])
+
+    def _closure(self):
+        self.env.cr.execute("SELECT ancestor_id, descendant_id, path_count FROM fusion_component_version_closure")
+        return {(ancestor_id, descendant_id): path_count for ancestor_id, descendant_id, path_count in self.env.cr.fetchall()}
+
+    def _assert_consistent(self):
+        incremental = self._closure()
+        self.Closure._rebuild()
+        self.assertEqual(incremental, self._closure())
+        return incremental
+
+    def test_shared_sub_assembly(self):
+        # A uses B and C, which both use the D sub-assembly
+        self._link((self.d, self.e))
+        self._link((self.a, self.b), (self.a, self.c), (self.b, self.d), (self.c, self.d))
+        closure = self._assert_consistent()
+        self.assertEqual(closure[(self.a.id, self.d.id)], 2)
+        self.assertEqual(closure[(self.a.id, self.e.id)], 2)
+        self.assertEqual(closure[(self.b.id, self.e.id)], 1)
+        self.assertEqual(self.a.descendant_version_ids, self.b | self.c | self.d | self.e)
+
+    def test_chained_lines_in_one_batch(self):
+        self._link((self.a, self.b), (self.b, self.c), (self.c, self.d), (self.a, self.d), (self.d, self.e))
+        closure = self._assert_consistent()
+        self.assertEqual(closure[(self.a.id, self.e.id)], 2)
+
+    def test_unlink_and_relink(self):
+        lines = self._link((self.a, self.b), (self.a, self.c), (self.b, self.d), (self.c, self.d), (self.d, self.e))
+        b_d = lines.filtered(lambda line: line.fusion_component_version_id == self.b)
+
+        b_d.unlink()
+        closure = self._assert_consistent()
+        self.assertEqual(closure[(self.a.id, self.e.id)], 1)
+        self.assertNotIn((self.b.id, self.d.id), closure)
+
+        c_d = lines.filtered(lambda line: line.fusion_component_version_id == self.c)
+        c_d.write({'child_component_version_id': self.e.id})
+        closure = self._assert_consistent()
+        self.assertNotIn((self.a.id, self.d.id), closure)
+        self.assertEqual(closure[(self.a.id, self.e.id)], 1)
+
+        # Removing several lines of the same path at once
+        (lines - b_d).unlink()
+        self.assertEqual(self._assert_consistent(), {})
+
+    def test_unlink_version(self):
+        self._link((self.a, self.b), (self.b, self.c), (self.e, self.c), (self.c, self.d))
+        self.a.unlink()
+        closure = self._assert_consistent()
+        self.assertEqual(set(closure), {
+            (self.b.id, self.c.id), (self.b.id, self.d.id), (self.e.id, self.c.id), (self.e.id, self.d.id), (self.c.id, self.d.id),
+        })
+
+    @mute_logger('odoo.sql_db')
+    def test_cycle_rejection(self):
+        self._link((self.a, self.b), (self.b, self.c))
+        with self.assertRaises(ValidationError):
+            self._link((self.c, self.a))
+        # A cycle made only of new lines
+        with self.assertRaises(ValidationError):
+            self._link((self.d, self.e), (self.e, self.d))
+        with self.assertRaises(ValidationError):
+            self._link((self.c, self.d), (self.d, self.b))
+        with self.assertRaises(ValidationError):
+            self._link((self.e, self.e))
+        self.assertEqual(set(self._assert_consistent()), {
+            (self.a.id, self.b.id), (self.a.id, self.c.id), (self.b.id, self.c.id),
+        })
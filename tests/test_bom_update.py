@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+from .test_explode_bom import create_assembly_tree
+
+
+@tagged('post_install', '-at_install')
+class TestBomUpdate(TransactionCase):
+    """Assembly line changes are logged and the BOM generator only touches
+    the BOM lines that changed."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Change = cls.env['fusion.assembly.change']
+        cls.a, cls.b, cls.c, cls.d = create_assembly_tree(cls.env)
+
+    def _product(self, version):
+        return version.fusion_component_id.product_tmpl_id.product_variant_id
+
+    def _bom_lines(self, version):
+        return {line.product_id: line.product_qty for line in version.bom_id.bom_line_ids}
+
+    def _logged(self):
+        return self.Change.search([]).component_version_id
+
+    def test_change_log(self):
+        self.assertTrue((self.a | self.b | self.c) <= self._logged())
+        self.Change._cron_update_boms()
+        self.assertFalse(self._logged())
+        self.assertEqual(self._bom_lines(self.a), {self._product(self.b): 2, self._product(self.c): 3})
+        self.assertEqual(self._bom_lines(self.b), {self._product(self.d): 4})
+        self.assertFalse(self.d.bom_id)
+
+        line_b, line_c = self.a.assembly_lines.sorted('sequence')
+        line_b.write({'quantity': 5})
+        self.assertEqual(self._logged(), self.a)
+        bom_lines = self.a.bom_id.bom_line_ids
+        self.Change._cron_update_boms()
+        # Updated in place, not recreated
+        self.assertEqual(self.a.bom_id.bom_line_ids, bom_lines)
+        self.assertEqual(self._bom_lines(self.a), {self._product(self.b): 5, self._product(self.c): 3})
+
+        line_c.unlink()
+        self.assertEqual(self._logged(), self.a)
+        self.Change._cron_update_boms()
+        self.assertEqual(self.a.bom_id.bom_line_ids, bom_lines.filtered(lambda line: line.product_id == self._product(self.b)))
+        self.assertEqual(self._bom_lines(self.a), {self._product(self.b): 5})
+
+        self.env['fusion.component.version.assembly.line'].create({
+            'fusion_component_version_id': self.a.id,
+            'child_component_version_id': self.d.id,
+            'quantity': 2,
+        })
+        self.Change._cron_update_boms()
+        self.assertEqual(self._bom_lines(self.a), {self._product(self.b): 5, self._product(self.d): 2})
+
+    def test_superseded_version(self):
+        self.Change._cron_update_boms()
+        bom = self.b.bom_id
+        self.assertTrue(bom.active)
+        b2 = self.env['fusion.component.version'].create({
+            'fusion_component_id': self.b.fusion_component_id.id,
+            'version_number': 2,
+            'revision_date': '2024-02-01 00:00:00',
+        })
+        self.env['fusion.component.version.assembly.line'].create({
+            'fusion_component_version_id': b2.id,
+            'child_component_version_id': self.c.id,
+        })
+        self.Change._cron_update_boms()
+        # Only the latest version keeps an active BOM
+        self.assertFalse(bom.active)
+        self.assertTrue(b2.bom_id.active)
+        self.assertEqual(self._bom_lines(b2), {self._product(self.c): 1})
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+from .test_explode_bom import create_assembly_tree
+
+
+@tagged('post_install', '-at_install')
+class TestCatalogReports(TransactionCase):
+    """The reporting views aggregate the catalog; materialized, they only
+    change when refreshed."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Engine = cls.env['fusion.sync.engine']
+        cls.Report = cls.env['fusion.component.version.report']
+        cls.a, cls.b, cls.c, cls.d = create_assembly_tree(cls.env)
+
+    def _set_materialized(self, materialized):
+        self.env['ir.config_parameter'].sudo().set_param('fusion_sync.report_materialized', materialized)
+        self.Engine._rebuild_reports()
+
+    def _row(self, version):
+        self.env['base'].flush()
+        self.Report.invalidate_cache()
+        report = self.Report.search([('component_version_id', '=', version.id)])
+        return report.assembly_line_count, report.part_quantity, report.used_in_count, report.where_used_count
+
+    def test_view(self):
+        self.assertEqual(self.Report._get_relkind(), 'v')
+        self.assertEqual(self._row(self.a), (2, 5, 0, 0))
+        self.assertEqual(self._row(self.d), (0, 0, 2, 3))
+        self.assertEqual(self.Report.search([('component_version_id', '=', self.d.id)]).assembly_size, '0')
+        self.env['fusion.component.version.assembly.line'].create({
+            'fusion_component_version_id': self.a.id,
+            'child_component_version_id': self.d.id,
+        })
+        self.assertEqual(self._row(self.a), (3, 6, 0, 0))
+
+    def test_materialized_refresh(self):
+        self._set_materialized(True)
+        self.assertEqual(self.Report._get_relkind(), 'm')
+        self.assertEqual(self._row(self.a), (2, 5, 0, 0))
+        self.env['fusion.component.version.assembly.line'].create({
+            'fusion_component_version_id': self.a.id,
+            'child_component_version_id': self.d.id,
+        })
+        # Stale until refreshed
+        self.assertEqual(self._row(self.a), (2, 5, 0, 0))
+        self.Engine._refresh_reports()
+        self.assertEqual(self._row(self.a), (3, 6, 0, 0))
+        self.assertEqual(self._row(self.d), (0, 0, 3, 3))
+
+        self._set_materialized(False)
+        self.assertEqual(self.Report._get_relkind(), 'v')
+
+    def test_sync_triggers_refresh(self):
+        cron = self.env.ref('fusion_sync.ir_cron_fusion_sync_refresh_reports')
+        Trigger = self.env['ir.cron.trigger']
+        triggers = Trigger.search([('cron_id', '=', cron.id)])
+        self.Engine._trigger_report_refresh()
+        self.assertEqual(Trigger.search([('cron_id', '=', cron.id)]), triggers)
+        self._set_materialized(True)
+        self.Engine._trigger_report_refresh()
+        self.assertEqual(len(Trigger.search([('cron_id', '=', cron.id)]) - triggers), 1)
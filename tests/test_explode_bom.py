@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo.exceptions import ValidationError
+from odoo.tests import HttpCase, TransactionCase, tagged
+
+
+def create_assembly_tree(env):
+    """Create an assembly A using 2 B and 3 C, which use 4 and 1 D.
+
+    Returns:
+        recordset: The component versions A, B, C and D
+    """
+    components = env['fusion.component'].create([{
+        'uuid': 'explode-test-%s' % name,
+        'name': name,
+        'creation_date': '2024-01-01 00:00:00',
+    } for name in 'ABCD'])
+    a, b, c, d = versions = env['fusion.component.version'].create([{
+        'fusion_component_id': component.id,
+        'version_number': 1,
+        'revision_date': '2024-01-01 00:00:00',
+    } for component in components])
+    env['fusion.component.version.assembly.line'].create([{
+        'fusion_component_version_id': parent.id,
+        'child_component_version_id': child.id,
+        'quantity': quantity,
+        'sequence': sequence,
+    } for parent, child, quantity, sequence in ((a, b, 2, 1), (a, c, 3, 2), (b, d, 4, 1), (c, d, 1, 1))])
+    return versions
+
+
+@tagged('post_install', '-at_install')
+class TestExplodeBom(TransactionCase):
+    """Quantities of the exploded bill of materials are multiplied along
+    every path of the assembly tree."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.a, cls.b, cls.c, cls.d = create_assembly_tree(cls.env)
+
+    def test_flattened(self):
+        self.assertEqual(self.a.explode_bom(), [{
+            'component_version_id': self.d.id,
+            'display_name': 'D (v1)',
+            'quantity': 11,
+        }])
+        self.assertEqual(
+            [(row['component_version_id'], row['quantity']) for row in self.a.explode_bom(levels=1)],
+            [(self.b.id, 2), (self.c.id, 3)],
+        )
+        self.assertEqual(self.d.explode_bom(), [])
+
+    def test_tree(self):
+        rows = self.a.explode_bom(flatten=False)
+        self.assertEqual(
+            [(row['parent_id'], row['component_version_id'], row['quantity'], row['total_quantity'], row['level'], row['is_leaf'])
+             for row in rows],
+            [
+                (self.a.id, self.b.id, 2, 2, 1, False),
+                (self.b.id, self.d.id, 4, 8, 2, True),
+                (self.a.id, self.c.id, 3, 3, 1, False),
+                (self.c.id, self.d.id, 1, 3, 2, True),
+            ],
+        )
+
+    def test_invalid_levels(self):
+        with self.assertRaises(ValidationError):
+            self.a.explode_bom(levels=0)
+
+
+@tagged('post_install', '-at_install')
+class TestExplodeBomEndpoint(HttpCase):
+
+    def _explode(self, version_id, **params):
+        response = self.url_open(
+            '/fusion_sync/component_version/%d/explode_bom' % version_id,
+            data=json.dumps({'jsonrpc': '2.0', 'method': 'call', 'params': params}),
+            headers={'Content-Type': 'application/json'},
+        )
+        return response.json()
+
+    def test_endpoint(self):
+        a, b, c, d = create_assembly_tree(self.env(context=dict(self.env.context, tracking_disable=True)))
+        self.authenticate('admin', 'admin')
+        self.assertEqual(self._explode(a.id)['result'], [{
+            'component_version_id': d.id,
+            'display_name': 'D (v1)',
+            'quantity': 11,
+        }])
+        rows = self._explode(a.id, flatten=False, levels=1)['result']
+        self.assertEqual([(row['component_version_id'], row['total_quantity'], row['is_leaf']) for row in rows], [
+            (b.id, 2, True), (c.id, 3, True),
+        ])
+        self.assertIn('error', self._explode(d.id + 1000000))
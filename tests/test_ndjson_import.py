@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import HttpCase, tagged
+
+from .test_sync_records import NDJSON_IMPORT
+
+URL = '/fusion_sync/import/ndjson'
+
+
+@tagged('post_install', '-at_install')
+class TestNdjsonImport(HttpCase):
+    """The NDJSON endpoint only accepts requests carrying an API key."""
+
+    def _post(self, body, key=None):
+        headers = {'Content-Type': 'application/x-ndjson'}
+        if key:
+            headers['Authorization'] = 'Bearer %s' % key
+        return self.url_open(URL, data=body.encode(), headers=headers)
+
+    def test_requires_api_key(self):
+        body = NDJSON_IMPORT % {'quantity': 1}
+        self.assertEqual(self._post(body).status_code, 401)
+        self.assertEqual(self._post(body, key='not-a-key').status_code, 401)
+        # A logged in session alone is not enough
+        self.authenticate('admin', 'admin')
+        self.assertEqual(self._post(body).status_code, 401)
+        self.assertFalse(self.env['fusion.design'].search([('uuid', '=', 'ndjson-design')]))
+
+    def test_import_with_api_key(self):
+        admin = self.env.ref('base.user_admin')
+        key = self.env['res.users.apikeys'].with_user(admin)._generate('rpc', 'NDJSON import test')
+        response = self._post((NDJSON_IMPORT % {'quantity': 2}) + 'not json\n', key=key)
+        self.assertEqual(response.status_code, 200)
+        summary = response.json()
+        self.assertEqual(summary['processed'], 5)
+        self.assertEqual([error['line'] for error in summary['errors']], [7])
+        design = self.env['fusion.design'].search([('uuid', '=', 'ndjson-design')])
+        self.assertEqual(design.create_uid, admin)
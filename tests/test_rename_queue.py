@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestRenameQueue(TransactionCase):
+    """The names rewritten in SQL by the rename queue must match the names
+    computed by the ORM."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.components = cls.env['fusion.component'].create([{
+            'uuid': 'rename-test-%s' % name,
+            'name': name,
+            'creation_date': '2024-01-01 00:00:00',
+        } for name in ('Assembly', 'Part')])
+        cls.versions = cls.env['fusion.component.version'].create([{
+            'fusion_component_id': component.id,
+            'version_number': version_number,
+            'revision_date': '2024-01-01 00:00:00',
+        } for component in cls.components for version_number in (1, 2)])
+        cls.lines = cls.env['fusion.component.version.assembly.line'].create([{
+            'fusion_component_version_id': parent.id,
+            'child_component_version_id': child.id,
+            'quantity': quantity,
+        } for quantity, (parent, child) in enumerate(zip(cls.versions[:2], cls.versions[2:]), start=2)])
+        cls.design = cls.env['fusion.design'].create({
+            'uuid': 'rename-test-design',
+            'name': 'Design',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+        cls.design_versions = cls.env['fusion.design.version'].create([{
+            'fusion_design_id': cls.design.id,
+            'uuid': 'rename-test-design-v%d' % version_number,
+            'version_number': version_number,
+            'revision_date': '2024-01-01 00:00:00',
+        } for version_number in (1, 2, 3)])
+
+    def _stored_names(self, records, fnames):
+        records.invalidate_cache(fnames)
+        return {record.id: tuple(record[fname] for fname in fnames) for record in records}
+
+    def _assert_matches_orm(self, records, fnames):
+        """Compare the stored names with a recomputation by the ORM."""
+        stored = self._stored_names(records, fnames)
+        for fname in fnames:
+            self.env.add_to_compute(records._fields[fname], records)
+        records.recompute(fnames)
+        records.flush(fnames)
+        self.assertEqual(stored, self._stored_names(records, fnames))
+        return stored
+
+    def test_rename_component_and_design(self):
+        self.components.write({'name': 'Renamed'})
+        self.design.write({'name': 'Renamed Design'})
+        # Chunks of one row exercise the repeated updates
+        self.env['fusion.rename.queue']._cron_process_renames(chunk_size=1)
+        self.assertFalse(self.env['fusion.rename.queue'].search([]))
+
+        names = self._assert_matches_orm(self.versions, ['display_name', 'search_key'])
+        self.assertEqual(names[self.versions[0].id], ('Renamed (v1)', 'Renamed v1 rename-test-Assembly'))
+        names = self._assert_matches_orm(self.design_versions, ['display_name', 'search_key'])
+        self.assertEqual(names[self.design_versions[2].id], (
+            'Renamed Design (v3)', 'Renamed Design v3 rename-test-design-v3 rename-test-design',
+        ))
+        # child_component_name is computed first, display_name depends on it
+        names = self._assert_matches_orm(self.lines, ['child_component_name'])
+        self.assertEqual(set(names.values()), {('Renamed',)})
+        names = self._assert_matches_orm(self.lines, ['display_name'])
+        self.assertEqual(names[self.lines[0].id], ('Renamed (v1) x2',))
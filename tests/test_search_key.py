@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestSearchKey(TransactionCase):
+    """Name searches of versions match the stored search key, which holds
+    the name, version number and UUIDs."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.component = cls.env['fusion.component'].create({
+            'uuid': 'search-key-component-7f3a',
+            'name': 'Hex Bolt M8',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+        cls.component_versions = cls.env['fusion.component.version'].create([{
+            'fusion_component_id': cls.component.id,
+            'version_number': version_number,
+            'revision_date': '2024-01-01 00:00:00',
+        } for version_number in (1, 2)])
+        cls.design = cls.env['fusion.design'].create({
+            'uuid': 'search-key-design-91c2',
+            'name': 'Gearbox Housing',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+        cls.design_version = cls.env['fusion.design.version'].create({
+            'fusion_design_id': cls.design.id,
+            'uuid': 'search-key-design-v1-d4e8',
+            'version_number': 1,
+            'revision_date': '2024-01-01 00:00:00',
+        })
+
+    def _name_search(self, model_name, name, operator='ilike'):
+        Model = self.env[model_name]
+        return Model.browse(record_id for record_id, __ in Model.name_search(name, operator=operator, limit=None))
+
+    def test_component_version(self):
+        v1, v2 = self.component_versions
+        self.assertEqual(v1.search_key, 'Hex Bolt M8 v1 search-key-component-7f3a')
+        model_name = 'fusion.component.version'
+        self.assertEqual(self._name_search(model_name, 'bolt m8'), self.component_versions)
+        self.assertEqual(self._name_search(model_name, 'Bolt M8 v2'), v2)
+        self.assertEqual(self._name_search(model_name, 'component-7f3a'), self.component_versions)
+        self.assertEqual(self._name_search(model_name, 'Hex Bolt M8', operator='='), self.component_versions)
+
+        # Renames reach the search key through the rename queue
+        self.component.write({'name': 'Flange Bolt'})
+        self.env['fusion.rename.queue']._cron_process_renames()
+        self.assertEqual(self._name_search(model_name, 'flange bolt v1'), v1)
+        self.assertFalse(self._name_search(model_name, 'hex bolt'))
+
+    def test_design_version(self):
+        model_name = 'fusion.design.version'
+        self.assertEqual(self._name_search(model_name, 'gearbox housing v1'), self.design_version)
+        self.assertEqual(self._name_search(model_name, 'design-v1-d4e8'), self.design_version)
+        self.assertEqual(self._name_search(model_name, 'design-91c2'), self.design_version)
+        self.assertFalse(self._name_search(model_name, 'Gearbox', operator='='))
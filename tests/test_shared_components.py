@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+
+def design_structure(name, component_versions):
+    return {'fusion_design': {
+        'uuid': 'shared-test-%s' % name,
+        'name': name,
+        'creation_date': '2024-01-01 00:00:00',
+        'versions': [{
+            'uuid': 'shared-test-%s-v1' % name,
+            'version_number': 1,
+            'revision_date': '2024-01-01 00:00:00',
+            'component_versions': [{'fusion_component_version': dict(
+                component_version,
+                revision_date='2024-01-01 00:00:00',
+            )} for component_version in component_versions],
+        }],
+    }}
+
+
+@tagged('post_install', '-at_install')
+class TestSharedComponents(TransactionCase):
+    """Designs using the same component version share a single record."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, fusion_sync_tracking=False, tracking_disable=True))
+
+    def test_shared_node_reuse(self):
+        bolt = {'uuid': 'shared-test-bolt', 'name': 'Bolt', 'version_number': 1}
+        Design = self.env['fusion.design']
+        Design.sync_design_structure(design_structure('Frame', [
+            {'uuid': 'shared-test-frame', 'name': 'Frame', 'version_number': 1, 'assembly_lines': [
+                {'child_component_version_id': 'shared-test-bolt', 'child_version_number': 1, 'quantity': 4},
+            ]},
+            bolt,
+        ]))
+        Design.sync_design_structure(design_structure('Door', [
+            {'uuid': 'shared-test-door', 'name': 'Door', 'version_number': 1, 'assembly_lines': [
+                {'child_component_version_id': 'shared-test-bolt', 'child_version_number': 1, 'quantity': 2},
+            ]},
+            bolt,
+        ]))
+
+        versions = self.env['fusion.component.version'].search([('fusion_component_id.uuid', '=', 'shared-test-bolt')])
+        self.assertEqual(len(versions), 1)
+        self.assertEqual(
+            set(versions.design_version_ids.mapped('uuid')), {'shared-test-Frame-v1', 'shared-test-Door-v1'},
+        )
+        self.assertEqual(versions.used_in_count, 2)
+        self.assertEqual(versions.fusion_component_id.used_in_design_count, 2)
+
+        # A new version of the component is a new node, the old one stays shared
+        Design.sync_design_structure(design_structure('Door', [dict(bolt, version_number=2)]))
+        versions = self.env['fusion.component.version'].search([('fusion_component_id.uuid', '=', 'shared-test-bolt')])
+        self.assertEqual(versions.mapped('version_number'), [2, 1])
+        self.assertEqual(versions[1].design_version_ids.mapped('uuid'), ['shared-test-Frame-v1'])
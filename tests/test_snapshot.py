@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import base64
+import gzip
+import json
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import HttpCase, TransactionCase, tagged
+
+from .test_explode_bom import create_assembly_tree
+
+
+def create_snapshot_design(env):
+    """Create a design version using the assembly tree of
+    ``create_assembly_tree``.
+
+    Returns:
+        tuple: The design version and the component versions A, B, C and D
+    """
+    versions = create_assembly_tree(env)
+    design = env['fusion.design'].create({
+        'uuid': 'snapshot-test-design',
+        'name': 'Design',
+        'creation_date': '2024-01-01 00:00:00',
+    })
+    design_version = env['fusion.design.version'].create({
+        'fusion_design_id': design.id,
+        'uuid': 'snapshot-test-design-v1',
+        'version_number': 1,
+        'revision_date': '2024-01-01 00:00:00',
+        'component_version_ids': [(6, 0, versions[0].ids)],
+    })
+    return (design_version,) + tuple(versions)
+
+
+@tagged('post_install', '-at_install')
+class TestSnapshot(TransactionCase):
+    """Snapshots are cached until an exported record changes."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.Snapshot = cls.env['fusion.snapshot']
+        cls.design_version, cls.a, cls.b, cls.c, cls.d = create_snapshot_design(cls.env)
+
+    def _attachment(self):
+        return self.Snapshot._get_snapshot_attachment(self.design_version.ids)
+
+    def test_content(self):
+        data = json.loads(gzip.decompress(base64.b64decode(self._attachment().datas)))
+        self.assertEqual(data['design_versions']['uuid'], ['snapshot-test-design-v1'])
+        # Versions used at any level are exported
+        component_versions = data['component_versions']
+        self.assertEqual(component_versions['id'], sorted((self.a | self.b | self.c | self.d).ids))
+        lines = data['assembly_lines']
+        self.assertEqual(sorted(
+            (component_versions['name'][parent], component_versions['name'][child], quantity)
+            for parent, child, quantity in zip(lines['parent'], lines['child'], lines['quantity'])
+        ), [('A', 'B', 2), ('A', 'C', 3), ('B', 'D', 4), ('C', 'D', 1)])
+
+    def test_fingerprint(self):
+        result = self.Snapshot.export_snapshot(self.design_version.ids)
+        attachment = self._attachment()
+        self.assertEqual(result['fingerprint'], attachment.description)
+        self.assertEqual(result['url'], '/fusion_sync/snapshot?design_version_ids=%d' % self.design_version.id)
+        self.assertEqual(self.Snapshot.export_snapshot(self.design_version.ids), result)
+
+        # A nested assembly line belongs to the exported structure
+        self.b.assembly_lines.write({'quantity': 5})
+        changed = self.Snapshot.export_snapshot(self.design_version.ids)
+        self.assertNotEqual(changed['fingerprint'], result['fingerprint'])
+        self.assertEqual(self._attachment(), attachment)
+
+        self.design_version.fusion_design_id.write({'name': 'Renamed Design'})
+        self.assertNotEqual(self.Snapshot.export_snapshot(self.design_version.ids)['fingerprint'], changed['fingerprint'])
+
+    def test_gc(self):
+        attachment = self._attachment()
+        duplicate = attachment.copy()
+        catalog = self.Snapshot._get_snapshot_attachment()
+        self.Snapshot._cron_gc_snapshots()
+        self.assertFalse(attachment.exists())
+        self.assertEqual(self._attachment(), duplicate)
+
+        self.env.cr.execute(
+            "UPDATE ir_attachment SET write_date = %s WHERE id = %s",
+            [fields.Datetime.now() - timedelta(days=30), catalog.id],
+        )
+        catalog.invalidate_cache(['write_date'])
+        self.Snapshot._cron_gc_snapshots()
+        self.assertFalse(catalog.exists())
+        self.assertTrue(duplicate.exists())
+
+
+@tagged('post_install', '-at_install')
+class TestSnapshotEndpoint(HttpCase):
+
+    def test_etag(self):
+        design_version = create_snapshot_design(self.env(context=dict(self.env.context, tracking_disable=True)))[0]
+        self.authenticate('admin', 'admin')
+        url = '/fusion_sync/snapshot?design_version_ids=%d' % design_version.id
+        response = self.url_open(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertEqual(etag, '"%s"' % self.env['fusion.snapshot'].export_snapshot(design_version.ids)['fingerprint'])
+        self.assertEqual(self.url_open(url, headers={'If-None-Match': etag}).status_code, 304)
+
+        design_version.component_version_ids.assembly_lines[:1].write({'quantity': 7})
+        response = self.url_open(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_invalid_ids(self):
+        self.authenticate('admin', 'admin')
+        self.assertEqual(self.url_open('/fusion_sync/snapshot?design_version_ids=1,abc').status_code, 400)
+        self.assertEqual(self.url_open('/fusion_sync/snapshot?design_version_ids=-1').status_code, 404)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import logging
+
+from odoo.tests import TransactionCase, tagged
+
+from .benchmark import format_results, measure
+from .generator import FusionDesignGenerator
+
+_logger = logging.getLogger(__name__)
+
+# Queries a re-import may add over the smallest design as the design grows
+REIMPORT_EXTRA_QUERIES = 10
+
+
+@tagged('post_install', '-at_install', 'fusion_sync_benchmark')
+class TestSyncBenchmark(TransactionCase):
+    """Time and query count of the design synchronization.
+
+    The query counts are logged for every scenario so regressions show up in
+    the test logs; the assertions only check the relations between the
+    scenarios, which do not depend on the hardware.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, fusion_sync_tracking=False, tracking_disable=True))
+
+    def _assert_synced(self, generator, design_id):
+        design = self.env['fusion.design'].browse(design_id)
+        versions = design.version_ids
+        counts = generator.expected_counts()
+        self.assertEqual(len(versions), counts['fusion.design.version'])
+        components = self.env['fusion.component'].search([('uuid', 'in', list(generator.components))])
+        self.assertEqual(len(components), counts['fusion.component'])
+        self.assertEqual(len(components.version_ids), counts['fusion.component.version'])
+
+    def _run_scenarios(self, **options):
+        generator = FusionDesignGenerator(**options)
+        first = measure(self.env, 'first import', generator.design_structure())
+        self._assert_synced(generator, first['design_id'])
+        reimport = measure(self.env, 're-import', generator.design_structure())
+        self._assert_synced(generator, reimport['design_id'])
+        generator.add_version()
+        incremental = measure(self.env, 'incremental change', generator.design_structure(last_versions=1))
+        self._assert_synced(generator, incremental['design_id'])
+        results = [first, reimport, incremental]
+        _logger.info("Fusion sync benchmark %s:\n%s", options, format_results(results))
+        return first, reimport, incremental
+
+    def test_flat_design(self):
+        first, reimport, incremental = self._run_scenarios(depth=1, fan_out=20, shared_ratio=0.0)
+        self.assertLess(reimport['queries'], first['queries'])
+        self.assertLess(incremental['queries'], first['queries'])
+
+    def test_deep_shared_design(self):
+        first, reimport, incremental = self._run_scenarios(depth=3, fan_out=4, shared_ratio=0.3, versions=2, seed=1)
+        self.assertLess(reimport['queries'], first['queries'])
+        self.assertLess(incremental['queries'], first['queries'])
+
+    def test_reimport_does_not_scale(self):
+        """An unchanged payload is skipped on its content hash, so
+        re-importing it costs about the same number of queries at any size.
+
+        The largest design has more component versions than the ORM reads
+        in one prefetch batch (PREFETCH_MAX); a few more queries are allowed
+        for the batched reads, not one per record.
+        """
+        __, small, __ = self._run_scenarios(depth=2, fan_out=3, seed=2)
+        __, medium, __ = self._run_scenarios(depth=3, fan_out=6, seed=3)
+        __, large, __ = self._run_scenarios(depth=3, fan_out=11, shared_ratio=0.0, seed=4)
+        max_queries = small['queries'] + REIMPORT_EXTRA_QUERIES
+        self.assertLessEqual(medium['queries'], max_queries)
+        self.assertLessEqual(large['queries'], max_queries)
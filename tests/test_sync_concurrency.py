@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import threading
+
+from psycopg2 import OperationalError
+
+from odoo import SUPERUSER_ID, api, sql_db
+from odoo.tests import TransactionCase, tagged
+from odoo.tests.common import get_db_name
+
+from ..models.fusion_sync_engine import LOCK_DESIGN
+
+
+@tagged('post_install', '-at_install')
+class TestSyncConcurrency(TransactionCase):
+    """Advisory locks of concurrent syncs, on two real database connections.
+
+    The test cursor shares a single connection, so both transactions use
+    their own cursors and only take locks; nothing is committed.
+    """
+
+    def setUp(self):
+        super().setUp()
+        db = sql_db.db_connect(get_db_name())
+        self.cr1, self.cr2 = db.cursor(), db.cursor()
+        self.addCleanup(self.cr1.close)
+        self.addCleanup(self.cr2.close)
+        self.engine1 = api.Environment(self.cr1, SUPERUSER_ID, {})['fusion.sync.engine']
+        self.engine2 = api.Environment(self.cr2, SUPERUSER_ID, {})['fusion.sync.engine']
+
+    def _lock_in_thread(self, engine, keys):
+        """Lock ``keys`` in a thread, returning it and its outcome."""
+        outcome = {}
+
+        def run():
+            try:
+                engine._advisory_lock(LOCK_DESIGN, keys)
+                outcome['locked'] = True
+            except OperationalError as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread, outcome
+
+    def test_waiting_import_is_retried(self):
+        # Both snapshots are taken before the locks, as in a real request
+        self.cr1.execute("SELECT 1")
+        self.cr2.execute("SELECT 1")
+        self.engine1._advisory_lock(LOCK_DESIGN, ['design-a', 'design-b'])
+
+        thread, outcome = self._lock_in_thread(self.engine2, ['design-b'])
+        thread.join(1)
+        self.assertTrue(thread.is_alive(), "The second import must wait for the first one")
+
+        self.cr1.commit()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertIn('error', outcome)
+        self.assertEqual(outcome['error'].pgcode, '40001')
+        self.assertTrue(self.engine2._is_concurrency_error(outcome['error']))
+
+        # The retry runs with a fresh snapshot and gets the lock
+        self.cr2.rollback()
+        self.engine2._advisory_lock(LOCK_DESIGN, ['design-b'])
+
+    def test_other_designs_do_not_wait(self):
+        self.engine1._advisory_lock(LOCK_DESIGN, ['design-a'])
+        thread, outcome = self._lock_in_thread(self.engine2, ['design-b', 'design-c'])
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(outcome, {'locked': True})
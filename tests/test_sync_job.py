@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+from odoo import SUPERUSER_ID, api, fields, sql_db
+from odoo.tests import TransactionCase, tagged
+from odoo.tests.common import get_db_name
+
+
+def job_vals(design_uuid, **vals):
+    return dict({'design_uuid': design_uuid, 'payload': '{}'}, **vals)
+
+
+@tagged('post_install', '-at_install')
+class TestSyncJobQueue(TransactionCase):
+    """Jobs of a design are claimed in submission order, jobs of different
+    designs independently."""
+
+    def setUp(self):
+        super().setUp()
+        self.Job = self.env['fusion.sync.job']
+        # Jobs left by earlier tests or runs must not be claimed here
+        self.Job.search([('state', 'in', ('pending', 'running'))]).write({'state': 'done'})
+
+    def test_claim_order(self):
+        a1, a2, b1, c1 = self.Job.create([
+            job_vals('job-test-a'),
+            job_vals('job-test-a'),
+            job_vals('job-test-b'),
+            job_vals('job-test-c', next_attempt_date=fields.Datetime.now() + timedelta(hours=1)),
+        ])
+        self.assertEqual(self.Job._acquire_next_job(), a1)
+        self.assertEqual(a1.state, 'running')
+        # a2 waits for a1, c1 for its next attempt
+        self.assertEqual(self.Job._acquire_next_job(), b1)
+        self.assertFalse(self.Job._acquire_next_job())
+        a1.write({'state': 'done'})
+        self.assertEqual(self.Job._acquire_next_job(), a2)
+        c1.write({'next_attempt_date': False})
+        self.assertEqual(self.Job._acquire_next_job(), c1)
+
+
+@tagged('post_install', '-at_install')
+class TestSyncJobWorkers(TransactionCase):
+    """Workers claiming jobs at the same time, on two real database
+    connections; the jobs are committed so both workers see them, and
+    removed afterwards."""
+
+    def setUp(self):
+        super().setUp()
+        db = sql_db.db_connect(get_db_name())
+        with db.cursor() as cr:
+            Job = api.Environment(cr, SUPERUSER_ID, {})['fusion.sync.job']
+            self.job_ids = Job.create([job_vals('job-worker-a'), job_vals('job-worker-a'), job_vals('job-worker-b')]).ids
+        self.addCleanup(self._remove_jobs, db)
+        self.cr1, self.cr2 = db.cursor(), db.cursor()
+        self.addCleanup(self.cr1.close)
+        self.addCleanup(self.cr2.close)
+        self.Job1 = api.Environment(self.cr1, SUPERUSER_ID, {})['fusion.sync.job']
+        self.Job2 = api.Environment(self.cr2, SUPERUSER_ID, {})['fusion.sync.job']
+
+    def _remove_jobs(self, db):
+        with db.cursor() as cr:
+            cr.execute("DELETE FROM fusion_sync_job WHERE id IN %s", [tuple(self.job_ids)])
+
+    def test_skip_locked(self):
+        a1, __, b1 = self.job_ids
+        # Other pending jobs of the database are claimed first, skip them
+        claimed1 = self.Job1._acquire_next_job()
+        while claimed1 and claimed1.id not in self.job_ids:
+            claimed1 = self.Job1._acquire_next_job()
+        self.assertEqual(claimed1.id, a1)
+        # The first worker has not committed: the second one skips the locked
+        # job without waiting, and the next job of the same design too
+        claimed2 = self.Job2._acquire_next_job()
+        while claimed2 and claimed2.id not in self.job_ids:
+            claimed2 = self.Job2._acquire_next_job()
+        self.assertEqual(claimed2.id, b1)
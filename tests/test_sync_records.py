@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import json
+
+from odoo.tests import TransactionCase, tagged
+
+NDJSON_IMPORT = """
+{"type": "design", "uuid": "ndjson-design", "name": "NDJSON Design", "creation_date": "2024-01-01 00:00:00"}
+{"type": "design_version", "uuid": "ndjson-design-v1", "design_uuid": "ndjson-design", "version_number": 1, "revision_date": "2024-01-01 00:00:00"}
+{"type": "component_version", "uuid": "ndjson-assembly", "name": "Assembly", "version_number": 1, "revision_date": "2024-01-01 00:00:00", "design_version_uuid": "ndjson-design-v1"}
+{"type": "component_version", "uuid": "ndjson-part", "name": "Part", "version_number": 1, "revision_date": "2024-01-01 00:00:00", "design_version_uuid": "ndjson-design-v1"}
+{"type": "assembly_line", "parent_uuid": "ndjson-assembly", "parent_version_number": 1, "child_component_version_id": "ndjson-part", "child_version_number": 1, "quantity": %(quantity)s}
+"""
+
+
+@tagged('post_install', '-at_install')
+class TestSyncRecords(TransactionCase):
+    """Flat records, as streamed by the NDJSON import endpoint."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, fusion_sync_tracking=False, tracking_disable=True))
+        cls.Engine = cls.env['fusion.sync.engine']
+
+    def _import(self, quantity):
+        records = [json.loads(line) for line in (NDJSON_IMPORT % {'quantity': quantity}).splitlines() if line.strip()]
+        self.Engine.sync_records(records)
+
+    def _assembly_line(self):
+        return self.env['fusion.component.version.assembly.line'].search([
+            ('fusion_component_version_id.fusion_component_id.uuid', '=', 'ndjson-assembly'),
+        ])
+
+    def test_reimport_updates(self):
+        self._import(2)
+        self.assertEqual(self._assembly_line().quantity, 2)
+        self._import(5)
+        self.assertEqual(self._assembly_line().quantity, 5)
+
+    def test_reimport_over_nested_sync(self):
+        self.env['fusion.design'].sync_design_structure({'fusion_design': {
+            'uuid': 'ndjson-design',
+            'name': 'NDJSON Design',
+            'creation_date': '2024-01-01 00:00:00',
+            'versions': [{
+                'uuid': 'ndjson-design-v1',
+                'version_number': 1,
+                'revision_date': '2024-01-01 00:00:00',
+                'component_versions': [{'fusion_component_version': {
+                    'uuid': 'ndjson-assembly',
+                    'name': 'Assembly',
+                    'version_number': 1,
+                    'revision_date': '2024-01-01 00:00:00',
+                    'assembly_lines': [{'child_component_version_id': 'ndjson-part', 'child_version_number': 1, 'quantity': 1}],
+                }}, {'fusion_component_version': {
+                    'uuid': 'ndjson-part',
+                    'name': 'Part',
+                    'version_number': 1,
+                    'revision_date': '2024-01-01 00:00:00',
+                }}],
+            }],
+        }})
+        self._import(3)
+        self.assertEqual(self._assembly_line().quantity, 3)
+
+    def test_batch_after_failed_design(self):
+        def design(name, assembly_lines):
+            return {'fusion_design': {
+                'uuid': 'batch-%s' % name,
+                'name': name,
+                'creation_date': '2024-01-01 00:00:00',
+                'versions': [{
+                    'uuid': 'batch-%s-v1' % name,
+                    'version_number': 1,
+                    'revision_date': '2024-01-01 00:00:00',
+                    'component_versions': [{'fusion_component_version': {
+                        'uuid': 'batch-shared',
+                        'name': 'Shared',
+                        'version_number': 1,
+                        'revision_date': '2024-01-01 00:00:00',
+                        'assembly_lines': assembly_lines,
+                    }}],
+                }],
+            }}
+
+        # The first design creates the shared component before failing, its
+        # rolled back id must not be reused by the second design
+        results = self.env['fusion.design'].sync_design_structures([
+            design('Broken', [{'child_component_version_id': 'batch-missing', 'child_version_number': 1, 'quantity': 1}]),
+            design('Valid', []),
+        ])
+        self.assertEqual([result['status'] for result in results], ['failed', 'done'])
+        component = self.env['fusion.component'].search([('uuid', '=', 'batch-shared')])
+        self.assertEqual(len(component.version_ids), 1)
+
+    def test_existing_users_keep_the_sequence(self):
+        Users = self.env['fusion.user']
+        user_id = Users.get_or_create_user('known-user')
+        self.env.cr.execute("SELECT last_value FROM fusion_user_id_seq")
+        last_value = self.env.cr.fetchone()[0]
+        self.assertEqual(Users.get_or_create_users(['known-user', {'uuid': 'known-user'}]), {'known-user': user_id})
+        self.env.cr.execute("SELECT last_value FROM fusion_user_id_seq")
+        self.assertEqual(self.env.cr.fetchone()[0], last_value)
+
+    def test_legacy_design_version_sync(self):
+        design = self.env['fusion.design'].create({
+            'uuid': 'legacy-design',
+            'name': 'Legacy Design',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+        version = self.env['fusion.design.version'].sync_design_version({
+            'uuid': 'legacy-design-v1',
+            'version_number': 1,
+            'revision_date': '2024-01-01 00:00:00',
+            'modified_by': 'legacy-user',
+            'component_versions': [{'fusion_component_version': {
+                'uuid': 'legacy-assembly',
+                'name': 'Assembly',
+                'version_number': '2',
+                'revision_date': '2024-01-01 00:00:00',
+                'modified_by': 'legacy-user',
+                'assembly_lines': [{'child_component_version_id': 'legacy-part', 'quantity': 4}],
+            }}, {'fusion_component_version': {
+                'uuid': 'legacy-part',
+                'name': 'Part',
+                'revision_date': '2024-01-01 00:00:00',
+            }}],
+        }, design.id)
+        self.assertEqual(version.fusion_design_id, design)
+        self.assertEqual(version.modified_by.uuid, 'legacy-user')
+        assembly = version.component_version_ids.filtered(lambda component_version: component_version.version_number == 2)
+        self.assertEqual(assembly.modified_by, version.modified_by)
+        self.assertEqual(assembly.assembly_lines.child_component_name, 'Part')
+        self.assertEqual(assembly.assembly_lines.quantity, 4)
+
+    def test_sync_log_sampling(self):
+        SyncLog = self.env['fusion.sync.log']
+        logs = SyncLog.search([])
+        self.env['ir.config_parameter'].sudo().set_param('fusion_sync.sync_log_sample_rate', '0')
+        self._import(1)
+        self.assertEqual(SyncLog.search([]), logs)
+        self.Engine = self.Engine.with_context(fusion_sync_profile=True)
+        self._import(2)
+        self.assertEqual((SyncLog.search([]) - logs).name, 'NDJSON Design')
+        self.Engine = self.Engine.with_context(fusion_sync_profile=False)
+        self.env['ir.config_parameter'].sudo().set_param('fusion_sync.sync_log_sample_rate', '1')
+        self._import(3)
+        self.assertEqual(len(SyncLog.search([]) - logs), 2)
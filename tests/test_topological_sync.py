@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+
+
+def component_version(name, assembly_lines=()):
+    return {'fusion_component_version': {
+        'uuid': 'topo-test-%s' % name,
+        'version_uuid': 'topo-test-%s-v1' % name,
+        'name': name,
+        'version_number': 1,
+        'revision_date': '2024-01-01 00:00:00',
+        'assembly_lines': [{
+            'child_version_uuid': 'topo-test-%s-v1' % child,
+            'quantity': quantity,
+        } for child, quantity in assembly_lines],
+    }}
+
+
+def design_structure(name, component_versions):
+    return {'fusion_design': {
+        'uuid': 'topo-test-%s' % name,
+        'name': name,
+        'creation_date': '2024-01-01 00:00:00',
+        'versions': [{
+            'uuid': 'topo-test-%s-v1' % name,
+            'version_number': 1,
+            'revision_date': '2024-01-01 00:00:00',
+            'component_versions': component_versions,
+        }],
+    }}
+
+
+@tagged('post_install', '-at_install')
+class TestTopologicalSync(TransactionCase):
+    """Assembly lines are written sub-assemblies first, whatever the order
+    of the payload."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, fusion_sync_tracking=False, tracking_disable=True))
+        cls.Engine = cls.env['fusion.sync.engine']
+
+    def test_topological_order(self):
+        order = self.Engine._topological_order([(1, 2), (1, 3), (2, 4), (3, 4), (5, 1)])
+        self.assertEqual(set(order), {1, 2, 3, 5})
+        self.assertLess(order.index(2), order.index(1))
+        self.assertLess(order.index(3), order.index(1))
+        self.assertLess(order.index(1), order.index(5))
+        with self.assertRaises(ValidationError):
+            self.Engine._topological_order([(1, 2), (2, 3), (3, 1)])
+
+    def test_parents_before_children_in_payload(self):
+        # The root assembly comes first and the part last
+        self.env['fusion.design'].sync_design_structure(design_structure('Design', [
+            component_version('Root', [('Sub', 2)]),
+            component_version('Sub', [('Part', 3)]),
+            component_version('Part'),
+        ]))
+        versions = {
+            version.fusion_component_id.name: version
+            for version in self.env['fusion.component.version'].search([('uuid', '=like', 'topo-test-%')])
+        }
+        root_line, sub_line = versions['Root'].assembly_lines, versions['Sub'].assembly_lines
+        self.assertEqual((root_line.child_component_version_id, root_line.quantity), (versions['Sub'], 2))
+        self.assertEqual((sub_line.child_component_version_id, sub_line.quantity), (versions['Part'], 3))
+        self.assertLess(sub_line.id, root_line.id)
+        self.assertEqual(versions['Root'].explode_bom(), [{
+            'component_version_id': versions['Part'].id,
+            'display_name': 'Part (v1)',
+            'quantity': 6,
+        }])
+
+    def test_cycle_in_payload(self):
+        with self.assertRaises(ValidationError), self.env.cr.savepoint():
+            self.env['fusion.design'].sync_design_structure(design_structure('Cycle', [
+                component_version('X', [('Y', 1)]),
+                component_version('Y', [('X', 1)]),
+            ]))
+        self.assertFalse(self.env['fusion.component.version.assembly.line'].search([
+            ('fusion_component_version_id.uuid', 'in', ['topo-test-X-v1', 'topo-test-Y-v1']),
+        ]))
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestTrackingCompaction(TransactionCase):
+    """Tracking posted by imports is compacted, manual edits are kept."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.component = cls.env['fusion.component'].with_context(tracking_disable=True).create({
+            'uuid': 'tracking-test',
+            'name': 'Tracked',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+
+    def _post_tracking(self, fname, subtype_xmlid, date='2020-01-01 00:00:00'):
+        field = self.env['ir.model.fields']._get('fusion.component', fname)
+        return self.env['mail.message'].create({
+            'model': 'fusion.component',
+            'res_id': self.component.id,
+            'message_type': 'notification',
+            'subtype_id': self.env.ref(subtype_xmlid).id,
+            'date': date,
+            'tracking_value_ids': [(0, 0, {
+                'field': field.id,
+                'field_desc': field.field_description,
+                'field_type': 'char',
+                'old_value_char': 'old',
+                'new_value_char': 'new',
+            })],
+        })
+
+    def test_compaction(self):
+        ICP = self.env['ir.config_parameter'].sudo()
+        ICP.set_param('fusion_sync.legacy_tracking_date', '2021-01-01 00:00:00')
+        sync = self._post_tracking('uuid', 'fusion_sync.mt_fusion_sync')
+        recent_sync = self._post_tracking('uuid', 'fusion_sync.mt_fusion_sync', date='2999-01-01 00:00:00')
+        legacy = self._post_tracking('uuid', 'mail.mt_note')
+        manual = self._post_tracking('name', 'mail.mt_note')
+        after_upgrade = self._post_tracking('uuid', 'mail.mt_note', date='2022-01-01 00:00:00')
+
+        self.env['fusion.sync.engine']._cron_compact_tracking()
+        self.assertEqual((sync | recent_sync | legacy | manual | after_upgrade).exists(), recent_sync | manual | after_upgrade)
+        self.assertTrue(manual.tracking_value_ids)
+        # The legacy pass stops once it finds nothing left to compact
+        self.assertTrue(ICP.get_param('fusion_sync.legacy_tracking_date'))
+        self.env['fusion.sync.engine']._cron_compact_tracking()
+        self.assertFalse(ICP.get_param('fusion_sync.legacy_tracking_date'))
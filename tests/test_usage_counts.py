@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestUsageCounts(TransactionCase):
+    """The stored usage counts follow the assembly lines and the design
+    versions using the component versions."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.components = cls.env['fusion.component'].create([{
+            'uuid': 'usage-test-%s' % name,
+            'name': name,
+            'creation_date': '2024-01-01 00:00:00',
+        } for name in ('A', 'B', 'C')])
+        cls.a, cls.b, cls.c = cls.env['fusion.component.version'].create([{
+            'fusion_component_id': component.id,
+            'version_number': 1,
+            'revision_date': '2024-01-01 00:00:00',
+        } for component in cls.components])
+        cls.design = cls.env['fusion.design'].create({
+            'uuid': 'usage-test-design',
+            'name': 'Design',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+        cls.design_versions = cls.env['fusion.design.version'].create([{
+            'fusion_design_id': cls.design.id,
+            'uuid': 'usage-test-design-v%d' % version_number,
+            'version_number': version_number,
+            'revision_date': '2024-01-01 00:00:00',
+        } for version_number in (1, 2)])
+
+    def _stored(self, records, fname):
+        records.flush([fname])
+        self.env.cr.execute(
+            'SELECT id, "{}" FROM "{}" WHERE id IN %s'.format(fname, records._table), [tuple(records.ids)]
+        )
+        return dict(self.env.cr.fetchall())
+
+    def test_used_in_count(self):
+        lines = self.env['fusion.component.version.assembly.line'].create([{
+            'fusion_component_version_id': parent.id,
+            'child_component_version_id': self.c.id,
+        } for parent in (self.a, self.b)])
+        self.assertEqual(self._stored(self.c, 'used_in_count'), {self.c.id: 2})
+        lines[0].unlink()
+        self.assertEqual(self._stored(self.c, 'used_in_count'), {self.c.id: 1})
+        lines[1].write({'child_component_version_id': self.b.id})
+        self.assertEqual(self._stored(self.b | self.c, 'used_in_count'), {self.b.id: 1, self.c.id: 0})
+
+    def test_used_in_design_count(self):
+        first, second = self.design_versions
+        first.write({'component_version_ids': [(6, 0, (self.a | self.c).ids)]})
+        second.write({'component_version_ids': [(6, 0, self.c.ids)]})
+        self.assertEqual(self._stored(self.components, 'used_in_design_count'), {
+            self.components[0].id: 1, self.components[1].id: 0, self.components[2].id: 2,
+        })
+        second.write({'component_version_ids': [(5, 0, 0)]})
+        self.assertEqual(self._stored(self.components[2], 'used_in_design_count'), {self.components[2].id: 1})
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from psycopg2 import IntegrityError
+
+from odoo.modules.migration import load_script
+from odoo.modules.module import get_resource_path
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import mute_logger
+
+
+@tagged('post_install', '-at_install')
+class TestVersionConstraints(TransactionCase):
+    """Version numbers, UUIDs and assembly lines are unique in the database,
+    and the upgrade merges the duplicates that would prevent it."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.component = cls.env['fusion.component'].create({
+            'uuid': 'constraint-test-component',
+            'name': 'Component',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+        cls.component_versions = cls.env['fusion.component.version'].create([{
+            'fusion_component_id': cls.component.id,
+            'version_number': version_number,
+            'revision_date': '2024-01-01 00:00:00',
+        } for version_number in (1, 2)])
+        cls.design = cls.env['fusion.design'].create({
+            'uuid': 'constraint-test-design',
+            'name': 'Design',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+        cls.design_version = cls.env['fusion.design.version'].create({
+            'fusion_design_id': cls.design.id,
+            'uuid': 'constraint-test-design-v1',
+            'version_number': 1,
+            'revision_date': '2024-01-01 00:00:00',
+        })
+
+    def _assert_rejected(self, model_name, vals):
+        with mute_logger('odoo.sql_db'), self.assertRaises(IntegrityError), self.env.cr.savepoint():
+            self.env[model_name].create(vals)
+
+    def test_unique_versions(self):
+        self._assert_rejected('fusion.component.version', {
+            'fusion_component_id': self.component.id,
+            'version_number': 1,
+            'uuid': 'constraint-test-other-uuid',
+            'revision_date': '2024-01-01 00:00:00',
+        })
+        self._assert_rejected('fusion.component.version', {
+            'fusion_component_id': self.component.id,
+            'version_number': 0,
+            'revision_date': '2024-01-01 00:00:00',
+        })
+        design_version_vals = {
+            'fusion_design_id': self.design.id,
+            'uuid': 'constraint-test-design-v2',
+            'version_number': 2,
+            'revision_date': '2024-01-01 00:00:00',
+        }
+        self._assert_rejected('fusion.design.version', dict(design_version_vals, version_number=1))
+        self._assert_rejected('fusion.design.version', dict(design_version_vals, uuid=self.design_version.uuid))
+        self.env['fusion.design.version'].create(design_version_vals)
+
+    def test_unique_assembly_lines(self):
+        parent, child = self.component_versions
+        line_vals = {'fusion_component_version_id': parent.id, 'child_component_version_id': child.id}
+        self.env['fusion.component.version.assembly.line'].create(line_vals)
+        self._assert_rejected('fusion.component.version.assembly.line', line_vals)
+
+    def test_upgrade_merges_duplicates(self):
+        # Databases created before the constraints may hold duplicates
+        self.env.cr.execute("""
+            ALTER TABLE fusion_design_version
+                DROP CONSTRAINT fusion_design_version_design_version_number_unique
+        """)
+        duplicate = self.env['fusion.design.version'].create({
+            'fusion_design_id': self.design.id,
+            'uuid': 'constraint-test-design-v1-copy',
+            'version_number': 1,
+            'revision_date': '2024-01-01 00:00:00',
+            'component_version_ids': [(6, 0, self.component_versions.ids)],
+        })
+        self.design_version.write({'component_version_ids': [(6, 0, self.component_versions[0].ids)]})
+        self.env['base'].flush()
+
+        script = load_script(get_resource_path('fusion_sync', 'migrations', '0.1.22', 'pre-migrate.py'), 'pre_migrate')
+        script.migrate(self.env.cr, '0.1.21')
+        self.env['base'].invalidate_cache()
+
+        self.assertFalse(duplicate.exists())
+        self.assertEqual(self.design_version.component_version_ids, self.component_versions)
+        self.env.cr.execute("""
+            ALTER TABLE fusion_design_version
+                ADD CONSTRAINT fusion_design_version_design_version_number_unique UNIQUE (fusion_design_id, version_number)
+        """)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestVersionDiff(TransactionCase):
+    """Diffs of synchronized design versions are cached on their payload
+    hashes and on a fingerprint of the records they use."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.assembly, cls.part = cls.env['fusion.component'].create([{
+            'uuid': 'diff-test-%s' % name,
+            'name': name,
+            'creation_date': '2024-01-01 00:00:00',
+        } for name in ('Assembly', 'Part')])
+        ComponentVersion = cls.env['fusion.component.version']
+        cls.assembly_v1, cls.assembly_v2, cls.part_v1 = ComponentVersion.create([{
+            'fusion_component_id': component.id,
+            'version_number': version_number,
+            'revision_date': '2024-01-01 00:00:00',
+        } for component, version_number in ((cls.assembly, 1), (cls.assembly, 2), (cls.part, 1))])
+        cls.line_v1, cls.line_v2 = cls.env['fusion.component.version.assembly.line'].create([{
+            'fusion_component_version_id': assembly_version.id,
+            'child_component_version_id': cls.part_v1.id,
+            'quantity': 2,
+        } for assembly_version in (cls.assembly_v1, cls.assembly_v2)])
+        design = cls.env['fusion.design'].create({
+            'uuid': 'diff-test-design',
+            'name': 'Design',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+        cls.old, cls.new = cls.env['fusion.design.version'].create([{
+            'fusion_design_id': design.id,
+            'uuid': 'diff-test-design-v%d' % version_number,
+            'version_number': version_number,
+            'revision_date': '2024-01-01 00:00:00',
+            'sync_hash': 'diff-test-hash-%d' % version_number,
+            'component_version_ids': [(6, 0, (assembly_version | cls.part_v1).ids)],
+        } for version_number, assembly_version in ((1, cls.assembly_v1), (2, cls.assembly_v2))])
+
+    def _fingerprint(self):
+        return self.env['fusion.design.version']._get_diff_fingerprint((self.old.id, self.new.id))
+
+    def test_cache_key(self):
+        fingerprint = self._fingerprint()
+        diff = self.new.get_version_diff(self.old.id)
+        self.assertEqual([(change['old']['id'], change['new']['id']) for change in diff['reversioned']], [
+            (self.assembly_v1.id, self.assembly_v2.id),
+        ])
+        self.assertFalse(diff['added'] or diff['removed'] or diff['quantity_changes'])
+        self.assertEqual(self._fingerprint(), fingerprint)
+
+        # Edited outside of a synchronization, the payload hashes are unchanged
+        self.line_v2.write({'quantity': 5})
+        self.assertNotEqual(self._fingerprint(), fingerprint)
+        diff = self.new.get_version_diff(self.old.id)
+        self.assertEqual([
+            (change['parent_component_id'], change['child_component_id'], change['old_quantity'], change['new_quantity'])
+            for change in diff['quantity_changes']
+        ], [(self.assembly.id, self.part.id, 2, 5)])
+
+        fingerprint = self._fingerprint()
+        self.new.write({'component_version_ids': [(3, self.part_v1.id)]})
+        self.assertNotEqual(self._fingerprint(), fingerprint)
+        diff = self.new.get_version_diff(self.old.id)
+        self.assertEqual([version['id'] for version in diff['removed']], [self.part_v1.id])
+
+    def test_unsynchronized_versions(self):
+        self.new.write({'sync_hash': False})
+        self.line_v2.write({'quantity': 3})
+        diff = self.new.get_version_diff(self.old.id)
+        self.assertEqual([change['new_quantity'] for change in diff['quantity_changes']], [3])
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestVersionRetention(TransactionCase):
+    """Superseded versions are archived, except pinned and used ones;
+    unarchiving restores a version with the versions it uses and pins it."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.env['ir.config_parameter'].sudo().set_param('fusion_sync.version_retention', 1)
+        cls.assembly, cls.part = cls.env['fusion.component'].create([{
+            'uuid': 'retention-test-%s' % name,
+            'name': name,
+            'creation_date': '2024-01-01 00:00:00',
+        } for name in ('Assembly', 'Part')])
+        ComponentVersion = cls.env['fusion.component.version']
+        cls.assembly_v1, cls.assembly_v2, cls.part_v1, cls.part_v2 = ComponentVersion.create([{
+            'fusion_component_id': component.id,
+            'version_number': version_number,
+            'revision_date': '2024-01-01 00:00:00',
+        } for component in (cls.assembly, cls.part) for version_number in (1, 2)])
+        cls.env['fusion.component.version.assembly.line'].create([{
+            'fusion_component_version_id': assembly_version.id,
+            'child_component_version_id': part_version.id,
+        } for assembly_version, part_version in ((cls.assembly_v1, cls.part_v1), (cls.assembly_v2, cls.part_v2))])
+        design = cls.env['fusion.design'].create({
+            'uuid': 'retention-test-design',
+            'name': 'Design',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+        cls.design_v1, cls.design_v2 = cls.env['fusion.design.version'].create([{
+            'fusion_design_id': design.id,
+            'uuid': 'retention-test-design-v%d' % version_number,
+            'version_number': version_number,
+            'revision_date': '2024-01-01 00:00:00',
+            'component_version_ids': [(6, 0, component_versions.ids)],
+        } for version_number, component_versions in ((1, cls.assembly_v1), (2, cls.assembly_v2))])
+
+    def _archive(self):
+        self.env['fusion.sync.engine']._cron_archive_versions()
+        self.env['base'].invalidate_cache()
+
+    def _active(self):
+        records = self.design_v1 | self.design_v2
+        component_versions = self.assembly_v1 | self.assembly_v2 | self.part_v1 | self.part_v2
+        return records.filtered('active'), component_versions.filtered('active')
+
+    def test_archive_superseded(self):
+        self._archive()
+        # Unused once the first design version is archived
+        self.assertEqual(self._active(), (self.design_v2, self.assembly_v2 | self.part_v2))
+        self.assertEqual(self.assembly.version_ids, self.assembly_v2)
+        self.assertEqual(self.assembly.with_context(active_test=False).version_ids, self.assembly_v1 | self.assembly_v2)
+
+    def test_unarchive_pins(self):
+        self._archive()
+        self.design_v1.action_unarchive()
+        self.assertTrue(self.design_v1.pinned)
+        self.assertEqual(self._active(), (self.design_v1 | self.design_v2, self.assembly_v1 | self.assembly_v2 | self.part_v1 | self.part_v2))
+        # Pinned, or still used by a pinned version
+        self._archive()
+        self.assertEqual(self._active(), (self.design_v1 | self.design_v2, self.assembly_v1 | self.assembly_v2 | self.part_v1 | self.part_v2))
+
+    def test_unarchive_component_version(self):
+        self._archive()
+        self.assembly_v1.action_unarchive()
+        self.assertTrue(self.assembly_v1.pinned)
+        self.assertFalse(self.part_v1.pinned)
+        self._archive()
+        self.assertEqual(self._active()[1], self.assembly_v1 | self.assembly_v2 | self.part_v1 | self.part_v2)
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from odoo.tests import TransactionCase, tagged
+
+from .test_explode_bom import create_assembly_tree
+
+
+@tagged('post_install', '-at_install')
+class TestWhereUsed(TransactionCase):
+    """Assemblies and design versions using a component version at any
+    level, read from the assembly closure."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True))
+        cls.a, cls.b, cls.c, cls.d = create_assembly_tree(cls.env)
+        design = cls.env['fusion.design'].create({
+            'uuid': 'where-used-test-design',
+            'name': 'Design',
+            'creation_date': '2024-01-01 00:00:00',
+        })
+        # The first version uses the whole tree, the second one only C
+        cls.design_versions = cls.env['fusion.design.version'].create([{
+            'fusion_design_id': design.id,
+            'uuid': 'where-used-test-design-v%d' % version_number,
+            'version_number': version_number,
+            'revision_date': '2024-01-01 00:00:00',
+            'component_version_ids': [(6, 0, component_versions.ids)],
+        } for version_number, component_versions in ((1, cls.a), (2, cls.c))])
+
+    def _where_used(self, version):
+        result = version.get_where_used()
+        return (
+            {record['id'] for record in result['component_versions']['records']},
+            {record['id'] for record in result['design_versions']['records']},
+        )
+
+    def test_where_used(self):
+        first, second = self.design_versions
+        self.assertEqual(self._where_used(self.d), ({self.a.id, self.b.id, self.c.id}, {first.id, second.id}))
+        self.assertEqual(self._where_used(self.b), ({self.a.id}, {first.id}))
+        self.assertEqual(self._where_used(self.a), (set(), {first.id}))
+        self.assertEqual((self.d.where_used_count, self.d.where_used_design_count), (3, 2))
+
+        page = self.d.get_where_used(offset=1, limit=1)
+        self.assertEqual(page['design_versions']['count'], 2)
+        self.assertEqual(len(page['design_versions']['records']), 1)
+
+        first.write({'component_version_ids': [(5, 0, 0)]})
+        action = self.d.action_view_where_used_designs()
+        self.assertEqual(self.env['fusion.design.version'].search(action['domain']), second)
+
+    def test_all_component_versions(self):
+        first, second = self.design_versions
+        self.assertEqual(first.all_component_version_ids, self.a | self.b | self.c | self.d)
+        self.assertEqual(second.all_component_version_ids, self.c | self.d)
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""Database helpers shared by the Fusion models."""
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Substring operators of name searches answered by the trigram index of the
+# search key; exact-match operators would compare the whole display name
+SEARCH_KEY_OPERATORS = ('ilike', 'like')
+
+
+def create_trigram_index(cr, indexname, tablename, column):
+    """Create a trigram index on ``column`` for ``ilike`` searches.
+
+    The ``pg_trgm`` extension is installed when the database user is allowed
+    to; otherwise searches keep working without the index.
+    """
+    cr.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s", (indexname,))
+    if cr.fetchone():
+        return
+    cr.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    if not cr.fetchone():
+        try:
+            with cr.savepoint():
+                cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except Exception:
+            _logger.warning("Could not install pg_trgm, %s is not indexed for searches", column)
+            return
+    cr.execute('CREATE INDEX "{}" ON "{}" USING gin ("{}" gin_trgm_ops)'.format(indexname, tablename, column))
@@ -0,0 +1 @@
+from . import fusion_design_version_diff
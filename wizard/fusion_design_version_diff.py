@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+from odoo import api, fields, models, _
+from odoo.exceptions import UserError
+
+
+class FusionDesignVersionDiff(models.TransientModel):
+    _name = 'fusion.design.version.diff'
+    _description = 'Fusion Design Version Comparison'
+
+    old_version_id = fields.Many2one(comodel_name='fusion.design.version', string='From Version', required=True, help="Design version to compare from, usually the previous version")
+    new_version_id = fields.Many2one(comodel_name='fusion.design.version', string='To Version', required=True, help="Design version to compare to")
+    line_ids = fields.One2many(comodel_name='fusion.design.version.diff.line', inverse_name='diff_id', string='Changes', readonly=True)
+    change_count = fields.Integer(string='Number of Changes', compute='_compute_change_count')
+
+    @api.depends('line_ids')
+    def _compute_change_count(self):
+        for wizard in self:
+            wizard.change_count = len(wizard.line_ids)
+
+    def _compute_lines(self):
+        for wizard in self:
+            if wizard.old_version_id == wizard.new_version_id:
+                raise UserError(_("Select two different design versions to compare."))
+            diff = wizard.new_version_id.get_version_diff(wizard.old_version_id.id)
+            vals_list = [{
+                'change_type': 'added',
+                'component_id': version['component_id'],
+                'new_component_version_id': version['id'],
+            } for version in diff['added']]
+            vals_list += [{
+                'change_type': 'removed',
+                'component_id': version['component_id'],
+                'old_component_version_id': version['id'],
+            } for version in diff['removed']]
+            vals_list += [{
+                'change_type': 'reversioned',
+                'component_id': change['new']['component_id'],
+                'old_component_version_id': change['old']['id'],
+                'new_component_version_id': change['new']['id'],
+            } for change in diff['reversioned']]
+            vals_list += [{
+                'change_type': 'quantity',
+                'parent_component_id': change['parent_component_id'],
+                'component_id': change['child_component_id'],
+                'old_quantity': change['old_quantity'],
+                'new_quantity': change['new_quantity'],
+            } for change in diff['quantity_changes']]
+            wizard.line_ids.unlink()
+            wizard.write({'line_ids': [(0, 0, vals) for vals in vals_list]})
+
+    def action_compare(self):
+        self._compute_lines()
+        return self._action_reopen()
+
+    def _action_reopen(self):
+        self.ensure_one()
+        return {
+            'name': _("Compare Design Versions"),
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+
+class FusionDesignVersionDiffLine(models.TransientModel):
+    _name = 'fusion.design.version.diff.line'
+    _description = 'Fusion Design Version Comparison Line'
+    _order = 'change_type, id'
+
+    diff_id = fields.Many2one(comodel_name='fusion.design.version.diff', string='Comparison', required=True, ondelete='cascade')
+    change_type = fields.Selection(
+        selection=[
+            ('added', 'Added'),
+            ('removed', 'Removed'),
+            ('reversioned', 'New Version'),
+            ('quantity', 'Quantity Changed'),
+        ],
+        string='Change',
+        required=True,
+    )
+    component_id = fields.Many2one(comodel_name='fusion.component', string='Component')
+    old_component_version_id = fields.Many2one(comodel_name='fusion.component.version', string='Old Version')
+    new_component_version_id = fields.Many2one(comodel_name='fusion.component.version', string='New Version')
+    parent_component_id = fields.Many2one(comodel_name='fusion.component', string='In Assembly', help="Assembly whose quantity of the component changed")
+    old_quantity = fields.Integer(string='Old Quantity')
+    new_quantity = fields.Integer(string='New Quantity')